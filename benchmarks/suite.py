@@ -0,0 +1,186 @@
+"""Benchmarks for scaffolding and CLI latency, compared against a stored baseline.
+
+Run from the repository root:
+
+    python -m benchmarks.suite                    # measure and compare with benchmarks/baseline.json
+    python -m benchmarks.suite --update-baseline  # measure and store the results as the new baseline
+
+Every metric is in seconds per operation, so lower is better. The run fails when a metric is
+slower than its baseline by more than the threshold.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+from src.batch import ManifestEntry, create_batch
+from src.entities import ExperimentType
+from src.experiment_handler import ExperimentHandler
+from src.templates import default_store
+
+BASELINE_FILE = os.path.join("benchmarks", "baseline.json")
+RESULTS_FILE = os.path.join("benchmarks", "results.json")
+DEFAULT_THRESHOLD = 0.25
+# Slowdowns smaller than this many seconds are timer and scheduler noise, whatever the percentage
+NOISE_FLOOR = 0.0005
+BATCH_SIZES = (10, 100, 1000)
+
+
+def measure(operation, repeat: int) -> float:
+    """Returns the fastest duration of `operation` in seconds.
+
+    As with `timeit`, the minimum is the most repeatable estimate; slower repeats measure other load on the machine.
+    """
+    durations = []
+    for index in range(repeat):
+        start = time.perf_counter()
+        operation(index)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def bench_cli_cold_start(repeat: int = 5) -> float:
+    env = {**os.environ, "PYTHONPATH": "."}
+    command = [sys.executable, "src/main.py", "--help"]
+    return measure(lambda _: subprocess.run(command, env=env, check=True, capture_output=True), repeat)
+
+
+def bench_create(type: ExperimentType, workdir: str, repeat: int = 20) -> float:
+    """Returns the fastest `ExperimentHandler.create`. Fails when the type cannot be created, rather than skip it."""
+    dir = os.path.join(workdir, f"create-{type.value}") + "/"
+    os.makedirs(dir)
+    # Issue numbers are unique across the catalog, so every type gets its own range
+    first_issue = (list(ExperimentType).index(type) + 1) * 1000
+
+    def create(index):
+        ExperimentHandler.create(f"issue-{first_issue + index}-bench", type, dir, raise_errors=True)
+
+    with redirect_stdout(StringIO()):
+        return measure(create, repeat)
+
+
+def bench_batch(count: int, workdir: str, rounds: int = 3) -> float:
+    """Returns the fastest time per experiment when creating `count` experiments from a manifest."""
+    durations = []
+    for round in range(rounds):
+        dir = os.path.join(workdir, f"batch-{count}-{round}") + "/"
+        first_issue = 100_000 * (round + 1) + count * 10
+        entries = [ManifestEntry(f"bench-{index}", first_issue + index, ExperimentType.PROMPT_FLOW, dir) for index in range(count)]
+        os.makedirs(dir)
+
+        start = time.perf_counter()
+        with redirect_stdout(StringIO()):
+            results = create_batch(entries)
+        durations.append((time.perf_counter() - start) / count)
+
+        failed = [result for result in results if not result.ok]
+        if failed:
+            raise RuntimeError(f"{len(failed)} experiments failed, e.g. {failed[0].error}")
+    return min(durations)
+
+
+def bench_readme(workdir: str, repeat: int = 1000) -> float:
+    store = default_store()
+    destination = os.path.join(workdir, "README.md")
+    return measure(lambda index: store.materialise("TEMPLATE-README.md", destination, {"name": f"issue-{index}-bench"}), repeat)
+
+
+def bench_prompty_render(workdir: str, rows: int = 10_000, repeat: int = 5) -> float:
+    """Returns the fastest time per row when rendering the Prompty template over `rows` inputs."""
+    from src.prompty import PromptyRenderer
+
+    path = os.path.join(workdir, "bench.prompty")
+    default_store().materialise("prompty/hello.prompty", path, {"name": "bench"})
+    inputs = [{"text": f"Hello {row}"} for row in range(rows)]
+    renderer = PromptyRenderer()
+    return measure(lambda _: renderer.render_batch(path, inputs), repeat) / rows
+
+
+def bench_history_load(workdir: str, runs: int = 20, rows: int = 1000, repeat: int = 5) -> float:
+    """Returns the fastest time to load the comparison columns of the last `runs` runs from the run history."""
+    from src.history import RunHistory
+
+    experiment = os.path.join(workdir, "history")
+    os.makedirs(os.path.join(experiment, "runs"))
+    for run in range(runs):
+        with open(os.path.join(experiment, "runs", f"run-{run:03d}.jsonl"), "w") as file:
+            for row in range(rows):
+                for variant in ("llm.variant_0", "llm.variant_1"):
+                    file.write(json.dumps({"run_id": f"run-{run}", "variant": variant, "row": row, "inputs": {"text": f"Hello {row}"},
+                                           "output": {"output": f"Hi {row}"}, "latency": 0.5, "prompt_tokens": 12,
+                                           "completion_tokens": 4, "error": None}) + "\n")
+    history = RunHistory(experiment)
+    history.sync()
+    return measure(lambda _: history.load_columns(last=runs), repeat)
+
+
+def run_suite(batch_sizes=BATCH_SIZES) -> dict[str, float]:
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        # Keep the benchmark experiments out of the real catalog
+        os.environ["PROMPT_IGNITE_CATALOG"] = os.path.join(workdir, "catalog.sqlite")
+
+        results["cli_cold_start"] = bench_cli_cold_start()
+        for type in ExperimentType:
+            results[f"create_{type.value}"] = bench_create(type, workdir)
+        for count in batch_sizes:
+            # One round of the largest batch already averages over enough experiments
+            results[f"batch_create_{count}_per_experiment"] = bench_batch(count, workdir, rounds=1 if count >= 1000 else 3)
+        results["readme_render"] = bench_readme(workdir)
+        results["prompty_render_per_row"] = bench_prompty_render(workdir)
+        results["history_load_last_20"] = bench_history_load(workdir)
+    return results
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float, noise_floor: float = NOISE_FLOOR) -> list[str]:
+    """Returns a message for every metric more than `threshold` (a fraction) slower than its baseline."""
+    regressions = []
+    for name, value in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference and value > reference * (1 + threshold) and value - reference > noise_floor:
+            regressions.append(f"{name}: {value * 1000:.3f} ms vs baseline {reference * 1000:.3f} ms (+{value / reference - 1:.0%})")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark experiment scaffolding and CLI latency")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline JSON file")
+    parser.add_argument("--output", default=RESULTS_FILE, help="Where to write this run's results")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown as a fraction, e.g. 0.25")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--quick", action="store_true", help="Skip the 1000 experiment batch")
+    args = parser.parse_args(argv)
+
+    results = run_suite(BATCH_SIZES[:-1] if args.quick else BATCH_SIZES)
+    for name, value in sorted(results.items()):
+        print(f"⏱️ {name:<40} {value * 1000:10.3f} ms")
+
+    path = args.baseline if args.update_baseline else args.output
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write("\n")
+    print(f"📄 Results written to {path}")
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    for name in sorted(results.keys() - baseline.keys()):
+        print(f"⚠️ {name} has no baseline yet, run with --update-baseline to record one")
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"🚨 {regression}")
+    if regressions:
+        return 1
+    print(f"✅ No metric regressed more than {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import os
+
+from openai import AzureOpenAI
+from promptflow.core import tool
+
+# The inputs section will change based on the arguments of the tool function, after you save the code
+# Adding type to arguments and return value will help the system show the types properly
+# Please update the function name/signature per need
+
+
+@tool
+def my_python_tool(
+    prompt: str,
+    # for AOAI, deployment name is customized by user, not model name.
+    deployment_name: str,
+    max_tokens: int = 120,
+    temperature: float = 1.0,
+    top_p: float = 1.0,
+    **kwargs,
+) -> str:
+    for name in ("AZURE_OPENAI_API_KEY", "AZURE_OPENAI_ENDPOINT"):
+        if name not in os.environ:
+            raise Exception(f"Please specify environment variable: {name}")
+
+    client = AzureOpenAI(
+        api_key=os.environ["AZURE_OPENAI_API_KEY"],
+        azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+        api_version=os.environ.get("AZURE_OPENAI_API_VERSION", "2024-02-01"),
+    )
+
+    response = client.chat.completions.create(
+        model=deployment_name,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=int(max_tokens),
+        temperature=float(temperature),
+        top_p=float(top_p),
+        **kwargs,
+    )
+
+    return response.choices[0].message.content
@@ -0,0 +1,174 @@
+"""Maps the experiment's tool over data.jsonl on a process pool.
+
+    python harness.py [--workers N] [--chunk-size N] [--unordered] [--limit N]
+
+Rows are sent to the workers as chunks of raw lines: a worker decodes its rows, runs the tool and
+encodes the records, so the parent only reads and writes bytes. Without --chunk-size, chunks are
+resized as results come back so each takes about 50 ms, long enough to amortise the inter-process
+overhead and short enough to keep every worker busy until the end.
+
+Results are appended to runs/<run id>.jsonl in the format of `python src/main.py run`, in row order
+unless --unordered is given.
+"""
+import argparse
+import importlib.util
+import itertools
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+EXPERIMENT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_FILE = "data.jsonl"
+TOOL = "tool.py:process"
+RUNS_DIR = "runs"
+VARIANT = "tool"
+
+TARGET_CHUNK_SECONDS = 0.05
+INITIAL_CHUNK_SIZE = 16
+MAX_CHUNK_SIZE = 10_000
+# Chunks queued per worker, so a worker never waits for the parent between chunks
+CHUNKS_PER_WORKER = 4
+
+_tool = None
+
+
+class ChunkSizer:
+    """Sizes chunks so that each takes about `TARGET_CHUNK_SECONDS` in a worker, unless `fixed` is given."""
+
+    def __init__(self, fixed: int | None = None):
+        self.fixed = fixed
+        self.size = fixed or INITIAL_CHUNK_SIZE
+
+    def record(self, rows: int, seconds: float):
+        if self.fixed or not rows:
+            return
+        target = TARGET_CHUNK_SECONDS * rows / seconds if seconds > 0 else MAX_CHUNK_SIZE
+        # Move halfway to the target, so a single slow chunk does not swing the size
+        self.size = int(min(MAX_CHUNK_SIZE, max(1, (self.size + target) / 2)))
+
+
+def load_tool(spec: str):
+    """Imports `path.py:function` and returns the module and the function."""
+    path, _, function = spec.partition(":")
+    path = os.path.join(EXPERIMENT_DIR, path)
+    module_name = os.path.splitext(os.path.basename(path))[0]
+    module_spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(module_spec)
+    sys.modules[module_name] = module
+    module_spec.loader.exec_module(module)
+    return module, getattr(module, function or "process")
+
+
+def warm_up_worker(spec: str):
+    """Loads the tool once per worker process and runs its `warm_up`, if it has one."""
+    global _tool
+    module, _tool = load_tool(spec)
+    warm_up = getattr(module, "warm_up", None)
+    if warm_up is not None:
+        warm_up()
+
+
+def process_chunk(run_id: str, start: int, chunk: bytes) -> tuple[int, int, float, bytes]:
+    """Runs the tool over a chunk of JSONL rows and returns its first row, row count, duration and encoded records."""
+    chunk_start = time.perf_counter()
+    lines = chunk.splitlines()
+    records = []
+    for row, line in enumerate(lines, start):
+        record = {"run_id": run_id, "variant": VARIANT, "row": row, "inputs": None}
+        row_start = time.perf_counter()
+        try:
+            record["inputs"] = json.loads(line)
+            record.update(output=_tool(record["inputs"]), error=None)
+        except Exception as e:
+            record.update(output=None, error=f"{type(e).__name__}: {e}")
+        record["latency"] = time.perf_counter() - row_start
+        records.append(json.dumps(record, default=str))
+    records.append("")
+    return start, len(lines), time.perf_counter() - chunk_start, "\n".join(records).encode()
+
+
+def read_rows(file, limit: int | None = None):
+    """Yields the non-empty lines of a JSONL file, numbered like `JsonlDataset` numbers rows."""
+    rows = (line for line in file if line.strip())
+    return itertools.islice(rows, limit)
+
+
+def run(data: str, output: str, tool: str = TOOL, workers: int | None = None, chunk_size: int | None = None,
+        ordered: bool = True, limit: int | None = None, run_id: str | None = None) -> int:
+    """Runs the tool over every row of `data`, appends the records to `output` and returns the number of rows.
+
+    At most `CHUNKS_PER_WORKER` chunks per worker are in flight or waiting to be written, so memory
+    stays bounded however large the dataset is.
+    """
+    workers = workers or os.cpu_count() or 1
+    run_id = run_id or new_run_id()
+    sizer = ChunkSizer(chunk_size)
+    window = workers * CHUNKS_PER_WORKER
+    position = 0
+    # Finished chunks waiting for an earlier one, by first row, when writing in order
+    finished: dict[int, tuple[int, bytes]] = {}
+    next_row = 0
+
+    with open(data, "rb") as source, open(output, "ab") as sink, \
+            ProcessPoolExecutor(workers, initializer=warm_up_worker, initargs=(tool,)) as pool:
+        rows = read_rows(source, limit)
+        pending = set()
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) + len(finished) < window:
+                lines = list(itertools.islice(rows, sizer.size))
+                if not lines:
+                    exhausted = True
+                    break
+                # One bytes object pickles much faster than a list of lines
+                pending.add(pool.submit(process_chunk, run_id, position, b"".join(lines)))
+                position += len(lines)
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                start, count, seconds, records = future.result()
+                sizer.record(count, seconds)
+                if ordered:
+                    finished[start] = (count, records)
+                else:
+                    sink.write(records)
+            while next_row in finished:
+                count, records = finished.pop(next_row)
+                sink.write(records)
+                next_row += count
+    return position
+
+
+def new_run_id() -> str:
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the tool over a JSONL dataset on a process pool")
+    parser.add_argument("--data", default=os.path.join(EXPERIMENT_DIR, DATA_FILE), help="JSONL dataset")
+    parser.add_argument("--tool", default=TOOL, help="Tool function as path.py:function, relative to the experiment")
+    parser.add_argument("--output", help="Output JSONL file (default: runs/<run id>.jsonl)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per core)")
+    parser.add_argument("--chunk-size", type=int, help="Rows per chunk (default: sized to about 50 ms of work)")
+    parser.add_argument("--unordered", action="store_true", help="Write results as they finish instead of in row order")
+    parser.add_argument("--limit", type=int, help="Only run the first N rows")
+    args = parser.parse_args(argv)
+
+    run_id = new_run_id()
+    output = args.output or os.path.join(EXPERIMENT_DIR, RUNS_DIR, f"{run_id}.jsonl")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+
+    start = time.perf_counter()
+    rows = run(args.data, output, args.tool, args.workers, args.chunk_size, not args.unordered, args.limit, run_id)
+    duration = time.perf_counter() - start
+    print(f"✅ Ran {rows} rows in {duration:.3f}s ({rows / duration if duration else 0:,.0f} rows/s)")
+    print(f"📄 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
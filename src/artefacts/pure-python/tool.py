@@ -0,0 +1,11 @@
+"""The Python tool of the {{name}} experiment, run over data.jsonl by `python harness.py`."""
+
+
+def warm_up():
+    """Runs once in every worker process before its first row, e.g. to load a tokenizer or compile patterns."""
+
+
+def process(row: dict) -> dict:
+    """Pre- or post-processes one row of data.jsonl. Please replace with your own tool."""
+    text = row["text"]
+    return {"output": f"Write a simple {text} program that displays the greeting message."}
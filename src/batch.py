@@ -0,0 +1,161 @@
+import contextlib
+import io
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from src.entities import ExperimentType
+from src.experiment_handler import ExperimentHandler
+
+DEFAULT_BATCH_TYPE = ExperimentType.PROMPT_FLOW
+DEFAULT_BATCH_DIR = "app/experiments/"
+
+_NAME_PATTERN = re.compile(r"^[a-z0-9-]+$")
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    name: str
+    issue: int
+    type: ExperimentType
+    dir: str
+
+    @property
+    def conventional_name(self):
+        return f"issue-{self.issue}-{self.name}"
+
+    @property
+    def path(self):
+        return f"{self.dir}{self.conventional_name}"
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    entry: ManifestEntry
+    ok: bool
+    duration: float
+    error: str | None = None
+
+
+def load_manifest(path: str) -> list[ManifestEntry]:
+    """Reads and validates every entry of a YAML or JSONL manifest.
+
+    All problems are collected and raised together as a `ValueError` so nothing is created
+    from a manifest that is partly broken.
+    """
+    raw_entries = _read_manifest(path)
+
+    entries = []
+    errors = []
+    seen_paths = set()
+    for index, raw in enumerate(raw_entries, start=1):
+        try:
+            entry = _parse_entry(raw)
+        except ValueError as e:
+            errors.append(f"entry {index}: {e}")
+            continue
+
+        if entry.path in seen_paths:
+            errors.append(f"entry {index}: duplicate experiment {entry.path}")
+        elif os.path.exists(entry.path):
+            errors.append(f"entry {index}: experiment already exists at {entry.path}")
+        seen_paths.add(entry.path)
+        entries.append(entry)
+
+    if errors:
+        raise ValueError("Invalid manifest:\n" + "\n".join(errors))
+    return entries
+
+
+def _read_manifest(path):
+    with open(path) as file:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in file if line.strip()]
+
+        import yaml
+
+        try:
+            data = yaml.safe_load(file)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid manifest {path}: {e}") from None
+
+    if isinstance(data, dict):
+        data = data.get("experiments")
+    if not isinstance(data, list):
+        raise ValueError("Manifest must be a list of experiments or contain an 'experiments' list")
+    return data
+
+
+def _parse_entry(raw):
+    if not isinstance(raw, dict):
+        raise ValueError("expected a mapping with name, issue, type and dir")
+
+    name = raw.get("name")
+    if not isinstance(name, str) or not _NAME_PATTERN.match(name):
+        raise ValueError(f"invalid name {name!r}, use lowercase letters, digits and '-'")
+
+    issue = raw.get("issue")
+    if isinstance(issue, bool) or not isinstance(issue, int) or issue < 0:
+        raise ValueError(f"invalid issue number {issue!r}")
+
+    try:
+        type = ExperimentType(raw.get("type", DEFAULT_BATCH_TYPE.value))
+    except ValueError:
+        choices = ", ".join(t.value for t in ExperimentType)
+        raise ValueError(f"invalid type {raw.get('type')!r}, expected one of: {choices}") from None
+
+    dir = raw.get("dir") or DEFAULT_BATCH_DIR
+    if not isinstance(dir, str):
+        raise ValueError(f"invalid dir {dir!r}, expected a path")
+    if not dir.endswith("/"):
+        dir = f"{dir}/"
+
+    return ManifestEntry(name=name, issue=issue, type=type, dir=dir)
+
+
+def _create_entry(entry: ManifestEntry) -> BatchResult:
+    start = time.perf_counter()
+    try:
+        # Keep worker output out of the report, the result carries the error instead
+        with contextlib.redirect_stdout(io.StringIO()):
+            os.makedirs(entry.dir, exist_ok=True)
+            ExperimentHandler.create(name=entry.conventional_name, type=entry.type, dir=entry.dir, raise_errors=True)
+    except NotImplementedError:
+        return BatchResult(entry, False, time.perf_counter() - start, f"{entry.type.value} setup is not implemented yet")
+    except Exception as e:
+        return BatchResult(entry, False, time.perf_counter() - start, str(e) or type(e).__name__)
+    return BatchResult(entry, True, time.perf_counter() - start)
+
+
+def create_batch(entries: list[ManifestEntry], workers: int | None = None) -> list[BatchResult]:
+    """Creates the experiments on a bounded process pool. Results are returned in manifest order."""
+    if not entries:
+        return []
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(entries)))
+    results: list[BatchResult | None] = [None] * len(entries)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_create_entry, entry): index for index, entry in enumerate(entries)}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            _print_result(result)
+
+    return results
+
+
+def _print_result(result: BatchResult):
+    status = "✅" if result.ok else "❌"
+    line = f"{status} {result.entry.path} ({result.entry.type.value}) in {result.duration:.3f}s"
+    if result.error:
+        line = f"{line}: {result.error}"
+    print(line)
+
+
+def print_summary(results: list[BatchResult]):
+    failed = [result for result in results if not result.ok]
+    print(f"📋 {len(results) - len(failed)} created, {len(failed)} failed")
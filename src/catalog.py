@@ -0,0 +1,300 @@
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+
+from src.config import CATALOG_ENV_VAR, DEFAULT_CATALOG_PATH
+from src.entities import ExperimentType
+
+EXPERIMENT_DIR_PATTERN = re.compile(r"^issue-([0-9]+)-([a-z0-9-]+)$")
+
+# Seconds a reserved experiment may take to appear on disk before a refresh drops it
+_RESERVATION_GRACE = 300
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS experiments (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    issue INTEGER NOT NULL,
+    type TEXT,
+    root TEXT NOT NULL,
+    created REAL NOT NULL,
+    hypothesis TEXT NOT NULL DEFAULT '',
+    signature TEXT NOT NULL DEFAULT '',
+    last_run_id TEXT,
+    last_run_at REAL,
+    last_run_rows INTEGER,
+    last_run_failed INTEGER
+);
+CREATE INDEX IF NOT EXISTS experiments_issue ON experiments (issue);
+CREATE INDEX IF NOT EXISTS experiments_root ON experiments (root);
+CREATE TABLE IF NOT EXISTS roots (path TEXT PRIMARY KEY, mtime_ns INTEGER);
+"""
+
+
+class DuplicateIssueError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    path: str
+    name: str
+    issue: int
+    type: str | None
+    created: float
+    hypothesis: str
+    last_run_id: str | None
+    last_run_at: float | None
+    last_run_rows: int | None
+    last_run_failed: int | None
+
+
+def catalog_path() -> str:
+    return os.environ.get(CATALOG_ENV_VAR) or DEFAULT_CATALOG_PATH
+
+
+class Catalog:
+    """SQLite index of every `issue-{issue}-{name}` experiment under the known experiment directories."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path or catalog_path()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+        if "mtime_ns" not in {row[1] for row in self._connection.execute("PRAGMA table_info(roots)")}:
+            try:
+                self._connection.execute("ALTER TABLE roots ADD COLUMN mtime_ns INTEGER")
+            except sqlite3.OperationalError:
+                pass  # Another process added it first
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def reserve(self, path: str, issue: int, type: ExperimentType | str | None = None) -> bool:
+        """Records a new experiment, failing with `DuplicateIssueError` when another one already has the issue number.
+
+        Experiments added to the root outside the catalog are picked up first, but only when the
+        root's directory changed since it was last scanned. The check and the insert run in one
+        write transaction, so concurrent creators cannot both take a number.
+        Returns False when the experiment was already in the catalog.
+        """
+        path = os.path.abspath(path)
+        root = os.path.dirname(path)
+        name = os.path.basename(path)
+        type = type.value if isinstance(type, ExperimentType) else type
+        self.refresh([root], known=False)
+
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            existing = connection.execute("SELECT path FROM experiments WHERE issue = ? AND path != ?", (issue, path)).fetchone()
+            if existing:
+                raise DuplicateIssueError(f"Issue number {issue} is already used by {existing[0]}")
+            connection.execute("INSERT OR IGNORE INTO roots (path) VALUES (?)", (root,))
+            inserted = connection.execute(
+                "INSERT OR IGNORE INTO experiments (path, name, issue, type, root, created) VALUES (?, ?, ?, ?, ?, ?)",
+                (path, name, issue, type, root, time.time())).rowcount == 1
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return inserted
+
+    def scanned(self, root: str) -> int | None:
+        """Returns the directory mtime of `root` when it is unchanged since its last scan, otherwise None."""
+        root = os.path.abspath(root)
+        row = self._connection.execute("SELECT mtime_ns FROM roots WHERE path = ?", (root,)).fetchone()
+        mtime = _mtime(root)
+        return mtime if row is not None and mtime is not None and row[0] == mtime else None
+
+    def mark_scanned(self, root: str, since: int):
+        """Records `root` as scanned again if it was last scanned at mtime `since`, e.g. after creating an experiment it already holds."""
+        root = os.path.abspath(root)
+        self._connection.execute("UPDATE roots SET mtime_ns = ? WHERE path = ? AND mtime_ns = ?", (_mtime(root), root, since))
+
+    def release(self, path: str):
+        """Removes a reservation, e.g. after the experiment could not be created."""
+        self._connection.execute("DELETE FROM experiments WHERE path = ?", (os.path.abspath(path),))
+
+    def refresh(self, roots: list[str] | None = None, full: bool = False, known: bool = True) -> int:
+        """Brings the catalog up to date with the experiment directories and returns how many entries changed.
+
+        A root is only scanned when its directory changed since the last scan, i.e. experiments were
+        added, removed or renamed, and then only the added experiments are read. With `full`, every
+        root is scanned and experiments whose directory, README or runs directory changed are re-read
+        too. Without `known`, only `roots` are looked at, not every root in the catalog.
+        """
+        known_roots = dict(self._connection.execute("SELECT path, mtime_ns FROM roots"))
+        roots = sorted({os.path.abspath(root) for root in (roots or [])} | (set(known_roots) if known else set()))
+
+        changed = 0
+        for root in roots:
+            # Taken before the scan, so a change during the scan shows up as a change next time
+            mtime = _mtime(root)
+            if full or root not in known_roots or known_roots[root] != mtime:
+                changed += self._refresh_root(root, mtime, full)
+        return changed
+
+    def experiments(self, type: str | None = None, limit: int | None = None) -> list[CatalogEntry]:
+        query = "SELECT * FROM experiments"
+        params: list = []
+        if type:
+            query += " WHERE type = ?"
+            params.append(type)
+        query += " ORDER BY issue"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return self._entries(query, params)
+
+    def search(self, text: str, limit: int | None = None) -> list[CatalogEntry]:
+        """Finds experiments whose name, type, hypothesis or issue number contain `text`."""
+        pattern = f"%{text}%"
+        query = ("SELECT * FROM experiments WHERE name LIKE ? OR type LIKE ? OR hypothesis LIKE ? OR CAST(issue AS TEXT) = ?"
+                 " ORDER BY issue")
+        params: list = [pattern, pattern, pattern, text]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return self._entries(query, params)
+
+    def issue_in_use(self, issue: int) -> bool:
+        return self._connection.execute("SELECT 1 FROM experiments WHERE issue = ?", (issue,)).fetchone() is not None
+
+    def record_run(self, path: str, run_id: str, rows: int, failed: int):
+        self._connection.execute(
+            "UPDATE experiments SET last_run_id = ?, last_run_at = ?, last_run_rows = ?, last_run_failed = ? WHERE path = ?",
+            (run_id, time.time(), rows, failed, os.path.abspath(path)))
+
+    def _entries(self, query, params):
+        cursor = self._connection.execute(query, params)
+        columns = [column[0] for column in cursor.description]
+        fields = CatalogEntry.__dataclass_fields__
+        return [CatalogEntry(**{key: value for key, value in zip(columns, row, strict=True) if key in fields}) for row in cursor]
+
+    def _refresh_root(self, root, mtime, full):
+        connection = self._connection
+        signatures = dict(connection.execute("SELECT path, signature FROM experiments WHERE root = ?", (root,)))
+
+        updates = []
+        seen = set()
+        try:
+            entries = list(os.scandir(root))
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            match = EXPERIMENT_DIR_PATTERN.match(entry.name)
+            if not match or not entry.is_dir():
+                continue
+            seen.add(entry.path)
+            if not full and entry.path in signatures:
+                continue
+            signature = _signature(entry)
+            if signatures.get(entry.path) == signature:
+                continue
+            updates.append((entry, int(match.group(1)), signature))
+
+        # Fresh reservations have no directory yet while their experiment is being created
+        pending = time.time() - _RESERVATION_GRACE
+        removed = [row[0] for row in connection.execute("SELECT path FROM experiments WHERE root = ? AND (signature != '' OR created < ?)", (root, pending))
+                   if row[0] not in seen]
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("INSERT INTO roots (path, mtime_ns) VALUES (?, ?) ON CONFLICT (path) DO UPDATE SET mtime_ns = excluded.mtime_ns",
+                               (root, mtime))
+            connection.executemany("DELETE FROM experiments WHERE path = ?", [(path,) for path in removed])
+            for entry, issue, signature in updates:
+                run_id, run_at, rows, failed = _last_run(entry.path)
+                connection.execute(
+                    "INSERT INTO experiments (path, name, issue, type, root, created, hypothesis, signature,"
+                    " last_run_id, last_run_at, last_run_rows, last_run_failed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (path) DO UPDATE SET type = COALESCE(excluded.type, type), hypothesis = excluded.hypothesis,"
+                    " signature = excluded.signature, last_run_id = COALESCE(excluded.last_run_id, last_run_id),"
+                    " last_run_at = COALESCE(excluded.last_run_at, last_run_at), last_run_rows = COALESCE(excluded.last_run_rows, last_run_rows),"
+                    " last_run_failed = COALESCE(excluded.last_run_failed, last_run_failed)",
+                    (entry.path, entry.name, issue, detect_type(entry.path), root, _created(entry), _hypothesis(entry.path), signature,
+                     run_id, run_at, rows, failed))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return len(updates) + len(removed)
+
+
+def detect_type(path: str) -> str | None:
+    """Infers the experiment type from the files the scaffolders write."""
+    try:
+        names = os.listdir(path)
+    except FileNotFoundError:
+        return None
+    if "flow.dag.yaml" in names:
+        return ExperimentType.PROMPT_FLOW.value
+    if any(name.endswith(".prompty") for name in names):
+        return ExperimentType.PROMPTY.value
+    if any(name.endswith(".ipynb") for name in names):
+        return ExperimentType.JUPYTER_NOTEBOOK.value
+    if any(name.endswith(".py") for name in names):
+        return ExperimentType.PYTHON.value
+    return None
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _signature(entry):
+    parts = [entry.stat().st_mtime_ns]
+    for name in ("README.md", "runs"):
+        try:
+            parts.append(os.stat(os.path.join(entry.path, name)).st_mtime_ns)
+        except FileNotFoundError:
+            parts.append(0)
+    return ":".join(str(part) for part in parts)
+
+
+def _created(entry):
+    stat = entry.stat()
+    return getattr(stat, "st_birthtime", stat.st_ctime)
+
+
+def _hypothesis(path):
+    """Returns the text of the README's `## Hypothesis` section."""
+    try:
+        with open(os.path.join(path, "README.md")) as file:
+            readme = file.read()
+    except FileNotFoundError:
+        return ""
+    match = re.search(r"^## Hypothesis[ \t]*\n(.*?)(?=^## |\Z)", readme, re.MULTILINE | re.DOTALL)
+    return match.group(1).strip() if match else ""
+
+
+def _last_run(path):
+    runs = os.path.join(path, "runs")
+    try:
+        names = sorted(name for name in os.listdir(runs) if name.endswith(".jsonl"))
+    except FileNotFoundError:
+        return None, None, None, None
+    if not names:
+        return None, None, None, None
+
+    latest = os.path.join(runs, names[-1])
+    rows = succeeded = 0
+    with open(latest, "rb") as file:
+        for line in file:
+            rows += 1
+            # Checking the raw bytes avoids parsing what may be a very large output file
+            succeeded += b'"error": null' in line
+    return names[-1].removesuffix(".jsonl"), os.stat(latest).st_mtime, rows, rows - succeeded
@@ -0,0 +1,395 @@
+import json
+import os
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.runner import RUNS_DIR
+
+README_FILE = "README.md"
+FINDINGS_HEADING = "## Findings"
+# The report is kept between these markers, so rerunning a comparison replaces it and keeps any notes around it
+REPORT_START = "<!-- compare:start -->"
+REPORT_END = "<!-- compare:end -->"
+
+# Input fields holding the expected output, in order of preference, when no reference field is given
+REFERENCE_FIELDS = ("expected", "ground_truth", "answer", "reference")
+SCORE_FIELD = "score"
+
+DEFAULT_CHUNK_ROWS = 65_536
+DEFAULT_RESAMPLES = 1000
+# Upper bound on the resampled values held at once by the bootstrap
+_BOOTSTRAP_BATCH_ELEMENTS = 1 << 22
+
+# One value per record and column, in this order; the output text is only kept long enough to compute the exact match
+_COLUMNS = {
+    "row": np.int64,
+    "latency": np.float64,
+    "prompt_tokens": np.int64,
+    "completion_tokens": np.int64,
+    "failed": np.bool_,
+    # 1.0 or 0.0, NaN without a reference
+    "exact_match": np.float64,
+    # NaN without a score
+    "score": np.float64,
+}
+
+
+@dataclass(frozen=True)
+class Interval:
+    mean: float
+    low: float
+    high: float
+
+    @property
+    def significant(self):
+        return self.low > 0 or self.high < 0
+
+
+@dataclass(frozen=True)
+class VariantStats:
+    variant: str
+    rows: int
+    failed: int
+    latency_p50: float
+    latency_p95: float
+    latency_p99: float
+    prompt_tokens: float
+    completion_tokens: float
+    exact_match: float | None
+    score_mean: float | None
+    score_p05: float | None
+    score_p50: float | None
+    score_p95: float | None
+
+
+@dataclass(frozen=True)
+class PairedComparison:
+    baseline: str
+    variant: str
+    rows: int
+    # Differences variant minus baseline, with bootstrap confidence intervals
+    latency: Interval
+    tokens: Interval
+    exact_match: Interval | None
+    score: Interval | None
+
+
+@dataclass(frozen=True)
+class ComparisonReport:
+    runs: list[str]
+    variants: list[VariantStats]
+    comparisons: list[PairedComparison]
+    confidence: float
+
+
+def latest_run(experiment_dir: str) -> str:
+    """Returns the most recent run output of an experiment."""
+    runs = os.path.join(experiment_dir, RUNS_DIR)
+    try:
+        names = sorted(name for name in os.listdir(runs) if name.endswith(".jsonl"))
+    except FileNotFoundError:
+        names = []
+    if not names:
+        raise FileNotFoundError(f"No run outputs found in {runs}")
+    return os.path.join(runs, names[-1])
+
+
+def load_columns(paths: list[str], reference_field: str | None = None, score_field: str = SCORE_FIELD,
+                 chunk_rows: int = DEFAULT_CHUNK_ROWS) -> dict[str, dict[str, np.ndarray]]:
+    """Reads run outputs into one set of NumPy columns per variant.
+
+    Records are parsed `chunk_rows` at a time and packed into column arrays, so memory holds
+    a few dozen bytes per row rather than the parsed records.
+    """
+    chunks: dict[str, dict[str, list[np.ndarray]]] = {}
+    for path in paths:
+        with open(path, "rb") as file:
+            while True:
+                lines = [line for line in _read_lines(file, chunk_rows) if line.strip()]
+                if not lines:
+                    break
+                _parse_chunk(lines, reference_field, score_field, chunks)
+
+    return {variant: {name: np.concatenate(parts) for name, parts in columns.items()}
+            for variant, columns in chunks.items()}
+
+
+def _read_lines(file, count):
+    lines = []
+    for line in file:
+        lines.append(line)
+        if len(lines) == count:
+            break
+    return lines
+
+
+def _parse_chunk(lines, reference_field, score_field, chunks):
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            # The last line of an interrupted run may be cut short
+            continue
+
+    buffer = record_columns(records, reference_field, score_field)
+    variants = np.array([record["variant"] for record in records], dtype=object)
+    for variant in np.unique(variants):
+        selected = np.flatnonzero(variants == variant)
+        columns = chunks.setdefault(variant, {name: [] for name in _COLUMNS})
+        for name, column in buffer.items():
+            columns[name].append(column[selected])
+
+
+def record_columns(records: list[dict], reference_field: str | None = None, score_field: str = SCORE_FIELD) -> dict[str, np.ndarray]:
+    """Packs run records into the comparison columns, one value per record."""
+    values: dict[str, list] = {name: [] for name in _COLUMNS}
+    row, latency, prompt_tokens, completion_tokens, failed, exact_match, score = values.values()
+
+    for record in records:
+        row.append(record["row"])
+        latency.append(np.nan if record.get("latency") is None else record["latency"])
+        prompt_tokens.append(record.get("prompt_tokens") or 0)
+        completion_tokens.append(record.get("completion_tokens") or 0)
+        failed.append(record.get("error") is not None)
+        exact_match.append(_exact_match(record, reference_field))
+        score.append(_score(record, score_field))
+
+    return {name: np.array(values[name], dtype=dtype) for name, dtype in _COLUMNS.items()}
+
+
+def _output_text(record):
+    output = record.get("output")
+    if isinstance(output, dict) and len(output) == 1:
+        output = next(iter(output.values()))
+    return None if output is None else str(output)
+
+
+def _exact_match(record, reference_field):
+    inputs = record.get("inputs") or {}
+    field = reference_field or next((name for name in REFERENCE_FIELDS if name in inputs), None)
+    if field is None or inputs.get(field) is None:
+        return np.nan
+    text = _output_text(record)
+    return float(text is not None and _normalise(text) == _normalise(str(inputs[field])))
+
+
+def _normalise(text):
+    return " ".join(text.split()).casefold()
+
+
+def _score(record, score_field):
+    value = record.get(score_field)
+    output = record.get("output")
+    if value is None and isinstance(output, dict):
+        value = output.get(score_field)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def variant_stats(variant: str, columns: dict[str, np.ndarray]) -> VariantStats:
+    succeeded = ~columns["failed"]
+    latency = columns["latency"][succeeded & ~np.isnan(columns["latency"])]
+    p50, p95, p99 = np.percentile(latency, [50, 95, 99]) if latency.size else (np.nan,) * 3
+    exact = columns["exact_match"][~np.isnan(columns["exact_match"])]
+    scores = columns["score"][~np.isnan(columns["score"])]
+    score_p05, score_p50, score_p95 = np.percentile(scores, [5, 50, 95]) if scores.size else (None,) * 3
+
+    return VariantStats(
+        variant=variant,
+        rows=len(columns["row"]),
+        failed=int(columns["failed"].sum()),
+        latency_p50=float(p50),
+        latency_p95=float(p95),
+        latency_p99=float(p99),
+        prompt_tokens=float(columns["prompt_tokens"].mean()) if len(columns["row"]) else 0.0,
+        completion_tokens=float(columns["completion_tokens"].mean()) if len(columns["row"]) else 0.0,
+        exact_match=float(exact.mean()) if exact.size else None,
+        score_mean=float(scores.mean()) if scores.size else None,
+        score_p05=_optional_float(score_p05),
+        score_p50=_optional_float(score_p50),
+        score_p95=_optional_float(score_p95),
+    )
+
+
+def _optional_float(value):
+    return None if value is None else float(value)
+
+
+def paired_bootstrap(differences: np.ndarray, resamples: int = DEFAULT_RESAMPLES, confidence: float = 0.95,
+                     seed: int = 0) -> list[Interval | None]:
+    """Returns the mean of each column of paired differences with a percentile bootstrap confidence interval.
+
+    `differences` has one row per paired row and one column per metric, NaN where a metric is missing.
+    Each resample is drawn as how often every row is picked, so all metrics are resampled together
+    with one matrix product. Resamples are drawn in batches of at most about four million counts.
+    Columns without any value get None.
+    """
+    differences = np.asarray(differences, dtype=np.float64).reshape(len(differences), -1)
+    count, metrics = differences.shape
+    valid = ~np.isnan(differences)
+    present = valid.any(axis=0)
+    if count == 0 or not present.any():
+        return [None] * metrics
+
+    values = np.where(valid, differences, 0.0)
+    weights = valid.astype(np.float64)
+    rng = np.random.default_rng(seed)
+    means = np.empty((resamples, metrics))
+    batch = max(1, _BOOTSTRAP_BATCH_ELEMENTS // count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for start in range(0, resamples, batch):
+            size = min(batch, resamples - start)
+            picks = rng.multinomial(count, np.full(count, 1 / count), size=size).astype(np.float64)
+            means[start:start + size] = (picks @ values) / (picks @ weights)
+
+        tail = (1 - confidence) / 2 * 100
+        low, high = np.nanpercentile(means[:, present], [tail, 100 - tail], axis=0)
+        mean = values.sum(axis=0) / weights.sum(axis=0)
+
+    intervals: list[Interval | None] = [None] * metrics
+    for position, column in enumerate(np.flatnonzero(present)):
+        intervals[column] = Interval(float(mean[column]), float(low[position]), float(high[position]))
+    return intervals
+
+
+def compare_variants(baseline: str, variant: str, columns: dict[str, dict[str, np.ndarray]],
+                     resamples: int = DEFAULT_RESAMPLES, confidence: float = 0.95, seed: int = 0) -> PairedComparison:
+    """Compares two variants on the rows both completed without error."""
+    first, second = _paired(columns[baseline], columns[variant])
+    differences = np.column_stack([
+        second["latency"] - first["latency"],
+        _total_tokens(second) - _total_tokens(first),
+        second["exact_match"] - first["exact_match"],
+        second["score"] - first["score"],
+    ])
+    latency, tokens, exact_match, score = paired_bootstrap(differences, resamples, confidence, seed)
+
+    return PairedComparison(
+        baseline=baseline,
+        variant=variant,
+        rows=len(first["row"]),
+        latency=latency or Interval(np.nan, np.nan, np.nan),
+        tokens=tokens or Interval(np.nan, np.nan, np.nan),
+        exact_match=exact_match,
+        score=score,
+    )
+
+
+def _total_tokens(columns):
+    return (columns["prompt_tokens"] + columns["completion_tokens"]).astype(np.float64)
+
+
+def _paired(first, second):
+    """Aligns two variants on their shared, successful rows."""
+    first = _successful_by_row(first)
+    second = _successful_by_row(second)
+    _, first_index, second_index = np.intersect1d(first["row"], second["row"], assume_unique=True, return_indices=True)
+    return ({name: values[first_index] for name, values in first.items()},
+            {name: values[second_index] for name, values in second.items()})
+
+
+def _successful_by_row(columns):
+    succeeded = np.flatnonzero(~columns["failed"])
+    # A row written twice, e.g. by overlapping runs, counts once
+    _, unique = np.unique(columns["row"][succeeded], return_index=True)
+    selected = succeeded[unique]
+    return {name: values[selected] for name, values in columns.items()}
+
+
+def compare_runs(paths: list[str], baseline: str | None = None, reference_field: str | None = None,
+                 score_field: str = SCORE_FIELD, resamples: int = DEFAULT_RESAMPLES, confidence: float = 0.95,
+                 seed: int = 0, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> ComparisonReport:
+    """Summarises every variant in the run outputs and compares each one with `baseline` (default: the first variant)."""
+    return compare_columns(load_columns(paths, reference_field, score_field, chunk_rows), paths, baseline, resamples, confidence, seed)
+
+
+def compare_columns(columns: dict[str, dict[str, np.ndarray]], runs: list[str], baseline: str | None = None,
+                    resamples: int = DEFAULT_RESAMPLES, confidence: float = 0.95, seed: int = 0) -> ComparisonReport:
+    """Like `compare_runs`, for columns already loaded, e.g. from the run history."""
+    if not columns:
+        raise ValueError(f"No results found in {', '.join(runs)}")
+    variants = sorted(columns)
+    baseline = baseline or variants[0]
+    if baseline not in columns:
+        raise ValueError(f"Unknown baseline variant {baseline}. Found {', '.join(variants)}")
+
+    return ComparisonReport(
+        runs=runs,
+        variants=[variant_stats(variant, columns[variant]) for variant in variants],
+        comparisons=[compare_variants(baseline, variant, columns, resamples, confidence, seed)
+                     for variant in variants if variant != baseline],
+        confidence=confidence,
+    )
+
+
+def format_report(report: ComparisonReport) -> str:
+    """Renders the report as Markdown tables."""
+    runs = ", ".join(f"`{os.path.basename(path)}`" for path in report.runs)
+    lines = [f"Compared {runs}.", "",
+             "| Variant | Rows | Failed | Latency p50 | p95 | p99 | Prompt tokens | Completion tokens | Exact match | Score mean | Score p5 / p50 / p95 |",
+             "| --- | ---: | ---: | ---: | ---: | ---: | ---: | ---: | ---: | ---: | ---: |"]
+    for stats in report.variants:
+        scores = "-" if stats.score_p50 is None else f"{stats.score_p05:.3g} / {stats.score_p50:.3g} / {stats.score_p95:.3g}"
+        lines.append(f"| {stats.variant} | {stats.rows} | {stats.failed} | {_seconds(stats.latency_p50)} | {_seconds(stats.latency_p95)} "
+                     f"| {_seconds(stats.latency_p99)} | {stats.prompt_tokens:.1f} | {stats.completion_tokens:.1f} "
+                     f"| {_percent(stats.exact_match)} | {_number(stats.score_mean)} | {scores} |")
+
+    if report.comparisons:
+        confidence = f"{report.confidence:.0%}"
+        lines += ["", f"Paired differences against {report.comparisons[0].baseline} with {confidence} bootstrap confidence intervals:", "",
+                  "| Variant | Paired rows | Latency | Tokens | Exact match | Score |",
+                  "| --- | ---: | --- | --- | --- | --- |"]
+        for comparison in report.comparisons:
+            lines.append(f"| {comparison.variant} | {comparison.rows} | {_interval(comparison.latency, _seconds)} "
+                         f"| {_interval(comparison.tokens, _number)} | {_interval(comparison.exact_match, _percent)} "
+                         f"| {_interval(comparison.score, _number)} |")
+        lines += ["", "Intervals marked * exclude zero."]
+    return "\n".join(lines)
+
+
+def _seconds(value):
+    return "-" if value is None or np.isnan(value) else f"{value * 1000:.3g} ms"
+
+
+def _percent(value):
+    return "-" if value is None or np.isnan(value) else f"{value:.1%}"
+
+
+def _number(value):
+    return "-" if value is None or np.isnan(value) else f"{value:.3g}"
+
+
+def _interval(interval, format):
+    if interval is None or np.isnan(interval.mean):
+        return "-"
+    sign = "+" if interval.mean >= 0 else ""
+    marker = "*" if interval.significant else ""
+    return f"{sign}{format(interval.mean)} [{format(interval.low)}, {format(interval.high)}]{marker}"
+
+
+def write_findings(readme: str, report: str):
+    """Puts `report` into the README's findings section, replacing the report of an earlier comparison."""
+    try:
+        with open(readme) as file:
+            text = file.read()
+    except FileNotFoundError:
+        text = ""
+
+    block = f"{REPORT_START}\n{report}\n{REPORT_END}"
+    existing = re.compile(f"{re.escape(REPORT_START)}.*?{re.escape(REPORT_END)}", re.DOTALL)
+    if existing.search(text):
+        text = existing.sub(lambda _: block, text, count=1)
+    else:
+        heading = re.search(f"^{re.escape(FINDINGS_HEADING)}[ \\t]*\\n", text, re.MULTILINE)
+        if heading:
+            text = f"{text[:heading.end()]}\n{block}\n{text[heading.end():]}"
+        else:
+            text = f"{text.rstrip()}\n\n{FINDINGS_HEADING}\n\n{block}\n"
+
+    with open(readme, "w") as file:
+        file.write(text)
@@ -1 +1,18 @@
+import os
+
 DEFAULT_EXPERIMENT_DIR = "./app/flow/"
+
+ARTEFACTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "artefacts")
+
+# Set to "1"/"true" to scaffold prompt flows with the `pf flow init` CLI instead of the bundled templates
+USE_PF_CLI_ENV_VAR = "PROMPT_IGNITE_USE_PF_CLI"
+
+# SQLite catalog of all experiments, overridable with PROMPT_IGNITE_CATALOG
+DEFAULT_CATALOG_PATH = os.path.join(".prompt-ignite", "catalog.sqlite")
+CATALOG_ENV_VAR = "PROMPT_IGNITE_CATALOG"
+
+# Unix socket of the optional scaffolding daemon, overridable with PROMPT_IGNITE_DAEMON_SOCKET.
+# Set PROMPT_IGNITE_NO_DAEMON=1 to always run commands in-process
+DEFAULT_DAEMON_SOCKET = os.path.join(".prompt-ignite", "daemon.sock")
+DAEMON_SOCKET_ENV_VAR = "PROMPT_IGNITE_DAEMON_SOCKET"
+NO_DAEMON_ENV_VAR = "PROMPT_IGNITE_NO_DAEMON"
@@ -0,0 +1,304 @@
+import io
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from src.config import DAEMON_SOCKET_ENV_VAR, DEFAULT_DAEMON_SOCKET, NO_DAEMON_ENV_VAR
+
+# Kept light: the client half of this module is imported by every forwarded CLI command
+
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 64
+REQUEST_TIMEOUT = 120
+BUSY_RETRIES = 5
+BUSY_BACKOFF = 0.05
+_MAX_REQUEST_BYTES = 1024 * 1024
+# Variables that change what a command does. Requests are only served when the client's match the daemon's
+_SETTINGS_PREFIX = "PROMPT_IGNITE_"
+# Only read by the client to find the daemon
+_CLIENT_SETTINGS = (DAEMON_SOCKET_ENV_VAR, NO_DAEMON_ENV_VAR)
+
+
+def socket_path() -> str:
+    return os.environ.get(DAEMON_SOCKET_ENV_VAR) or DEFAULT_DAEMON_SOCKET
+
+
+def settings(environ=None) -> dict[str, str]:
+    """Returns the environment variables a command's result depends on, such as the catalog path.
+
+    `VIRTUAL_ENV` is the virtual environment a command ends up in, i.e. the project's `.venv` when
+    none is active, so a daemon that connected to it still serves clients that did not.
+    """
+    from src.environment import active_virtual_env, project_virtual_env
+
+    environ = os.environ if environ is None else environ
+    values = {name: value for name, value in environ.items() if name.startswith(_SETTINGS_PREFIX) and name not in _CLIENT_SETTINGS}
+    venv = active_virtual_env(environ) or project_virtual_env()
+    if venv:
+        values["VIRTUAL_ENV"] = venv
+    return values
+
+
+class DaemonError(Exception):
+    """The daemon accepted a request but could not answer it."""
+
+
+def send(command: str, args: dict | None = None, path: str | None = None, timeout: float = REQUEST_TIMEOUT) -> dict | None:
+    """Sends one request and returns the response, or None when no daemon is listening."""
+    path = path or socket_path()
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return None
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.settimeout(timeout)
+        try:
+            connection.connect(path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # A socket left behind by a daemon that is gone
+            return None
+        request = {"command": command, "args": args or {}, "cwd": os.getcwd(), "env": settings()}
+        connection.sendall(json.dumps(request).encode() + b"\n")
+        response = _read_line(connection)
+    except OSError as e:
+        raise DaemonError(f"No answer from the daemon at {path}: {e}") from None
+    finally:
+        connection.close()
+    if not response:
+        raise DaemonError(f"The daemon at {path} closed the connection")
+    return json.loads(response)
+
+
+def forward(command: str, args: dict | None = None, path: str | None = None) -> dict | None:
+    """Runs a command on the daemon when one is running for this directory, else returns None to run it in-process.
+
+    A busy daemon is retried with exponential backoff before giving up and running the command in-process.
+    Commands are not forwarded while tracing, so `--profile` keeps measuring the local phases.
+    """
+    from src import tracing
+
+    if os.environ.get(NO_DAEMON_ENV_VAR, "").lower() in ("1", "true", "yes") or tracing._tracer is not None:
+        return None
+    for attempt in range(BUSY_RETRIES + 1):
+        response = send(command, args, path)
+        if response is None or response.get("unsupported"):
+            return None
+        if not response.get("busy"):
+            return response
+        time.sleep(BUSY_BACKOFF * 2**attempt)
+    return None
+
+
+def _read_line(connection):
+    chunks = []
+    size = 0
+    while True:
+        chunk = connection.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+        if chunk.endswith(b"\n") or size > _MAX_REQUEST_BYTES:
+            break
+    return b"".join(chunks)
+
+
+class _ThreadOutput(io.TextIOBase):
+    """Stands in for `sys.stdout` and sends each worker thread's prints to that thread's capture buffer."""
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+        self._local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self._fallback).write(text)
+
+    def flush(self):
+        buffer = getattr(self._local, "buffer", None)
+        (buffer or self._fallback).flush()
+
+    @contextmanager
+    def capture(self):
+        self._local.buffer = io.StringIO()
+        try:
+            yield self._local.buffer
+        finally:
+            self._local.buffer = None
+
+
+class Daemon:
+    """Serves create and list requests over a Unix socket from one warm process.
+
+    The experiment handler, every experiment type and the templates are loaded once at startup.
+    Requests run on `workers` threads; up to `queue_size` more wait in a queue and anything beyond
+    is answered with `busy` at once, so clients back off instead of piling up connections.
+    """
+
+    def __init__(self, path: str | None = None, workers: int = DEFAULT_WORKERS, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.path = path or socket_path()
+        self.workers = workers
+        self.queue_size = queue_size
+        self.cwd = os.path.realpath(os.getcwd())
+        self.served = 0
+        self.running = 0
+        self._queue = None
+        self._server = None
+        self._executor = None
+        self._output = None
+        self._env_signature = None
+
+    def warm_up(self):
+        from src.catalog import Catalog
+        from src.experiment_handler import ExperimentHandler
+        from src.templates import default_store
+
+        ExperimentHandler()
+        self._env_signature = _signature(".env")
+        for type in ExperimentHandler._experiments.types():
+            ExperimentHandler._experiments.get(type)
+        default_store().refresh()
+        Catalog().close()
+
+    async def serve(self, ready=None):
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.warm_up()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if send("ping", path=self.path) is not None:
+            raise DaemonError(f"A daemon is already listening on {self.path}")
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        self._queue = asyncio.Queue(self.queue_size)
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="daemon")
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._server = await asyncio.start_unix_server(self._handle, self.path, limit=_MAX_REQUEST_BYTES)
+        self._output = _ThreadOutput(sys.stdout)
+        sys.stdout = self._output
+        try:
+            if ready:
+                ready()
+            async with self._server:
+                await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            for task in workers:
+                task.cancel()
+            self._executor.shutdown(wait=True)
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            sys.stdout = self._output._fallback
+
+    async def _handle(self, reader, writer):
+        import asyncio
+
+        try:
+            request = json.loads(await reader.readline())
+            command = request.get("command")
+            if command == "ping":
+                response = self._status()
+            elif command == "shutdown":
+                response = {"ok": True}
+                self._server.close()
+            elif os.path.realpath(request.get("cwd", "")) != self.cwd:
+                # Relative paths and .env would resolve differently, so the client runs the command itself
+                response = {"ok": False, "unsupported": True, "error": f"The daemon serves {self.cwd}"}
+            elif self._queue.full():
+                response = {"ok": False, "busy": True, "error": f"Daemon busy, {self._queue.qsize()} requests queued"}
+            else:
+                future = asyncio.get_running_loop().create_future()
+                self._queue.put_nowait((request, future))
+                response = await future
+        except (ValueError, AttributeError) as e:
+            response = {"ok": False, "error": f"Invalid request: {e}"}
+        try:
+            writer.write(json.dumps(response, default=str).encode() + b"\n")
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _worker(self):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        while True:
+            request, future = await self._queue.get()
+            self.running += 1
+            try:
+                response = await loop.run_in_executor(self._executor, self._execute, request)
+            finally:
+                self.running -= 1
+                self.served += 1
+            if not future.cancelled():
+                future.set_result(response)
+
+    def _execute(self, request):
+        operation = OPERATIONS.get(request.get("command"))
+        if operation is None:
+            return {"ok": False, "error": f"Unknown command: {request.get('command')}"}
+        self._reload_env()
+        differing = _differing_settings(request.get("env", {}), settings(os.environ))
+        if differing:
+            # The client runs the command itself rather than get an answer for another catalog or setup
+            return {"ok": False, "unsupported": True, "error": f"The daemon runs with different {', '.join(differing)}"}
+        with self._output.capture() as output:
+            try:
+                result = operation(**request.get("args", {}))
+                return {"ok": True, "result": result, "output": output.getvalue()}
+            except Exception as e:
+                return {"ok": False, "error": f"{type(e).__name__}: {e}", "output": output.getvalue()}
+
+    def _reload_env(self):
+        # `.env` is re-read only when it changed, instead of on every request like a fresh process would
+        signature = _signature(".env")
+        if signature != self._env_signature:
+            from src.environment import read_env_file
+
+            os.environ.update(read_env_file(".env") or {})
+            self._env_signature = signature
+
+    def _status(self):
+        return {"ok": True, "result": {"pid": os.getpid(), "cwd": self.cwd, "workers": self.workers,
+                                       "running": self.running, "queued": self._queue.qsize(), "served": self.served}}
+
+
+def _differing_settings(client, daemon):
+    return sorted(name for name in client.keys() | daemon.keys() if client.get(name, "") != daemon.get(name, ""))
+
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _create(name: str, type: str, dir: str):
+    from src.experiment_handler import ExperimentHandler
+
+    ExperimentHandler.create(name=name, type=type, dir=dir, raise_errors=True)
+
+
+def _list(type: str | None = None, dirs: list[str] | None = None, refresh: bool = True, limit: int | None = None,
+          query: str | None = None, rescan: bool = False):
+    from dataclasses import asdict
+
+    from src.catalog import Catalog
+
+    with Catalog() as catalog:
+        if refresh or rescan:
+            catalog.refresh(dirs, full=rescan)
+        entries = catalog.search(query, limit=limit) if query is not None else catalog.experiments(type=type, limit=limit)
+    return [asdict(entry) for entry in entries]
+
+
+OPERATIONS = {"create": _create, "list": _list}
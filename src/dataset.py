@@ -0,0 +1,153 @@
+import json
+import mmap
+import os
+import random
+import struct
+from collections.abc import Iterator
+
+import numpy as np
+
+INDEX_SUFFIX = ".idx"
+
+_INDEX_MAGIC = b"PIJX"
+# Version 2 leaves out lines of only whitespace, whatever their length
+_INDEX_VERSION = 2
+# magic, version, source size, source mtime_ns, row count
+_INDEX_HEADER = struct.Struct("<4sIqqq")
+_SCAN_CHUNK = 64 * 1024 * 1024
+# The bytes that bytes.strip() removes, apart from the newline ending every line
+_WHITESPACE = np.frombuffer(b" \t\r\f\v", dtype=np.uint8)
+
+
+class JsonlDataset:
+    """Random access to the rows of a JSONL file through a memory map and a line-offset index.
+
+    The index holds the start offset of every line that is not blank. It is persisted next to the file
+    as `<file>.idx` and rebuilt when the file's size or mtime changes, so opening a large dataset
+    a second time costs no parsing at all.
+    """
+
+    def __init__(self, path: str, index_path: str | None = None):
+        self.path = path
+        self.index_path = index_path or f"{path}{INDEX_SUFFIX}"
+        self._file = open(path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._size = stat.st_size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._size else b""
+        self._offsets = self._load_index(stat) if os.path.exists(self.index_path) else None
+        if self._offsets is None:
+            self._offsets = self._build_index(stat)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index: int) -> dict:
+        return json.loads(self.raw(index))
+
+    def __iter__(self):
+        for _, row in self.rows():
+            yield row
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def raw(self, index: int) -> bytes:
+        """Returns the undecoded bytes of a row."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Row {index} out of range for {len(self)} rows")
+        start = int(self._offsets[index])
+        end = self._mmap.find(b"\n", start)
+        return self._mmap[start:end if end != -1 else self._size]
+
+    def raw_rows(self, start: int = 0, stop: int | None = None) -> list[bytes]:
+        """Returns the undecoded bytes of the rows from `start` up to `stop`, cut from one slice of the file."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return []
+        end = int(self._offsets[stop]) if stop < len(self) else self._size
+        first = int(self._offsets[start])
+        block = self._mmap[first:end]
+        rows = []
+        # The index already leaves out blank lines, so every offset is a row
+        for offset in (self._offsets[start:stop] - first).tolist():
+            newline = block.find(b"\n", offset)
+            rows.append(block[offset:newline if newline != -1 else len(block)].rstrip(b"\r"))
+        return rows
+
+    def rows(self, start: int = 0, stop: int | None = None) -> Iterator[tuple[int, dict]]:
+        """Yields (row index, row) from `start` up to `stop`."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for index in range(start, stop):
+            yield index, self[index]
+
+    def shard(self, index: int, count: int) -> range:
+        """Returns the contiguous row range of shard `index` out of `count`, balanced to within one row."""
+        if not 0 <= index < count:
+            raise ValueError(f"Shard index must be between 0 and {count - 1}")
+        size, remainder = divmod(len(self), count)
+        start = index * size + min(index, remainder)
+        return range(start, start + size + (index < remainder))
+
+    def sample(self, count: int, seed: int = 0) -> list[int]:
+        """Returns `count` distinct row indices chosen deterministically from `seed`, in file order."""
+        return sorted(random.Random(seed).sample(range(len(self)), min(count, len(self))))
+
+    def close(self):
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        self._file.close()
+
+    def _load_index(self, stat):
+        with open(self.index_path, "rb") as file:
+            header = file.read(_INDEX_HEADER.size)
+        if len(header) != _INDEX_HEADER.size:
+            return None
+        magic, version, size, mtime_ns, count = _INDEX_HEADER.unpack(header)
+        if (magic, version, size, mtime_ns) != (_INDEX_MAGIC, _INDEX_VERSION, stat.st_size, stat.st_mtime_ns):
+            return None
+        if count == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.memmap(self.index_path, dtype="<i8", mode="r", offset=_INDEX_HEADER.size, shape=(count,))
+
+    def _build_index(self, stat):
+        offsets = []
+        position = 0
+        while position < self._size:
+            chunk = np.frombuffer(self._mmap, dtype=np.uint8, count=min(_SCAN_CHUNK, self._size - position), offset=position)
+            starts = np.flatnonzero(chunk == ord("\n")) + position + 1
+            offsets.append(starts)
+            position += len(chunk)
+
+        # A line starts at 0 and after every newline, except after one that ends the file
+        starts = np.concatenate([np.zeros(1, dtype=np.int64), *offsets]).astype(np.int64)
+        starts = starts[starts < self._size]
+        ends = np.append(starts[1:] - 1, self._size)
+        lengths = ends - starts
+        keep = lengths > 0
+        # Only a line starting with whitespace can be blank, and those are rare enough to strip one by one
+        data = np.frombuffer(self._mmap, dtype=np.uint8) if self._size else np.empty(0, dtype=np.uint8)
+        candidates = np.flatnonzero(keep)
+        candidates = candidates[np.isin(data[starts[candidates]], _WHITESPACE)]
+        for position in candidates.tolist():
+            keep[position] = bool(self._mmap[starts[position]:ends[position]].strip())
+        starts = starts[keep]
+
+        self._write_index(stat, starts)
+        return starts
+
+    def _write_index(self, stat, starts):
+        temporary = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "wb") as file:
+                file.write(_INDEX_HEADER.pack(_INDEX_MAGIC, _INDEX_VERSION, stat.st_size, stat.st_mtime_ns, len(starts)))
+                file.write(starts.astype("<i8").tobytes())
+            os.replace(temporary, self.index_path)
+        except OSError:
+            # A read-only dataset directory still works, the index is just rebuilt next time
+            if os.path.exists(temporary):
+                os.unlink(temporary)
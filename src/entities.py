@@ -11,6 +11,18 @@ class Experiment(ABC):
     def create(self):
         pass
 
+    def templates(self) -> dict[str, str]:
+        """Returns the files written from templates, by path relative to the experiment, mapped to their template.
+
+        They are recorded in the experiment's template manifest, so `sync` can roll out later template changes.
+        """
+        return {}
+
+    def _run_command(self, command):
+        from src.executor import run_command
+
+        return run_command(command).returncode
+
 
 class ExperimentType(Enum):
     PROMPT_FLOW = "prompt-flow"
@@ -0,0 +1,103 @@
+import os
+import re
+import sys
+
+VENV_DIR = ".venv"
+
+_ENV_LINE = re.compile(r"^\s*(?:export\s+)?([A-Za-z_][A-Za-z0-9_.]*)\s*=\s*(.*?)\s*$")
+_DOUBLE_QUOTE_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", '"': '"', "\\": "\\"}
+
+# Parsed .env files keyed by absolute path, with the (mtime_ns, size) they were parsed at
+_env_cache: dict[str, tuple[tuple[int, int], dict[str, str]]] = {}
+
+
+def active_virtual_env(environ=None) -> str | None:
+    """Returns the virtual environment of the running interpreter or shell, if any."""
+    environ = os.environ if environ is None else environ
+    if environ.get("VIRTUAL_ENV"):
+        return environ["VIRTUAL_ENV"]
+    if sys.prefix != sys.base_prefix:
+        return sys.prefix
+    return None
+
+
+def project_virtual_env(root: str = ".") -> str | None:
+    """Returns the project's `.venv` directory when it has a valid virtual environment layout."""
+    venv = os.path.abspath(os.path.join(root, VENV_DIR))
+    if os.path.isfile(os.path.join(venv, "pyvenv.cfg")):
+        return venv
+    return None
+
+
+def activate_virtual_env(venv: str):
+    """Does in-process what `source <venv>/bin/activate` does, so child processes resolve the venv's tools."""
+    bin_dir = os.path.join(venv, "Scripts" if os.name == "nt" else "bin")
+    os.environ["VIRTUAL_ENV"] = venv
+    os.environ["PATH"] = os.pathsep.join([bin_dir, os.environ.get("PATH", "")])
+    os.environ.pop("PYTHONHOME", None)
+
+
+def read_env_file(path: str = ".env") -> dict[str, str] | None:
+    """Returns the variables of a .env file, or None when it does not exist.
+
+    The parsed result is cached in memory and only re-read when the file's mtime or size changes.
+    """
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        _env_cache.pop(path, None)
+        return None
+
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _env_cache.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    with open(path) as file:
+        values = parse_env(file.read())
+    _env_cache[path] = (signature, values)
+    return values
+
+
+def parse_env(text: str) -> dict[str, str]:
+    """Parses `KEY=value` lines with optional `export` prefixes, quoting and trailing comments."""
+    values = {}
+    for line in text.splitlines():
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+
+        match = _ENV_LINE.match(line)
+        if not match:
+            print(f"Error parsing line: {line.strip()}")
+            continue
+
+        name, value = match.groups()
+        values[name] = _parse_value(value)
+    return values
+
+
+def _parse_value(value):
+    if value[:1] in ("'", '"'):
+        quote = value[0]
+        end = _closing_quote(value, quote)
+        if end != -1:
+            inner = value[1:end]
+            if quote == '"':
+                inner = re.sub(r"\\(.)", lambda m: _DOUBLE_QUOTE_ESCAPES.get(m.group(1), m.group(0)), inner)
+            return inner
+
+    # Unquoted values end at the first comment preceded by whitespace
+    return re.split(r"\s+#", value, maxsplit=1)[0]
+
+
+def _closing_quote(value, quote):
+    index = 1
+    while index < len(value):
+        if value[index] == "\\" and quote == '"':
+            index += 2
+            continue
+        if value[index] == quote:
+            return index
+        index += 1
+    return -1
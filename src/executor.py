@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import os
+import signal
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+
+from src.tracing import span
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_STDERR_TAIL = 20
+STREAM_LIMIT = 2**20  # longest output line read without error
+
+# Called with (command, stream name, line) for every line a child process writes
+LogSink = Callable[[str, str, str], None]
+
+logger = logging.getLogger("prompt_ignite.commands")
+
+
+def log_to_logger(command: str, stream: str, line: str):
+    logger.debug("[%s] %s: %s", stream, command, line)
+
+
+@dataclass(frozen=True)
+class CommandResult:
+    command: str
+    returncode: int | None
+    duration: float
+    stderr_tail: list[str] = field(default_factory=list)
+    timed_out: bool = False
+
+    @property
+    def ok(self):
+        return self.returncode == 0 and not self.timed_out
+
+
+class CommandError(RuntimeError):
+    def __init__(self, result: CommandResult):
+        message = f"Error executing command: {result.command}"
+        if result.timed_out:
+            message = f"{message} (timed out after {result.duration:.1f}s)"
+        if result.stderr_tail:
+            message = f"{message}\n" + "\n".join(result.stderr_tail)
+        super().__init__(message)
+        self.result = result
+
+
+class CommandExecutor:
+    """Runs external commands as asyncio subprocesses with a cap on concurrent children.
+
+    Output is streamed line by line to `log_sink` instead of being buffered, and only the
+    last `stderr_tail` lines of stderr are kept for the result.
+    """
+
+    def __init__(self, max_concurrency: int | None = None, timeout: float | None = DEFAULT_TIMEOUT,
+                 log_sink: LogSink = log_to_logger, stderr_tail: int = DEFAULT_STDERR_TAIL):
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self.timeout = timeout
+        self.log_sink = log_sink
+        self.stderr_tail = stderr_tail
+        # asyncio primitives belong to one event loop, so each loop gets its own semaphore
+        self._semaphores: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+    async def run(self, command: str | Sequence[str], timeout: float | None = None, check: bool = True,
+                  cwd: str | None = None, env: dict[str, str] | None = None) -> CommandResult:
+        """Runs a shell string or an argument list. Raises `CommandError` on failure when `check` is set."""
+        timeout = self.timeout if timeout is None else timeout
+        async with self._semaphore():
+            display = command if isinstance(command, str) else " ".join(command)
+            with span("subprocess", "subprocess", concurrent=True, command=display) as trace:
+                result = await self._run(command, timeout, cwd, env)
+                trace.set(returncode=result.returncode, timed_out=result.timed_out)
+
+        if check and not result.ok:
+            raise CommandError(result)
+        return result
+
+    async def run_all(self, commands: Sequence[str | Sequence[str]], **kwargs) -> list[CommandResult]:
+        """Runs the commands concurrently, within the concurrency limit, and returns results in order."""
+        return list(await asyncio.gather(*(self.run(command, **kwargs) for command in commands)))
+
+    def run_sync(self, command: str | Sequence[str], **kwargs) -> CommandResult:
+        return asyncio.run(self.run(command, **kwargs))
+
+    def _semaphore(self):
+        loop = asyncio.get_running_loop()
+        for other in [other for other in self._semaphores if other.is_closed()]:
+            del self._semaphores[other]
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[loop]
+
+    async def _run(self, command, timeout, cwd, env):
+        display = command if isinstance(command, str) else " ".join(command)
+        env = os.environ.copy() if env is None else env
+        stderr_tail = deque(maxlen=self.stderr_tail)
+
+        start = time.perf_counter()
+        # A new session lets a timeout or cancellation kill the shell together with its children
+        options = {"stdout": asyncio.subprocess.PIPE, "stderr": asyncio.subprocess.PIPE, "cwd": cwd, "env": env,
+                   "start_new_session": os.name == "posix", "limit": STREAM_LIMIT}
+        if isinstance(command, str):
+            process = await asyncio.create_subprocess_shell(command, **options)
+        else:
+            process = await asyncio.create_subprocess_exec(*command, **options)
+
+        streams = asyncio.gather(
+            self._stream(display, "stdout", process.stdout, None),
+            self._stream(display, "stderr", process.stderr, stderr_tail),
+            process.wait())
+        try:
+            await asyncio.wait_for(streams, timeout)
+        except TimeoutError:
+            await _kill(process)
+            return CommandResult(display, process.returncode, time.perf_counter() - start, list(stderr_tail), timed_out=True)
+        except asyncio.CancelledError:
+            await _kill(process)
+            raise
+
+        return CommandResult(display, process.returncode, time.perf_counter() - start, list(stderr_tail))
+
+    async def _stream(self, command, name, stream, tail):
+        async for raw in stream:
+            line = raw.decode(errors="replace").rstrip("\r\n")
+            if tail is not None:
+                tail.append(line)
+            self.log_sink(command, name, line)
+
+
+async def _kill(process):
+    if process.returncode is None:
+        try:
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
+        await process.wait()
+
+
+_default_executor: CommandExecutor | None = None
+
+
+def default_executor() -> CommandExecutor:
+    """Returns the executor shared by every experiment type."""
+    global _default_executor
+    if _default_executor is None:
+        _default_executor = CommandExecutor()
+    return _default_executor
+
+
+def run_command(command: str | Sequence[str], **kwargs) -> CommandResult:
+    """Blocking helper around the shared executor for callers outside an event loop."""
+    return default_executor().run_sync(command, **kwargs)
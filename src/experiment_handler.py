@@ -1,42 +1,45 @@
 import os
 import re
-import subprocess
 
-from config import DEFAULT_EXPERIMENT_DIR
+from src.catalog import EXPERIMENT_DIR_PATTERN, Catalog
+from src.config import DEFAULT_EXPERIMENT_DIR
 from src.entities import ExperimentType
-from src.experiments.jupytor_notebook import JupyterNotebookExperiment
-from src.experiments.prompt_flow import PromptFlowExperiment
-from src.experiments.prompty import PromptyExperiment
-from src.experiments.pure_python import PythonExperiment
+from src.environment import VENV_DIR, activate_virtual_env, active_virtual_env, project_virtual_env, read_env_file
+from src.registry import ExperimentRegistry
+from src.sync import write_manifest
+from src.tracing import span
 
 
 class ExperimentHandler:
-    _experiments = {
-        ExperimentType.PROMPT_FLOW: PromptFlowExperiment,
-        ExperimentType.JUPYTER_NOTEBOOK: JupyterNotebookExperiment,
-        ExperimentType.PROMPTY: PromptyExperiment,
-        ExperimentType.PYTHON: PythonExperiment,
-    }
+    # Experiment modules are imported on first use of their type
+    _experiments = ExperimentRegistry()
 
     def __init__(self):
-        self._check_and_connect_virtual_env()
-        self._read_and_set_env_vars()
+        with span("handler.init"):
+            self._check_and_connect_virtual_env()
+            self._read_and_set_env_vars()
 
     def _check_and_connect_virtual_env(self):
         print("🔍 Checking if the virtual environment is active...")
-        if "VIRTUAL_ENV" not in os.environ:
-            print("Not in a virtual environment. Connecting to it...")
-            self._run_command("source .venv/bin/activate")
+        venv = active_virtual_env()
+        if venv:
+            print(f"✅ Already connected to a virtual environment: {venv}")
+            return
 
+        venv = project_virtual_env()
+        if venv:
+            print("Not in a virtual environment. Connecting to it...")
+            activate_virtual_env(venv)
             print("✅ Connected to the virtual environment!")
         else:
-            print(
-                f"✅ Already connected to a virtual environment: {os.environ['VIRTUAL_ENV']}")
+            print(f"⚠️ No virtual environment found. Run 'make setup-local-env' to create {VENV_DIR}")
 
     def _read_and_set_env_vars(self):
         print("🔍 Reading .env file...")
 
-        if not os.path.exists(".env"):
+        with span("env.load"):
+            values = read_env_file(".env")
+        if values is None:
             print("""
             No .env file found. Please create a .env file in the root directory of the project.
             The .env file should contain the following variables:
@@ -46,25 +49,7 @@ class ExperimentHandler:
             """)
             return
 
-        with open(".env") as file:
-            for line in file:
-                if not line.strip() or line.startswith("#"):
-                    continue
-                try:
-                    varname, value = line.strip().split("=", 1)
-                    os.environ[varname] = value
-                except ValueError:
-                    print(f"Error parsing line: {line.strip()}")
-
-    def _run_command(self, command):
-        env = os.environ.copy()
-        process = subprocess.Popen(
-            command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
-        stdout, stderr = process.communicate(timeout=30)
-        if process.returncode != 0:
-            raise RuntimeError(
-                f"Error executing experiment command: {command}")
-        return process.returncode
+        os.environ.update(values)
 
     @staticmethod
     def _get_experiment_name():
@@ -126,18 +111,44 @@ class ExperimentHandler:
         return chosen_directory
 
     @classmethod
-    def create(cls, name: str, type: ExperimentType, dir: str):
+    def create(cls, name: str, type: ExperimentType | str, dir: str, raise_errors: bool = False):
+        """Creates the experiment. Errors are reported and swallowed unless `raise_errors` is set.
+
+        Names following the `issue-{number}-{name}` convention are reserved in the catalog first,
+        so an issue number can only be used by one experiment. The templates the experiment was
+        created from are recorded in its template manifest for `sync`.
+        """
         try:
-            experiment = cls._experiments[type](name, dir)
-            experiment.create()
+            with span("experiment.create", experiment=name, type=getattr(type, "value", type)):
+                experiment = cls._experiments.get(type)(name, dir)
+                match = EXPERIMENT_DIR_PATTERN.match(name)
+                with Catalog() as catalog:
+                    with span("catalog.reserve"):
+                        reserved = match is not None and catalog.reserve(f"{dir}{name}", int(match.group(1)), type)
+                        scanned = catalog.scanned(dir) if reserved else None
+                    try:
+                        experiment.create()
+                    except BaseException:
+                        if reserved:
+                            catalog.release(f"{dir}{name}")
+                        raise
+                    # The root only changed by this experiment, so the next create need not scan it again
+                    if scanned is not None:
+                        catalog.mark_scanned(dir, scanned)
+                with span("manifest.write"):
+                    write_manifest(f"{dir}{name}", getattr(type, "value", type), experiment.templates(), {"name": name})
 
             print("🔥 Experiment setup complete! 🚀")
 
         except NotImplementedError:
             print("🛠️ This setup is not implemented yet!")
+            if raise_errors:
+                raise
             return
         except Exception as e:
             print(f"❌ Oops! Something went wrong. {e}")
+            if raise_errors:
+                raise
             return
 
 
@@ -1,6 +1,158 @@
+import os
+
 from src.entities import Experiment
+from src.notebooks import RUNNER_NOTEBOOK, code_cell, markdown_cell, new_notebook, write_notebook
+from src.templates import default_store
+from src.tracing import span
+
+# Paths relative to src/artefacts
+DATA_TEMPLATE = "prompt-flow/data.jsonl"
+README_TEMPLATE = "TEMPLATE-README.md"
+
+EXPLORATION_NOTEBOOK = "exploration.ipynb"
+DRY_RUN_ENV_VAR = "PROMPT_IGNITE_DRY_RUN"
 
 
 class JupyterNotebookExperiment(Experiment):
     def create(self):
-        raise NotImplementedError("Jupyter Notebook experiment not implemented yet.")
+        self.create_resources()
+        self.create_documentation()
+
+    def templates(self):
+        # The notebooks are generated rather than copied from templates
+        return {"data.jsonl": DATA_TEMPLATE, "README.md": README_TEMPLATE}
+
+    def create_resources(self):
+        print("🛠️ Creating the notebooks...")
+        with span("create_resources", type="jupyter"):
+            experiment_dir = f"{self.dir}{self.name}"
+            if os.path.exists(os.path.join(experiment_dir, RUNNER_NOTEBOOK)):
+                raise FileExistsError(f"Notebooks already exist: {experiment_dir}")
+
+            os.makedirs(experiment_dir, exist_ok=True)
+            default_store().materialise(DATA_TEMPLATE, os.path.join(experiment_dir, "data.jsonl"))
+            write_notebook(os.path.join(experiment_dir, EXPLORATION_NOTEBOOK), exploration_notebook(self.name))
+            write_notebook(os.path.join(experiment_dir, RUNNER_NOTEBOOK), runner_notebook(self.name))
+        print("✅ Notebooks created!")
+
+    def create_documentation(self):
+        print("🛠️ Creating experiment doc")
+
+        with span("create_documentation", type="jupyter"):
+            default_store().materialise(README_TEMPLATE, f"{self.dir}{self.name}/README.md", {"name": self.name})
+
+        print("✅ Experiment doc created!")
+
+
+def exploration_notebook(name: str) -> dict:
+    return new_notebook([
+        markdown_cell(f"""
+# {name}: data exploration
+
+A first look at the experiment's `data.jsonl`. The hypothesis goes in `README.md`.
+"""),
+        code_cell("""
+import json
+from collections import Counter
+"""),
+        code_cell("""
+with open("data.jsonl") as file:
+    rows = [json.loads(line) for line in file if line.strip()]
+print(f"{len(rows)} rows")
+"""),
+        code_cell("""
+fields = Counter(key for row in rows for key in row)
+for key, count in fields.most_common():
+    lengths = [len(str(row[key])) for row in rows if key in row]
+    print(f"{key}: {count} rows, length {min(lengths)}-{max(lengths)}, mean {sum(lengths) / len(lengths):.1f}")
+"""),
+        code_cell("""
+rows[:5]
+"""),
+    ])
+
+
+def runner_notebook(name: str) -> dict:
+    return new_notebook([
+        markdown_cell(f"""
+# {name}: runner
+
+Runs every variant over `data.jsonl` and writes one record per row to `runs/<run id>.jsonl`, in the format of
+`python src/main.py run`, so `python src/main.py compare` can compare the variants.
+
+Set `{DRY_RUN_ENV_VAR}=1` to answer with the prompt itself instead of calling the model, e.g. in CI.
+"""),
+        code_cell("""
+import json
+import os
+import time
+import uuid
+"""),
+        code_cell(f"""
+DATA_FILE = "data.jsonl"
+DEPLOYMENT_NAME = "gpt-35-turbo"
+VARIANTS = {{
+    "variant_0": {{"temperature": 1.0, "max_tokens": 120}},
+    "variant_1": {{"temperature": 0.2, "max_tokens": 120}},
+}}
+LIMIT = None
+DRY_RUN = os.environ.get("{DRY_RUN_ENV_VAR}", "").lower() in ("1", "true", "yes")
+""", tags=["parameters"]),
+        code_cell("""
+with open(DATA_FILE) as file:
+    rows = [json.loads(line) for line in file if line.strip()][:LIMIT]
+print(f"{len(rows)} rows")
+"""),
+        code_cell("""
+client = None
+if not DRY_RUN:
+    from openai import AzureOpenAI
+
+    client = AzureOpenAI(
+        api_key=os.environ["AZURE_OPENAI_API_KEY"],
+        azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+        api_version=os.environ.get("AZURE_OPENAI_API_VERSION", "2024-02-01"),
+    )
+
+
+def render_prompt(row):
+    # Please replace the prompt with your own
+    return f"Write a simple {row['text']} program that displays the greeting message."
+
+
+def complete(prompt, **params):
+    \"\"\"Returns the answer and the prompt and completion token counts.\"\"\"
+    if client is None:
+        tokens = len(prompt.split())
+        return prompt, tokens, tokens
+
+    response = client.chat.completions.create(model=DEPLOYMENT_NAME, messages=[{"role": "user", "content": prompt}], **params)
+    usage = response.usage
+    return response.choices[0].message.content or "", usage.prompt_tokens if usage else 0, usage.completion_tokens if usage else 0
+"""),
+        code_cell("""
+run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+output = os.path.join("runs", f"{run_id}.jsonl")
+os.makedirs("runs", exist_ok=True)
+
+with open(output, "w") as file:
+    for variant, params in VARIANTS.items():
+        for row, inputs in enumerate(rows):
+            record = {"run_id": run_id, "variant": variant, "row": row, "inputs": inputs}
+            start = time.perf_counter()
+            try:
+                text, prompt_tokens, completion_tokens = complete(render_prompt(inputs), **params)
+                record.update(output={"output": text}, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, error=None)
+            except Exception as e:
+                record.update(output=None, error=f"{type(e).__name__}: {e}")
+            record["latency"] = time.perf_counter() - start
+            file.write(json.dumps(record) + "\\n")
+print(f"Results written to {output}")
+"""),
+        markdown_cell("""
+## Findings
+
+Run `python src/main.py compare <experiment directory>` to compare the variants. The report is written to the
+Findings section of `README.md`.
+"""),
+    ])
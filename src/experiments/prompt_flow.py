@@ -1,42 +1,56 @@
 import os
-import shutil
-import subprocess
 
+from src.config import USE_PF_CLI_ENV_VAR
 from src.entities import Experiment
+from src.templates import default_store
+from src.tracing import span
+
+# Paths relative to src/artefacts
+FLOW_TEMPLATE_DIR = "prompt-flow"
+README_TEMPLATE = "TEMPLATE-README.md"
+FLOW_TEMPLATE_FILES = ("flow.dag.yaml", "hello.jinja2", "hello.py", "data.jsonl", "requirements.txt")
 
 
 class PromptFlowExperiment(Experiment):
+    def __init__(self, name, dir, use_pf_cli=None):
+        super().__init__(name, dir)
+        if use_pf_cli is None:
+            use_pf_cli = os.environ.get(USE_PF_CLI_ENV_VAR, "").lower() in ("1", "true", "yes")
+        self.use_pf_cli = use_pf_cli
+
     def create(self):
         self.create_resources()
         self.create_documentation()
 
+    def templates(self):
+        flow = {} if self.use_pf_cli else {filename: f"{FLOW_TEMPLATE_DIR}/{filename}" for filename in FLOW_TEMPLATE_FILES}
+        return {**flow, "README.md": README_TEMPLATE}
+
     def create_resources(self):
         print("🛠️ Creating the Prompt Flow...")
-        command = f'pf flow init --flow "{self.dir}{self.name}" --type standard'
-        self._run_command(command)
+        with span("create_resources", type="prompt-flow"):
+            if self.use_pf_cli:
+                command = f'pf flow init --flow "{self.dir}{self.name}" --type standard'
+                self._run_command(command)
+            else:
+                self._write_flow_templates()
         print("✅ Prompt Flow created!")
 
-    def create_documentation(self):
-        print("🛠️ Creating experiment doc")
+    def _write_flow_templates(self):
+        """Writes the standard flow from the bundled templates, equivalent to `pf flow init --type standard`."""
+        flow_dir = f"{self.dir}{self.name}"
+        if os.path.exists(os.path.join(flow_dir, "flow.dag.yaml")):
+            raise FileExistsError(f"Flow already exists: {flow_dir}")
 
-        shutil.copyfile('./src/artefacts/TEMPLATE-README.md', f"{self.dir}{self.name}/README.md")
+        os.makedirs(flow_dir, exist_ok=True)
+        store = default_store()
+        for filename in FLOW_TEMPLATE_FILES:
+            store.materialise(f"{FLOW_TEMPLATE_DIR}/{filename}", os.path.join(flow_dir, filename), {"name": self.name})
 
-        with open(f"{self.dir}{self.name}/README.md") as file:
-            filedata = file.read()
-
-        # Replace the target string
-        filedata = filedata.replace('{{name}}', self.name)
+    def create_documentation(self):
+        print("🛠️ Creating experiment doc")
 
-        # Write the file out again
-        with open(f"{self.dir}{self.name}/README.md", 'w') as file:
-            file.write(filedata)
+        with span("create_documentation", type="prompt-flow"):
+            default_store().materialise(README_TEMPLATE, f"{self.dir}{self.name}/README.md", {"name": self.name})
 
         print("✅ Experiment doc created!")
-
-    def _run_command(self, command):
-        env = os.environ.copy()
-        process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
-        stdout, stderr = process.communicate(timeout=30)
-        if process.returncode != 0:
-            raise RuntimeError(f'Error executing command: {command}')
-        return process.returncode
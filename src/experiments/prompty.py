@@ -1,6 +1,38 @@
+import os
+
 from src.entities import Experiment
+from src.templates import default_store
+from src.tracing import span
+
+# Paths relative to src/artefacts
+PROMPTY_TEMPLATE_DIR = "prompty"
+README_TEMPLATE = "TEMPLATE-README.md"
+PROMPTY_TEMPLATE_FILES = ("hello.prompty", "data.jsonl")
 
 
 class PromptyExperiment(Experiment):
     def create(self):
-        raise NotImplementedError("Prompty experiment not implemented yet.")
+        self.create_resources()
+        self.create_documentation()
+
+    def templates(self):
+        return {**{filename: f"{PROMPTY_TEMPLATE_DIR}/{filename}" for filename in PROMPTY_TEMPLATE_FILES}, "README.md": README_TEMPLATE}
+
+    def create_resources(self):
+        print("🛠️ Creating the Prompty...")
+        with span("create_resources", type="prompty"):
+            experiment_dir = f"{self.dir}{self.name}"
+            if os.path.exists(os.path.join(experiment_dir, "hello.prompty")):
+                raise FileExistsError(f"Prompty already exists: {experiment_dir}")
+
+            os.makedirs(experiment_dir, exist_ok=True)
+            default_store().materialise_tree(PROMPTY_TEMPLATE_DIR, experiment_dir, {"name": self.name})
+        print("✅ Prompty created!")
+
+    def create_documentation(self):
+        print("🛠️ Creating experiment doc")
+
+        with span("create_documentation", type="prompty"):
+            default_store().materialise(README_TEMPLATE, f"{self.dir}{self.name}/README.md", {"name": self.name})
+
+        print("✅ Experiment doc created!")
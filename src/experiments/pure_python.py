@@ -1,6 +1,40 @@
+import os
+
 from src.entities import Experiment
+from src.templates import default_store
+from src.tracing import span
+
+# Paths relative to src/artefacts
+PYTHON_TEMPLATE_DIR = "pure-python"
+README_TEMPLATE = "TEMPLATE-README.md"
+PYTHON_TEMPLATE_FILES = ("tool.py", "harness.py", "data.jsonl")
 
 
 class PythonExperiment(Experiment):
     def create(self):
-        raise NotImplementedError("Python experiment not implemented yet.")
+        self.create_resources()
+        self.create_documentation()
+
+    def templates(self):
+        return {**{filename: f"{PYTHON_TEMPLATE_DIR}/{filename}" for filename in PYTHON_TEMPLATE_FILES}, "README.md": README_TEMPLATE}
+
+    def create_resources(self):
+        print("🛠️ Creating the Python tool...")
+        with span("create_resources", type="pure-python"):
+            experiment_dir = f"{self.dir}{self.name}"
+            if os.path.exists(os.path.join(experiment_dir, "tool.py")):
+                raise FileExistsError(f"Python tool already exists: {experiment_dir}")
+
+            os.makedirs(experiment_dir, exist_ok=True)
+            store = default_store()
+            for filename in PYTHON_TEMPLATE_FILES:
+                store.materialise(f"{PYTHON_TEMPLATE_DIR}/{filename}", os.path.join(experiment_dir, filename), {"name": self.name})
+        print("✅ Python tool created!")
+
+    def create_documentation(self):
+        print("🛠️ Creating experiment doc")
+
+        with span("create_documentation", type="pure-python"):
+            default_store().materialise(README_TEMPLATE, f"{self.dir}{self.name}/README.md", {"name": self.name})
+
+        print("✅ Experiment doc created!")
@@ -0,0 +1,117 @@
+import os
+import re
+from dataclasses import dataclass, field
+
+FLOW_FILE = "flow.dag.yaml"
+DEFAULT_VARIANT = "default"
+
+_REFERENCE = re.compile(r"^\$\{([A-Za-z_][\w-]*)\.([\w.]+)\}$")
+
+
+@dataclass(frozen=True)
+class FlowNode:
+    name: str
+    type: str
+    source: str | None
+    inputs: dict = field(default_factory=dict)
+
+    def dependencies(self) -> set[str]:
+        """Names of the nodes whose output this node reads."""
+        names = set()
+        for value in self.inputs.values():
+            reference = parse_reference(value)
+            if reference and reference[0] != "inputs":
+                names.add(reference[0])
+        return names
+
+
+@dataclass(frozen=True)
+class Flow:
+    dir: str
+    inputs: dict
+    outputs: dict
+    nodes: list[FlowNode]
+    # node name -> variant id -> node definition
+    variants: dict[str, dict[str, FlowNode]] = field(default_factory=dict)
+
+    def variant_ids(self) -> list[str]:
+        """Returns `node.variant_id` for every variant, or `default` for a flow without variants."""
+        ids = [f"{node}.{variant}" for node, variants in self.variants.items() for variant in variants]
+        return ids or [DEFAULT_VARIANT]
+
+    def resolve(self, variant: str = DEFAULT_VARIANT) -> list[FlowNode]:
+        """Returns the nodes in execution order, with `variant` applied to its node.
+
+        Nodes with variants that are not selected use their default variant.
+        """
+        selected_node, _, selected_variant = variant.partition(".")
+        if variant != DEFAULT_VARIANT and selected_variant not in self.variants.get(selected_node, {}):
+            raise ValueError(f"Unknown variant: {variant}")
+
+        nodes = []
+        for node in self.nodes:
+            if node.name in self.variants:
+                variant_id = selected_variant if node.name == selected_node else next(iter(self.variants[node.name]))
+                node = self.variants[node.name][variant_id]
+            nodes.append(node)
+        return _topological_order(nodes)
+
+    def path(self, source: str) -> str:
+        return os.path.join(self.dir, source)
+
+
+def parse_reference(value) -> tuple[str, str] | None:
+    """Splits `${node.output}` or `${inputs.name}` into its parts."""
+    if not isinstance(value, str):
+        return None
+    match = _REFERENCE.match(value.strip())
+    return (match.group(1), match.group(2)) if match else None
+
+
+def load_flow(dir: str) -> Flow:
+    import yaml
+
+    with open(os.path.join(dir, FLOW_FILE)) as file:
+        definition = yaml.safe_load(file) or {}
+
+    nodes = []
+    for raw in definition.get("nodes", []):
+        nodes.append(_parse_node(raw["name"], raw))
+
+    variants = {}
+    for node_name, node_variants in (definition.get("node_variants") or {}).items():
+        default = node_variants.get("default_variant_id")
+        ordered = sorted(node_variants.get("variants", {}).items(), key=lambda item: item[0] != default)
+        variants[node_name] = {variant_id: _parse_node(node_name, raw["node"]) for variant_id, raw in ordered}
+
+    return Flow(dir=dir, inputs=definition.get("inputs") or {}, outputs=definition.get("outputs") or {}, nodes=nodes, variants=variants)
+
+
+def _parse_node(name, raw):
+    source = raw.get("source") or {}
+    return FlowNode(name=name, type=raw.get("type", ""), source=source.get("path"), inputs=dict(raw.get("inputs") or {}))
+
+
+def _topological_order(nodes):
+    by_name = {node.name: node for node in nodes}
+    ordered = []
+    visiting = set()
+    done = set()
+
+    def visit(node):
+        if node.name in done:
+            return
+        if node.name in visiting:
+            raise ValueError(f"Flow has a cycle through node: {node.name}")
+        visiting.add(node.name)
+        for dependency in sorted(node.dependencies()):
+            if dependency not in by_name:
+                raise ValueError(f"Node {node.name} references unknown node: {dependency}")
+            visit(by_name[dependency])
+        visiting.discard(node.name)
+        done.add(node.name)
+        ordered.append(node)
+
+    for node in nodes:
+        visit(node)
+    return ordered
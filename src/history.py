@@ -0,0 +1,337 @@
+import json
+import mmap
+import os
+import struct
+import zlib
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.compare import SCORE_FIELD, record_columns
+from src.runner import RUNS_DIR
+
+HISTORY_DIR = "history"
+SEGMENT_SUFFIX = ".seg"
+DEFAULT_CHUNK_ROWS = 65_536
+COMPRESSION_LEVEL = 6
+
+_MAGIC = b"PIJH"
+_VERSION = 1
+# magic, version
+_HEADER = struct.Struct("<4sI")
+# footer offset, footer length, magic
+_TRAILER = struct.Struct("<QQ4s")
+
+# Fixed-width columns, stored as little-endian arrays
+NUMERIC_COLUMNS = {
+    "row": "<i8",
+    "latency": "<f8",
+    "prompt_tokens": "<i8",
+    "completion_tokens": "<i8",
+    "attempts": "<i8",
+    "cache_hits": "<i8",
+    "failed": "|b1",
+    # Computed with the default reference and score fields when the run is added
+    "exact_match": "<f8",
+    "score": "<f8",
+}
+# Variable-length columns, stored as JSON text and decoded on read
+TEXT_COLUMNS = ("inputs", "output", "error", "extra")
+COLUMNS = (*NUMERIC_COLUMNS, *TEXT_COLUMNS)
+# Enough for `compare` with the default reference and score fields
+COMPARE_COLUMNS = ("row", "latency", "prompt_tokens", "completion_tokens", "failed", "exact_match", "score")
+
+# Record fields with a column of their own; any others are kept in `extra`
+_RECORD_FIELDS = {"run_id", "variant", *NUMERIC_COLUMNS, *TEXT_COLUMNS}
+_ENCODER = json.JSONEncoder(default=str)
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """The footer entry of up to `DEFAULT_CHUNK_ROWS` rows of one run and variant, sorted by row."""
+    run_id: str
+    variant: str
+    first_row: int
+    last_row: int
+    count: int
+    # Column name to (offset, compressed length) in the segment
+    columns: dict[str, tuple[int, int]]
+
+
+class Segment:
+    """One run output in columnar form, read through a memory map.
+
+    A segment is a header, zlib-compressed column blocks and a footer index listing every chunk
+    with its run id, variant, row range and the position of each of its column blocks. Opening a
+    segment reads only the footer; a column block is decompressed only when that column of that
+    chunk is read.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < _HEADER.size + _TRAILER.size:
+                raise ValueError(f"Invalid history segment {path}: truncated")
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = _HEADER.unpack_from(self._mmap, 0)
+        footer_offset, footer_length, trailer_magic = _TRAILER.unpack_from(self._mmap, size - _TRAILER.size)
+        if magic != _MAGIC or trailer_magic != _MAGIC:
+            raise ValueError(f"Invalid history segment {path}: bad magic")
+        if version != _VERSION:
+            raise ValueError(f"Unsupported history segment version in {path}: {version}")
+        footer = json.loads(zlib.decompress(self._mmap[footer_offset:footer_offset + footer_length]))
+        # Size and mtime of the run output the segment was built from
+        self.source = footer["source"]
+        self.chunks = [Chunk(chunk["run_id"], chunk["variant"], chunk["first_row"], chunk["last_row"], chunk["count"],
+                             {name: tuple(position) for name, position in chunk["columns"].items()})
+                       for chunk in footer["chunks"]]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._mmap.close()
+
+    @property
+    def run_ids(self) -> list[str]:
+        return list(dict.fromkeys(chunk.run_id for chunk in self.chunks))
+
+    @property
+    def rows(self) -> int:
+        return sum(chunk.count for chunk in self.chunks)
+
+    def read_chunk(self, chunk: Chunk, columns) -> dict[str, np.ndarray]:
+        return {name: self._read_column(chunk, name) for name in columns}
+
+    def _read_column(self, chunk, name):
+        offset, length = chunk.columns[name]
+        data = zlib.decompress(self._mmap[offset:offset + length])
+        if name in TEXT_COLUMNS:
+            return _decode_text(data, chunk.count)
+        dtype = np.dtype(NUMERIC_COLUMNS[name])
+        values = _unshuffle(data, dtype, chunk.count)
+        return np.cumsum(values) if name == "row" else values
+
+
+class RunHistory:
+    """The run history of an experiment: one segment per run output in `runs/history/`.
+
+    Segments are written once per run output and only replaced when that output changed, e.g. by
+    a resumed run, so the run outputs themselves can be deleted once they are in the history.
+    """
+
+    def __init__(self, experiment_dir: str, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        self.experiment_dir = experiment_dir
+        self.path = os.path.join(experiment_dir, RUNS_DIR, HISTORY_DIR)
+        self.chunk_rows = chunk_rows
+
+    def segments(self) -> list[str]:
+        """Returns the segment paths, oldest run first."""
+        try:
+            names = sorted(name for name in os.listdir(self.path) if name.endswith(SEGMENT_SUFFIX))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.path, name) for name in names]
+
+    def segment_path(self, run_output: str) -> str:
+        name = os.path.splitext(os.path.basename(run_output))[0]
+        return os.path.join(self.path, f"{name}{SEGMENT_SUFFIX}")
+
+    def append(self, run_output: str) -> str:
+        """Adds a run output to the history, replacing its earlier segment, and returns the segment path."""
+        os.makedirs(self.path, exist_ok=True)
+        path = self.segment_path(run_output)
+        write_segment(run_output, path, self.chunk_rows)
+        return path
+
+    def sync(self) -> list[str]:
+        """Adds every run output that is new or changed since it was added and returns their segment paths."""
+        return [self.append(path) for path in self.run_outputs() if not self.is_current(path)]
+
+    def prune(self) -> list[str]:
+        """Deletes the run outputs whose segment is up to date and returns their paths."""
+        deleted = [path for path in self.run_outputs() if self.is_current(path)]
+        for path in deleted:
+            os.remove(path)
+        return deleted
+
+    def run_outputs(self) -> list[str]:
+        runs = os.path.join(self.experiment_dir, RUNS_DIR)
+        try:
+            names = sorted(name for name in os.listdir(runs) if name.endswith(".jsonl"))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(runs, name) for name in names]
+
+    def is_current(self, run_output: str) -> bool:
+        """Returns whether the history holds the run output as it is now."""
+        path = self.segment_path(run_output)
+        if not os.path.exists(path):
+            return False
+        try:
+            with Segment(path) as segment:
+                return segment.source == _source(run_output)
+        except ValueError:
+            return False
+
+    def read(self, columns=COMPARE_COLUMNS, last: int | None = None, runs: list[str] | None = None,
+             variants: list[str] | None = None) -> dict[str, dict[str, np.ndarray]]:
+        """Reads the given columns into one set of NumPy arrays per variant, like `compare.load_columns`.
+
+        `last` keeps only the newest segments, `runs` only the segments or run ids given, and
+        `variants` only those variants. Other chunks and columns are never decompressed.
+        """
+        unknown = set(columns) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown history columns: {', '.join(sorted(unknown))}")
+        paths = self.segments()
+        if last is not None:
+            paths = paths[-last:] if last else []
+        parts: dict[str, dict[str, list[np.ndarray]]] = {}
+        for path in paths:
+            with Segment(path) as segment:
+                for chunk in segment.chunks:
+                    if runs is not None and segment.name not in runs and chunk.run_id not in runs:
+                        continue
+                    if variants is not None and chunk.variant not in variants:
+                        continue
+                    values = segment.read_chunk(chunk, columns)
+                    variant = parts.setdefault(chunk.variant, {name: [] for name in columns})
+                    for name in columns:
+                        variant[name].append(values[name])
+        return {variant: {name: np.concatenate(arrays) for name, arrays in values.items()}
+                for variant, values in parts.items()}
+
+    def load_columns(self, reference_field: str | None = None, score_field: str = SCORE_FIELD,
+                     last: int | None = None) -> dict[str, dict[str, np.ndarray]]:
+        """Reads the comparison columns of the newest `last` runs.
+
+        With the default reference and score fields these are stored as they are. Other fields
+        are computed again from the inputs and outputs, which is slower but gives the same result
+        as reading the run outputs.
+        """
+        if reference_field is None and score_field == SCORE_FIELD:
+            return self.read(COMPARE_COLUMNS, last=last)
+        columns = {}
+        for variant, values in self.read(("row", "latency", "prompt_tokens", "completion_tokens", *TEXT_COLUMNS), last=last).items():
+            records = [{**(extra or {}), "row": row, "latency": latency, "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                        "inputs": inputs, "output": output, "error": error}
+                       for row, latency, prompt_tokens, completion_tokens, inputs, output, error, extra in zip(*values.values(), strict=True)]
+            columns[variant] = record_columns(records, reference_field, score_field)
+        return columns
+
+
+def write_segment(run_output: str, path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """Converts a run output to a segment at `path`.
+
+    The run output is read once. Records are buffered per run and variant and written out as a
+    chunk every `chunk_rows` records, so memory holds at most one chunk per variant.
+    """
+    source = _source(run_output)
+    buffers: dict[tuple[str, str], list[dict]] = {}
+    chunks = []
+    temporary = f"{path}.tmp"
+    with open(run_output, "rb") as records, open(temporary, "wb") as segment:
+        segment.write(_HEADER.pack(_MAGIC, _VERSION))
+        for line in records:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # The last line of an interrupted run may be cut short
+                continue
+            buffer = buffers.setdefault((record.get("run_id") or "", record["variant"]), [])
+            buffer.append(record)
+            if len(buffer) == chunk_rows:
+                chunks.append(_write_chunk(segment, *_pop(buffers, record)))
+        for (run_id, variant), buffer in buffers.items():
+            chunks.append(_write_chunk(segment, run_id, variant, buffer))
+
+        footer = zlib.compress(json.dumps({"source": source, "chunks": chunks}).encode(), COMPRESSION_LEVEL)
+        footer_offset = segment.tell()
+        segment.write(footer)
+        segment.write(_TRAILER.pack(footer_offset, len(footer), _MAGIC))
+    os.replace(temporary, path)
+
+
+def _pop(buffers, record):
+    key = (record.get("run_id") or "", record["variant"])
+    return (*key, buffers.pop(key))
+
+
+def _write_chunk(segment, run_id, variant, records):
+    records.sort(key=lambda record: record["row"])
+    columns = record_columns(records)
+    values = {
+        "row": np.diff(columns["row"], prepend=0),
+        "latency": columns["latency"],
+        "prompt_tokens": columns["prompt_tokens"],
+        "completion_tokens": columns["completion_tokens"],
+        "attempts": np.array([record.get("attempts") or 0 for record in records]),
+        "cache_hits": np.array([record.get("cache_hits") or 0 for record in records]),
+        "failed": columns["failed"],
+        "exact_match": columns["exact_match"],
+        "score": columns["score"],
+    }
+    positions = {}
+    for name, dtype in NUMERIC_COLUMNS.items():
+        positions[name] = _write_block(segment, _shuffle(np.asarray(values[name], dtype=dtype)))
+    for name in TEXT_COLUMNS:
+        if name == "extra":
+            texts = [_extra(record) for record in records]
+        else:
+            texts = [record.get(name) for record in records]
+        positions[name] = _write_block(segment, _encode_text(texts))
+    rows = columns["row"]
+    return {"run_id": run_id, "variant": variant, "first_row": int(rows[0]), "last_row": int(rows[-1]),
+            "count": len(records), "columns": positions}
+
+
+def _extra(record):
+    extra = {name: value for name, value in record.items() if name not in _RECORD_FIELDS}
+    return extra or None
+
+
+def _write_block(segment, data):
+    offset = segment.tell()
+    compressed = zlib.compress(data, COMPRESSION_LEVEL)
+    segment.write(compressed)
+    return offset, len(compressed)
+
+
+def _shuffle(values):
+    # Grouping the n-th byte of every value together leaves long runs of equal bytes, which zlib compresses far better
+    return values.view(np.uint8).reshape(len(values), values.itemsize).T.tobytes()
+
+
+def _unshuffle(data, dtype, count):
+    return np.frombuffer(data, dtype=np.uint8).reshape(dtype.itemsize, count).T.copy().view(dtype).reshape(count)
+
+
+def _encode_text(values):
+    # The end offset of every value, then the JSON text of all values
+    texts = [_ENCODER.encode(value).encode() for value in values]
+    ends = np.cumsum([len(text) for text in texts], dtype="<i8")
+    return ends.tobytes() + b"".join(texts)
+
+
+def _decode_text(data, count):
+    ends = np.frombuffer(data, dtype="<i8", count=count)
+    text = memoryview(data)[ends.nbytes:]
+    values = np.empty(count, dtype=object)
+    start = 0
+    for index, end in enumerate(ends.tolist()):
+        values[index] = json.loads(text[start:end].tobytes())
+        start = end
+    return values
+
+
+def _source(run_output):
+    stat = os.stat(run_output)
+    return {"name": os.path.basename(run_output), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
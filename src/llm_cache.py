@@ -0,0 +1,153 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from src.llm_clients import Completion, LLMClient
+
+CACHE_FILE = os.path.join(".cache", "llm-responses.sqlite")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Size is checked against the limit every this many writes
+_EVICTION_INTERVAL = 64
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ResponseCache:
+    """Disk-backed LLM response cache with size-based LRU eviction.
+
+    Entries live in SQLite in WAL mode, so several runner processes can read and write the
+    same cache file at once.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._writes_since_eviction = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+
+    @staticmethod
+    def key(namespace: str, prompt: str, params: dict) -> str:
+        """Hashes everything that determines a response: client, rendered prompt, deployment and sampling parameters."""
+        payload = json.dumps({"namespace": namespace, "prompt": prompt, "params": params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            self._connection.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.stats.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: dict):
+        data = json.dumps(value)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, data, len(data), time.time()))
+            self.stats.writes += 1
+            self._writes_since_eviction += 1
+            if self._writes_since_eviction < _EVICTION_INTERVAL:
+                return
+        self.evict()
+
+    def evict(self) -> int:
+        """Removes least recently used entries until the cache fits in `max_bytes`."""
+        with self._lock:
+            self._writes_since_eviction = 0
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                excess = total - self.max_bytes
+                keys = []
+                if excess > 0:
+                    for key, size in connection.execute("SELECT key, size FROM responses ORDER BY last_access"):
+                        keys.append((key,))
+                        excess -= size
+                        if excess <= 0:
+                            break
+                    connection.executemany("DELETE FROM responses WHERE key = ?", keys)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            self.stats.evictions += len(keys)
+        return len(keys)
+
+    def size(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def close(self):
+        if self._writes_since_eviction:
+            self.evict()
+        with self._lock:
+            self._connection.close()
+
+
+class CachedClient(LLMClient):
+    """Serves repeated model calls from a `ResponseCache`.
+
+    With `bypass` set, every call goes to the wrapped client and its response replaces the cached one.
+    """
+
+    def __init__(self, client: LLMClient, cache: ResponseCache, bypass: bool = False, namespace: str | None = None):
+        self.client = client
+        self.cache = cache
+        self.bypass = bypass
+        self.namespace = namespace or f"{type(client).__module__}.{type(client).__qualname__}"
+
+    async def complete(self, prompt: str, **params) -> Completion:
+        key = ResponseCache.key(self.namespace, prompt, params)
+        # SQLite calls block, so they run in a worker thread instead of stalling the other rows
+        if not self.bypass:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return Completion(**cached, cached=True)
+
+        completion = await self.client.complete(prompt, **params)
+        await asyncio.to_thread(self.cache.put, key, {"text": completion.text, "prompt_tokens": completion.prompt_tokens,
+                                                      "completion_tokens": completion.completion_tokens})
+        return completion
+
+    def rate_limited(self, limiter) -> LLMClient:
+        # Only misses reach the model, so cache hits are not held back by the rate limit
+        return CachedClient(self.client.rate_limited(limiter), self.cache, self.bypass, self.namespace)
+
+    async def close(self):
+        await self.client.close()
+        self.cache.close()
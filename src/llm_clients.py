@@ -0,0 +1,103 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+from src.registry import import_target
+
+CLIENTS = {
+    "echo": "src.llm_clients:EchoClient",
+    "azure-openai": "src.llm_clients:AzureOpenAIClient",
+}
+
+
+@dataclass(frozen=True)
+class Completion:
+    text: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached: bool = False
+
+
+class LLMClient(ABC):
+    """Backend the experiment runner sends model calls to."""
+
+    @abstractmethod
+    async def complete(self, prompt: str, **params) -> Completion:
+        pass
+
+    async def close(self):  # noqa: B027 - a no-op unless the client holds connections
+        """Releases the client's connections."""
+
+    def rate_limited(self, limiter) -> "LLMClient":
+        """Returns a client that waits for `limiter` before every call that reaches the model."""
+        return RateLimitedClient(self, limiter)
+
+
+class RateLimitedClient(LLMClient):
+    """Acquires a `RateLimiter` before passing each call on to the wrapped client."""
+
+    def __init__(self, client: LLMClient, limiter):
+        self.client = client
+        self.limiter = limiter
+
+    async def complete(self, prompt: str, **params) -> Completion:
+        await self.limiter.acquire()
+        return await self.client.complete(prompt, **params)
+
+    async def close(self):
+        await self.client.close()
+
+
+class EchoClient(LLMClient):
+    """Offline client that answers with the prompt itself, for benchmarks and dry runs."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    async def complete(self, prompt: str, **params) -> Completion:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        tokens = len(prompt.split())
+        return Completion(text=prompt, prompt_tokens=tokens, completion_tokens=tokens)
+
+
+class AzureOpenAIClient(LLMClient):
+    """Chat completions on Azure OpenAI, configured from the AZURE_OPENAI_* variables in `.env`."""
+
+    def __init__(self):
+        from openai import AsyncAzureOpenAI
+
+        self._client = AsyncAzureOpenAI(
+            api_key=os.environ["AZURE_OPENAI_API_KEY"],
+            azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+            api_version=os.environ.get("AZURE_OPENAI_API_VERSION", "2024-02-01"),
+        )
+
+    async def complete(self, prompt: str, deployment_name: str = "", **params) -> Completion:
+        for name in ("max_tokens", "n"):
+            if name in params:
+                params[name] = int(params[name])
+        for name in ("temperature", "top_p", "presence_penalty", "frequency_penalty"):
+            if name in params:
+                params[name] = float(params[name])
+
+        response = await self._client.chat.completions.create(
+            model=deployment_name, messages=[{"role": "user", "content": prompt}], **params)
+        usage = response.usage
+        return Completion(
+            text=response.choices[0].message.content or "",
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+        )
+
+    async def close(self):
+        await self._client.close()
+
+
+def create_client(name: str) -> LLMClient:
+    """Creates a client by its short name or a `module:Class` path."""
+    target = CLIENTS.get(name, name)
+    if ":" not in target:
+        raise ValueError(f"Unknown LLM client: {name}. Use one of {', '.join(CLIENTS)} or a module:Class path")
+    return import_target(target)()
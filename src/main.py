@@ -4,7 +4,8 @@ from typing import Annotated
 import typer
 
 from src.entities import ExperimentType
-from src.experiment_handler import ExperimentHandler
+
+# The handler and batch modules are imported inside the commands so `--help` only pays for typer
 
 
 def generate_random_int_from_timestamp():
@@ -25,23 +26,49 @@ n_help = f"Name of the experiment (default: {d_name})"
 i_help = "Issue number (default: auto-generated)"
 t_help = f"Type of the experiment. (default: {d_type})"
 d_help = f"Directory to store the experiment (default: {d_dir})"
+m_help = "YAML or JSONL manifest of experiments (name, issue, type, dir) to create in one go"
+w_help = "Number of parallel workers for --manifest (default: number of CPU cores)"
+p_help = "Print time spent per phase and write a Chrome trace (see --profile-output)"
+po_help = "Chrome trace-event file written by --profile, viewable in chrome://tracing or Perfetto"
 
 n_typerOption = typer.Option(help=n_help, show_default=False)
 i_typerOption = typer.Option(help=i_help, show_default=False)
 t_typerOption = typer.Option(help=t_help, show_default=False)
 d_typerOption = typer.Option(help=d_help, show_default=False)
+m_typerOption = typer.Option(help=m_help, show_default=False)
+w_typerOption = typer.Option(help=w_help, show_default=False, min=1)
+p_typerOption = typer.Option(help=p_help)
+po_typerOption = typer.Option(help=po_help)
+
+app = typer.Typer(add_completion=False)
 
 
-def main(name: Annotated[str | None, n_typerOption] = None,
+@app.callback(invoke_without_command=True)
+def main(ctx: typer.Context,
+         name: Annotated[str | None, n_typerOption] = None,
          issue: Annotated[int | None, i_typerOption] = None,
          type: Annotated[ExperimentType | None, t_typerOption] = None,
-         dir: Annotated[str | None, d_typerOption] = None):
+         dir: Annotated[str | None, d_typerOption] = None,
+         manifest: Annotated[str | None, m_typerOption] = None,
+         workers: Annotated[int | None, w_typerOption] = None,
+         profile: Annotated[bool, p_typerOption] = False,
+         profile_output: Annotated[str, po_typerOption] = ".prompt-ignite/trace.json"):
     """
     🔥 Welcome to the Prompt Ignite!
     """
 
+    if profile:
+        start_profile(ctx, profile_output)
+
+    if ctx.invoked_subcommand:
+        return
+
     print("🔥 Welcome to the Prompt Ignite!")
 
+    if manifest:
+        create_from_manifest(manifest, workers)
+        return
+
     if not name:
         name = typer.prompt(
             "Experiment Name",
@@ -82,10 +109,574 @@ def main(name: Annotated[str | None, n_typerOption] = None,
     if dir is None:
         raise ValueError("Experiment directory is required")
 
-    ExperimentHandler.create(name=conventional_name, type=type, dir=dir)
+    if not forward_to_daemon("create", {"name": conventional_name, "type": type.value, "dir": dir}):
+        from src.experiment_handler import ExperimentHandler
+
+        try:
+            ExperimentHandler.create(name=conventional_name, type=type, dir=dir, raise_errors=True)
+        except Exception:
+            # The handler has already reported the error
+            raise typer.Exit(code=1) from None
 
     print("Done!")
 
 
+def forward_to_daemon(command: str, args: dict):
+    """Runs the command on the scaffolding daemon when one is running, printing its output.
+
+    Returns the daemon's result, or None when the command should run in-process.
+    """
+    from src.daemon import DaemonError, forward
+
+    try:
+        response = forward(command, args)
+    except DaemonError as e:
+        print(f"🚨 {e}")
+        raise typer.Exit(code=1) from None
+    if response is None:
+        return None
+    print(response.get("output", ""), end="")
+    if not response["ok"]:
+        print(f"🚨 {response['error']}")
+        raise typer.Exit(code=1)
+    return response
+
+
+def start_profile(ctx: typer.Context, output: str):
+    """Traces the rest of the command, including any subcommand, and reports once it exits."""
+    from src import tracing
+
+    tracing.enable()
+
+    def report():
+        tracer = tracing.disable()
+        print()
+        tracer.print_summary()
+        tracer.write_chrome_trace(output)
+        print(f"📈 Trace written to {output}")
+
+    ctx.call_on_close(report)
+
+
+def create_from_manifest(manifest: str, workers: int | None):
+    from src.batch import create_batch, load_manifest, print_summary
+
+    try:
+        entries = load_manifest(manifest)
+    except (OSError, ValueError) as e:
+        print(f"🚨 {e}")
+        raise typer.Exit(code=1) from None
+
+    print(f"Creating {len(entries)} experiments from {manifest}...")
+    results = create_batch(entries, workers)
+    print_summary(results)
+
+    if not all(result.ok for result in results):
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def run(experiment: Annotated[str, typer.Argument(help="Experiment directory containing flow.dag.yaml and data.jsonl")],
+        variant: Annotated[list[str] | None, typer.Option(help="Variant to run, e.g. llm.variant_1 (default: all variants)", show_default=False)] = None,
+        client: Annotated[str, typer.Option(help="LLM client: echo, azure-openai or a module:Class path")] = "azure-openai",
+        concurrency: Annotated[int, typer.Option(help="Rows in flight at the same time", min=1)] = 8,
+        rate_limit: Annotated[float | None, typer.Option(help="Maximum model calls per second", show_default=False, min=0.001)] = None,
+        retries: Annotated[int, typer.Option(help="Retries per model call, with exponential backoff", min=0)] = 3,
+        limit: Annotated[int | None, typer.Option(help="Only run the first N rows", show_default=False, min=1)] = None,
+        output: Annotated[str | None, typer.Option(help="Output JSONL file (default: <experiment>/runs/<run id>.jsonl)", show_default=False)] = None,
+        shard: Annotated[str | None, typer.Option(help="Run one slice of the dataset, as INDEX/COUNT, e.g. 0/4", show_default=False)] = None,
+        resume: Annotated[str | None, typer.Option(help="Continue an interrupted run from its output JSONL file", show_default=False)] = None,
+        cache: Annotated[bool, typer.Option(help="Serve repeated model calls from the response cache")] = True,
+        refresh_cache: Annotated[bool, typer.Option(help="Skip cache lookups but store the fresh responses")] = False,
+        cache_path: Annotated[str | None, typer.Option(help="Response cache file (default: <experiment>/.cache/llm-responses.sqlite)", show_default=False)] = None,
+        cache_size_mb: Annotated[int, typer.Option(help="Maximum response cache size in MB", min=1)] = 512):
+    """
+    🏃 Run every variant of an experiment over its data.jsonl
+    """
+    import asyncio
+    import os
+
+    from src.environment import read_env_file
+    from src.history import RunHistory
+    from src.llm_cache import CACHE_FILE, CachedClient, ResponseCache
+    from src.llm_clients import create_client
+    from src.runner import RunConfig, run_experiment
+    from src.tracing import span
+
+    with span("env.load"):
+        os.environ.update(read_env_file(".env") or {})
+    shard_range = None
+    if shard:
+        index, _, count = shard.partition("/")
+        if not (index.isdigit() and count.isdigit() and int(index) < int(count)):
+            print(f"🚨 Invalid shard {shard}, expected INDEX/COUNT with INDEX < COUNT")
+            raise typer.Exit(code=1)
+        shard_range = (int(index), int(count))
+
+    config = RunConfig(concurrency=concurrency, rate_limit=rate_limit, max_retries=retries,
+                       variants=tuple(variant) if variant else None, limit=limit, shard=shard_range)
+
+    try:
+        llm_client = create_client(client)
+        if cache:
+            response_cache = ResponseCache(cache_path or os.path.join(experiment, CACHE_FILE), cache_size_mb * 1024 * 1024)
+            llm_client = CachedClient(llm_client, response_cache, bypass=refresh_cache)
+        summary = asyncio.run(run_experiment(experiment, llm_client, config, resume or output, resume=bool(resume)))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"🚨 {e}")
+        raise typer.Exit(code=1) from None
+
+    print(f"✅ Run {summary.run_id}: {summary.rows} rows, {summary.failed} failed "
+          f"in {summary.duration:.2f}s ({summary.rows_per_minute:.0f} rows/min)")
+    print(f"📄 Results written to {summary.output}")
+    from src.catalog import Catalog
+
+    with Catalog() as catalog:
+        catalog.record_run(experiment, summary.run_id, summary.rows, summary.failed)
+
+    try:
+        segment = RunHistory(experiment).append(summary.output)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"🚨 {e}")
+        raise typer.Exit(code=1) from None
+    print(f"🗄️ Added to the run history as {segment}")
+
+    if cache:
+        stats = response_cache.stats
+        print(f"🗃️ Cache: {stats.hits} hits, {stats.misses} misses ({stats.hit_rate:.0%}), {stats.evictions} evicted")
+    if summary.failed:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def watch(experiment: Annotated[str, typer.Argument(help="Experiment directory containing flow.dag.yaml and data.jsonl")],
+          variant: Annotated[list[str] | None, typer.Option(help="Variant to run, e.g. llm.variant_1 (default: all variants)", show_default=False)] = None,
+          client: Annotated[str, typer.Option(help="LLM client: echo, azure-openai or a module:Class path")] = "azure-openai",
+          concurrency: Annotated[int, typer.Option(help="Rows in flight at the same time", min=1)] = 8,
+          rate_limit: Annotated[float | None, typer.Option(help="Maximum model calls per second", show_default=False, min=0.001)] = None,
+          retries: Annotated[int, typer.Option(help="Retries per model call, with exponential backoff", min=0)] = 3,
+          limit: Annotated[int | None, typer.Option(help="Only run the first N rows", show_default=False, min=1)] = None,
+          cache: Annotated[bool, typer.Option(help="Serve repeated model calls from the response cache")] = True,
+          cache_path: Annotated[str | None, typer.Option(help="Response cache file (default: <experiment>/.cache/llm-responses.sqlite)", show_default=False)] = None,
+          polling: Annotated[bool, typer.Option(help="Poll for changes instead of using inotify")] = False,
+          poll_interval: Annotated[float, typer.Option(help="Seconds between polls", min=0.05)] = 0.5,
+          once: Annotated[bool, typer.Option(help="Run what changed since the last run once, then exit")] = False):
+    """
+    👀 Re-run the variants and rows affected by every change to an experiment
+    """
+    import asyncio
+    import os
+
+    from src.environment import read_env_file
+    from src.llm_cache import CACHE_FILE, CachedClient, ResponseCache
+    from src.llm_clients import create_client
+    from src.runner import RunConfig
+    from src.watch import IncrementalRun
+    from src.watch import watch as watch_experiment
+
+    os.environ.update(read_env_file(".env") or {})
+    config = RunConfig(concurrency=concurrency, rate_limit=rate_limit, max_retries=retries,
+                       variants=tuple(variant) if variant else None, limit=limit)
+
+    def on_cycle(cycle):
+        variants = ", ".join(cycle.variants) or "none"
+        print(f"✅ Run {cycle.run_id}: {cycle.executed} rows executed ({variants}), {cycle.reused} reused, "
+              f"{cycle.failed} failed in {cycle.duration:.2f}s")
+        print(f"📄 Results written to {cycle.output}")
+
+    def on_change(paths):
+        print(f"🔁 Changed: {', '.join(sorted(paths))}")
+
+    async def run_once(llm_client):
+        try:
+            on_cycle(await IncrementalRun(experiment, llm_client, config).run())
+        finally:
+            await llm_client.close()
+
+    try:
+        llm_client = create_client(client)
+        if cache:
+            llm_client = CachedClient(llm_client, ResponseCache(cache_path or os.path.join(experiment, CACHE_FILE)))
+        if once:
+            asyncio.run(run_once(llm_client))
+        else:
+            print(f"👀 Watching {experiment}, press Ctrl+C to stop")
+            asyncio.run(watch_experiment(experiment, llm_client, config, polling, poll_interval, on_cycle, on_change))
+    except KeyboardInterrupt:
+        print("👋 Stopped watching")
+    except (OSError, ValueError, KeyError) as e:
+        print(f"🚨 {e}")
+        raise typer.Exit(code=1) from None
+
+
+@app.command()
+def compare(experiment: Annotated[str, typer.Argument(help="Experiment directory with runs/ and README.md")],
+            runs: Annotated[list[str] | None, typer.Option("--run", help="Run output JSONL to compare (default: the latest run)", show_default=False)] = None,
+            baseline: Annotated[str | None, typer.Option(help="Variant the others are compared with (default: the first variant)", show_default=False)] = None,
+            reference: Annotated[str | None, typer.Option(help="Input field with the expected output (default: expected, ground_truth, answer or reference)", show_default=False)] = None,
+            score: Annotated[str, typer.Option(help="Numeric result or output field holding a per-row score")] = "score",
+            resamples: Annotated[int, typer.Option(help="Bootstrap resamples for the confidence intervals", min=100)] = 1000,
+            confidence: Annotated[float, typer.Option(help="Confidence level of the intervals", min=0.5, max=0.999)] = 0.95,
+            seed: Annotated[int, typer.Option(help="Seed of the bootstrap resampling")] = 0,
+            last: Annotated[int | None, typer.Option(help="Compare the last N runs from the run history instead of run files", show_default=False, min=1)] = None,
+            write: Annotated[bool, typer.Option(help="Write the report into the Findings section of the experiment README.md")] = True):
+    """
+    ⚖️ Compare the variants of an experiment run
+    """
+    import os
+
+    from src.compare import README_FILE, compare_columns, compare_runs, format_report, latest_run, write_findings
+
+    if runs and last:
+        print("🚨 Use either --run or --last")
+        raise typer.Exit(code=1)
+    try:
+        if last:
+            from src.history import RunHistory
+
+            history = RunHistory(experiment)
+            history.sync()
+            columns = history.load_columns(reference, score, last)
+            report = format_report(compare_columns(columns, history.segments()[-last:], baseline, resamples, confidence, seed))
+        else:
+            paths = runs or [latest_run(experiment)]
+            report = format_report(compare_runs(paths, baseline, reference, score, resamples, confidence, seed))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"🚨 {e}")
+        raise typer.Exit(code=1) from None
+
+    print(report)
+    if write:
+        readme = os.path.join(experiment, README_FILE)
+        write_findings(readme, report)
+        print(f"📄 Findings written to {readme}")
+
+
+@app.command()
+def history(experiment: Annotated[str, typer.Argument(help="Experiment directory with runs/")],
+            prune: Annotated[bool, typer.Option(help="Delete the run files once they are in the history")] = False):
+    """
+    🗄️ Add new run files to the experiment's compact run history and list it
+    """
+    import os
+
+    from src.history import RunHistory, Segment
+
+    history = RunHistory(experiment)
+    total = 0
+    try:
+        added = history.sync()
+        for path in history.segments():
+            with Segment(path) as segment:
+                size = os.path.getsize(path)
+                total += size
+                variants = len({chunk.variant for chunk in segment.chunks})
+                print(f"{'🆕' if path in added else '🗄️'} {segment.name}: {segment.rows} rows, {variants} variants, {size / 1024:,.1f} KB")
+        deleted = history.prune() if prune else []
+    except (OSError, ValueError, KeyError) as e:
+        print(f"🚨 {e}")
+        raise typer.Exit(code=1) from None
+
+    for path in deleted:
+        print(f"🗑️ Deleted {path}")
+    print(f"📦 {len(history.segments())} runs in {history.path}, {total / 1024:,.1f} KB")
+
+
+@app.command()
+def dataset(experiment: Annotated[str, typer.Argument(help="Experiment directory containing data.jsonl")],
+            data: Annotated[str | None, typer.Option(help="JSONL dataset (default: <experiment>/data.jsonl)", show_default=False)] = None,
+            dedup: Annotated[list[str] | None, typer.Option(help="Field that makes rows duplicates, or * for whole rows", show_default=False)] = None,
+            near: Annotated[bool, typer.Option(help="Ignore case, punctuation and whitespace when deduplicating")] = False,
+            sample: Annotated[int | None, typer.Option(help="Keep a uniform sample of N rows", show_default=False, min=1)] = None,
+            fraction: Annotated[float | None, typer.Option(help="Keep this fraction of the rows, e.g. 0.01", show_default=False, min=0.0, max=1.0)] = None,
+            stratify: Annotated[str | None, typer.Option(help="Sample every value of this field in proportion to its share", show_default=False)] = None,
+            eval_fraction: Annotated[float | None, typer.Option(help="Split off this fraction of the rows as an eval set", show_default=False, min=0.0, max=1.0)] = None,
+            split_key: Annotated[list[str] | None, typer.Option(help="Field that decides the split of a row (default: the whole row)", show_default=False)] = None,
+            seed: Annotated[int, typer.Option(help="Seed of the sampling and the split")] = 0,
+            name: Annotated[str | None, typer.Option(help="Output name, e.g. small writes data.small.jsonl (default: from the steps)", show_default=False)] = None):
+    """
+    🧹 Deduplicate, sample and split an experiment's dataset in one pass
+    """
+    import os
+
+    from src.prepare import PrepareConfig, prepare_dataset
+    from src.runner import DATA_FILE
+
+    config = PrepareConfig(dedup=tuple(dedup) if dedup else None, near=near, sample=sample, fraction=fraction, stratify=stratify,
+                           eval_fraction=eval_fraction, split_key=tuple(split_key) if split_key else None, seed=seed, name=name)
+    try:
+        summary = prepare_dataset(data or os.path.join(experiment, DATA_FILE), config)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"🚨 {e}")
+        raise typer.Exit(code=1) from None
+
+    print(f"✅ Read {summary.rows} rows, dropped {summary.duplicates} duplicates")
+    for path, rows in summary.outputs.items():
+        print(f"📄 {rows} rows written to {path}")
+
+
+@app.command()
+def render(prompty: Annotated[str, typer.Argument(help="The .prompty file to render")],
+           data: Annotated[str | None, typer.Option(help="JSONL inputs (default: data.jsonl next to the .prompty file)", show_default=False)] = None,
+           limit: Annotated[int | None, typer.Option(help="Only render the first N rows", show_default=False, min=1)] = None,
+           output: Annotated[str | None, typer.Option(help="Write the rendered messages of every row to this JSONL file", show_default=False)] = None,
+           batch_size: Annotated[int, typer.Option(help="Rows rendered per batch", min=1)] = 10_000):
+    """
+    🖨️ Render a .prompty over a dataset and report renders per second
+    """
+    import json
+    import os
+
+    from src.dataset import JsonlDataset
+    from src.prompty import default_renderer
+
+    renderer = default_renderer()
+    data = data or os.path.join(os.path.dirname(prompty), "data.jsonl")
+    try:
+        with JsonlDataset(data) as dataset, open(output or os.devnull, "w") as file:
+            stop = min(limit or len(dataset), len(dataset))
+            for start in range(0, stop, batch_size):
+                rows = range(start, min(start + batch_size, stop))
+                # Decoded up front, so the render rate measures rendering only
+                inputs = [dataset[row] for row in rows]
+                for row, messages in zip(rows, renderer.render_batch(prompty, inputs), strict=True):
+                    if output:
+                        file.write(json.dumps({"row": row, "messages": messages}) + "\n")
+    except (OSError, ValueError) as e:
+        print(f"🚨 {e}")
+        raise typer.Exit(code=1) from None
+
+    stats = renderer.stats
+    print(f"✅ Rendered {stats.renders} rows in {stats.seconds:.3f}s ({stats.renders_per_second:,.0f} renders/s)")
+    if output:
+        print(f"📄 Messages written to {output}")
+
+
+@app.command("execute-notebooks")
+def execute_notebooks(paths: Annotated[list[str] | None, typer.Argument(help=f"Notebooks, or directories to search for runner.ipynb (default: {d_dir})", show_default=False)] = None,
+                      kernels: Annotated[int | None, typer.Option(help="Kernels kept running in the pool (default: up to 4)", show_default=False, min=1)] = None,
+                      timeout: Annotated[float, typer.Option(help="Seconds a single cell may run", min=1)] = 600,
+                      output_dir: Annotated[str | None, typer.Option(help="Write executed notebooks here instead of in place", show_default=False)] = None):
+    """
+    📓 Execute runner notebooks headless on a pool of warm kernels
+    """
+    import os
+
+    from src.environment import read_env_file
+    from src.notebooks import execute_notebooks as execute
+    from src.notebooks import find_notebooks
+
+    notebooks = find_notebooks(paths or [d_dir])
+    if not notebooks:
+        print("No notebooks found.")
+        return
+
+    os.environ.update(read_env_file(".env") or {})
+    print(f"Executing {len(notebooks)} notebooks...")
+    results = execute(notebooks, kernels, timeout, output_dir)
+    for result in results:
+        status = "✅" if result.ok else "❌"
+        print(f"{status} {result.path} ({result.duration:.1f}s){f': {result.error}' if result.error else ''}")
+
+    failed = sum(not result.ok for result in results)
+    print(f"📓 {len(results) - failed} succeeded, {failed} failed")
+    if failed:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def sync(paths: Annotated[list[str] | None, typer.Argument(help=f"Experiments, or directories of experiments (default: {d_dir})", show_default=False)] = None,
+         dry_run: Annotated[bool, typer.Option(help="Only report what would change")] = False,
+         workers: Annotated[int | None, typer.Option(help="Experiments synced in parallel", show_default=False, min=1)] = None):
+    """
+    🔄 Roll out template changes to existing experiments
+    """
+    from src.sync import sync_experiments
+
+    results = sync_experiments(paths or [d_dir], dry_run=dry_run, workers=workers)
+    counts = {"up-to-date": 0, "unmanaged": 0, "failed": 0}
+    files = conflicts = 0
+    for result in results:
+        if result.status in counts:
+            counts[result.status] += 1
+        if result.error:
+            print(f"❌ {result.path}: {result.error}")
+        changes = [f"updated {relpath}" for relpath in result.updated] + [f"added {relpath}" for relpath in result.added]
+        if changes:
+            print(f"🔄 {result.path}: {', '.join(changes)}")
+        for relpath in result.conflicts:
+            print(f"⚠️ {result.path}: {relpath} changed in the template and locally, left as is")
+        files += len(changes)
+        conflicts += len(result.conflicts)
+
+    verb = "would be written" if dry_run else "written"
+    print(f"✅ {len(results)} experiments: {files} files {verb}, {conflicts} conflicts, {counts['up-to-date']} up to date, "
+          f"{counts['unmanaged']} without a template manifest, {counts['failed']} failed")
+    if counts["failed"]:
+        raise typer.Exit(code=1)
+
+
+l_dir_typerOption = typer.Option("--dir", help=f"Experiment directory to scan in addition to the known ones (default: {d_dir})")
+l_refresh_typerOption = typer.Option(help="Pick up experiments changed on disk before answering")
+l_rescan_typerOption = typer.Option(help="Re-read every experiment changed on disk, e.g. after editing a README")
+l_limit_typerOption = typer.Option(help="Maximum number of experiments to show", show_default=False, min=1)
+
+
+@app.command("list")
+def list_experiments(type: Annotated[ExperimentType | None, typer.Option(help="Only show experiments of this type", show_default=False)] = None,
+                     dirs: Annotated[list[str] | None, l_dir_typerOption] = None,
+                     refresh: Annotated[bool, l_refresh_typerOption] = True,
+                     rescan: Annotated[bool, l_rescan_typerOption] = False,
+                     limit: Annotated[int | None, l_limit_typerOption] = None):
+    """
+    📚 List experiments from the catalog
+    """
+    response = forward_to_daemon("list", {"type": type.value if type else None, "dirs": dirs or [d_dir], "refresh": refresh, "rescan": rescan, "limit": limit})
+    if response:
+        print_catalog_entries(catalog_entries(response["result"]))
+        return
+
+    from src.catalog import Catalog
+
+    with Catalog() as catalog:
+        if refresh or rescan:
+            catalog.refresh(dirs or [d_dir], full=rescan)
+        print_catalog_entries(catalog.experiments(type=type.value if type else None, limit=limit))
+
+
+@app.command()
+def search(query: Annotated[str, typer.Argument(help="Text to find in experiment names, types, hypotheses or an issue number")],
+           dirs: Annotated[list[str] | None, l_dir_typerOption] = None,
+           refresh: Annotated[bool, l_refresh_typerOption] = True,
+           rescan: Annotated[bool, l_rescan_typerOption] = False,
+           limit: Annotated[int | None, l_limit_typerOption] = None):
+    """
+    🔎 Search experiments in the catalog
+    """
+    response = forward_to_daemon("list", {"query": query, "dirs": dirs or [d_dir], "refresh": refresh, "rescan": rescan, "limit": limit})
+    if response:
+        print_catalog_entries(catalog_entries(response["result"]))
+        return
+
+    from src.catalog import Catalog
+
+    with Catalog() as catalog:
+        if refresh or rescan:
+            catalog.refresh(dirs or [d_dir], full=rescan)
+        print_catalog_entries(catalog.search(query, limit=limit))
+
+
+def catalog_entries(rows: list[dict]):
+    from types import SimpleNamespace
+
+    return [SimpleNamespace(**row) for row in rows]
+
+
+def print_catalog_entries(entries):
+    if not entries:
+        print("No experiments found.")
+        return
+
+    for entry in entries:
+        last_run = "never run"
+        if entry.last_run_id:
+            last_run = f"last run {entry.last_run_id}: {entry.last_run_rows} rows, {entry.last_run_failed} failed"
+        print(f"#{entry.issue:<8} {entry.type or '?':<12} {entry.name:<40} {last_run}")
+        print(f"          {entry.path}")
+    print(f"📋 {len(entries)} experiment(s)")
+
+
+daemon_app = typer.Typer(help="🛰️ Serve create and list requests from a warm background process")
+app.add_typer(daemon_app, name="daemon")
+
+ds_typerOption = typer.Option("--socket", help="Unix socket of the daemon (default: .prompt-ignite/daemon.sock)", show_default=False)
+
+
+@daemon_app.command("serve")
+def daemon_serve(socket: Annotated[str | None, ds_typerOption] = None,
+                 workers: Annotated[int, typer.Option(help="Requests handled at the same time", min=1)] = 4,
+                 queue_size: Annotated[int, typer.Option(help="Requests waiting before clients are told to back off", min=1)] = 64):
+    """
+    Run the daemon in the foreground
+    """
+    import asyncio
+    import os
+
+    from src.daemon import Daemon, DaemonError
+
+    daemon = Daemon(socket, workers, queue_size)
+    try:
+        asyncio.run(daemon.serve(ready=lambda: print(f"🛰️ Daemon listening on {daemon.path} (pid {os.getpid()})", flush=True)))
+    except DaemonError as e:
+        print(f"🚨 {e}")
+        raise typer.Exit(code=1) from None
+    except KeyboardInterrupt:
+        pass
+    print("👋 Daemon stopped")
+
+
+@daemon_app.command("start")
+def daemon_start(socket: Annotated[str | None, ds_typerOption] = None,
+                 workers: Annotated[int, typer.Option(help="Requests handled at the same time", min=1)] = 4,
+                 queue_size: Annotated[int, typer.Option(help="Requests waiting before clients are told to back off", min=1)] = 64,
+                 log: Annotated[str, typer.Option(help="File the daemon's output is written to")] = ".prompt-ignite/daemon.log"):
+    """
+    Start the daemon in the background
+    """
+    import os
+    import subprocess
+    import sys
+
+    from src.daemon import send, socket_path
+
+    path = socket or socket_path()
+    if send("ping", path=path) is not None:
+        print(f"✅ Daemon already running on {path}")
+        return
+
+    os.makedirs(os.path.dirname(log) or ".", exist_ok=True)
+    command = [sys.executable, sys.argv[0], "daemon", "serve", "--socket", path, "--workers", str(workers), "--queue-size", str(queue_size)]
+    with open(log, "a") as output:
+        process = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=output, stderr=subprocess.STDOUT, start_new_session=True)
+    for _ in range(100):
+        if send("ping", path=path) is not None:
+            print(f"✅ Daemon started on {path} (pid {process.pid})")
+            return
+        if process.poll() is not None:
+            break
+        time.sleep(0.1)
+    print(f"🚨 The daemon did not start, see {log}")
+    raise typer.Exit(code=1)
+
+
+@daemon_app.command("stop")
+def daemon_stop(socket: Annotated[str | None, ds_typerOption] = None):
+    """
+    Stop the daemon
+    """
+    from src.daemon import send
+
+    if send("shutdown", path=socket) is None:
+        print("No daemon running.")
+        return
+    print("👋 Daemon stopped")
+
+
+@daemon_app.command("status")
+def daemon_status(socket: Annotated[str | None, ds_typerOption] = None):
+    """
+    Show whether the daemon is running and how busy it is
+    """
+    from src.daemon import send
+
+    response = send("ping", path=socket)
+    if response is None:
+        print("No daemon running.")
+        raise typer.Exit(code=1)
+    status = response["result"]
+    print(f"🛰️ Daemon pid {status['pid']} serving {status['cwd']}: {status['running']} running, "
+          f"{status['queued']} queued, {status['served']} served, {status['workers']} workers")
+
+
 if __name__ == "__main__":
-    typer.run(main)
+    app()
@@ -0,0 +1,262 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+
+from src.tracing import span
+
+NOTEBOOK_SUFFIX = ".ipynb"
+RUNNER_NOTEBOOK = "runner.ipynb"
+
+DEFAULT_KERNEL = "python3"
+DEFAULT_CELL_TIMEOUT = 600
+# Kernels in a pool unless told otherwise, fewer on machines with fewer cores
+DEFAULT_KERNELS = 4
+KERNEL_START_TIMEOUT = 60
+
+# Run before every notebook on a reused kernel: an empty namespace in the notebook's directory.
+# Imported modules stay loaded, which is what makes the next notebook start fast.
+_PREPARE_KERNEL = """\
+get_ipython().run_line_magic("reset", "-f")
+import os as _os
+_os.chdir({directory!r})
+del _os
+"""
+
+_KERNELSPEC = {"display_name": "Python 3 (ipykernel)", "language": "python", "name": DEFAULT_KERNEL}
+_LANGUAGE_INFO = {"name": "python", "file_extension": ".py", "mimetype": "text/x-python"}
+
+
+def new_notebook(cells: list[dict]) -> dict:
+    """Returns an nbformat 4.5 notebook, built without nbformat or a kernel."""
+    return {
+        "cells": cells,
+        "metadata": {"kernelspec": _KERNELSPEC, "language_info": _LANGUAGE_INFO},
+        "nbformat": 4,
+        "nbformat_minor": 5,
+    }
+
+
+def markdown_cell(source: str) -> dict:
+    return {"cell_type": "markdown", "id": _cell_id(), "metadata": {}, "source": _lines(source)}
+
+
+def code_cell(source: str, tags: list[str] | None = None) -> dict:
+    metadata = {"tags": tags} if tags else {}
+    return {"cell_type": "code", "id": _cell_id(), "metadata": metadata, "execution_count": None, "outputs": [], "source": _lines(source)}
+
+
+def _cell_id():
+    return uuid.uuid4().hex[:8]
+
+
+def _lines(source):
+    # nbformat stores sources as lines that keep their newline, the way Jupyter writes them
+    return source.strip("\n").splitlines(keepends=True)
+
+
+def read_notebook(path: str) -> dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+def write_notebook(path: str, notebook: dict):
+    """Writes the notebook atomically, indented like Jupyter does, so diffs stay small."""
+    directory = os.path.dirname(path) or "."
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "w") as file:
+            json.dump(notebook, file, indent=1, ensure_ascii=False)
+            file.write("\n")
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+        raise
+
+
+def find_notebooks(roots: list[str], name: str = RUNNER_NOTEBOOK) -> list[str]:
+    """Returns every notebook called `name` under `roots`, or the paths themselves when they are notebooks."""
+    found = []
+    for root in roots:
+        if root.endswith(NOTEBOOK_SUFFIX):
+            found.append(root)
+            continue
+        for directory, subdirectories, filenames in os.walk(root):
+            subdirectories[:] = sorted(subdirectory for subdirectory in subdirectories if not subdirectory.startswith("."))
+            if name in filenames:
+                found.append(os.path.join(directory, name))
+    return found
+
+
+@dataclass(frozen=True)
+class NotebookResult:
+    path: str
+    ok: bool
+    duration: float
+    error: str | None = None
+
+
+class KernelPool:
+    """Pre-started ipykernel instances that notebooks are scheduled across.
+
+    All kernels start concurrently when the pool opens, so the multi-second kernel startup is
+    paid once per pool instead of once per notebook. Between notebooks a kernel's namespace is
+    reset, and a kernel that dies or times out is restarted.
+    """
+
+    def __init__(self, size: int | None = None, kernel_name: str = DEFAULT_KERNEL, cell_timeout: float = DEFAULT_CELL_TIMEOUT):
+        self.size = size or default_pool_size()
+        self.kernel_name = kernel_name
+        self.cell_timeout = cell_timeout
+        self._idle: asyncio.Queue | None = None
+        self._kernels: list[_Kernel] = []
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def start(self):
+        with span("kernels.start", kernels=self.size):
+            self._kernels = list(await asyncio.gather(*(_Kernel.start(self.kernel_name) for _ in range(self.size))))
+        self._idle = asyncio.Queue()
+        for kernel in self._kernels:
+            self._idle.put_nowait(kernel)
+
+    async def close(self):
+        await asyncio.gather(*(kernel.shutdown() for kernel in self._kernels), return_exceptions=True)
+        self._kernels = []
+
+    async def execute(self, path: str, output: str | None = None) -> NotebookResult:
+        """Runs every code cell of a notebook on an idle kernel and writes it with its outputs to `output` (default: in place)."""
+        kernel = await self._idle.get()
+        start = time.perf_counter()
+        try:
+            with span("notebook.execute", "notebook", concurrent=True, path=path):
+                error = await kernel.run_notebook(path, output or path, self.cell_timeout)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            if not await kernel.is_alive():
+                await kernel.restart()
+            self._idle.put_nowait(kernel)
+        return NotebookResult(path, error is None, time.perf_counter() - start, error)
+
+    async def execute_all(self, paths: list[str], output_dir: str | None = None) -> list[NotebookResult]:
+        """Runs the notebooks across the pool and returns their results in order.
+
+        With `output_dir`, executed notebooks are written to `<output_dir>/<experiment>/<notebook>` instead of in place.
+        """
+        outputs = [_output_path(path, output_dir) for path in paths] if output_dir else [None] * len(paths)
+        for output in outputs:
+            if output:
+                os.makedirs(os.path.dirname(output), exist_ok=True)
+        return list(await asyncio.gather(*(self.execute(path, output) for path, output in zip(paths, outputs, strict=True))))
+
+
+def _output_path(path, output_dir):
+    experiment = os.path.basename(os.path.dirname(os.path.abspath(path)))
+    return os.path.join(output_dir, experiment, os.path.basename(path))
+
+
+class _Kernel:
+    def __init__(self, manager, client):
+        self.manager = manager
+        self.client = client
+
+    @classmethod
+    async def start(cls, kernel_name):
+        from jupyter_client.manager import AsyncKernelManager
+
+        manager = AsyncKernelManager(kernel_name=kernel_name)
+        await manager.start_kernel()
+        client = manager.client()
+        client.start_channels()
+        await client.wait_for_ready(timeout=KERNEL_START_TIMEOUT)
+        return cls(manager, client)
+
+    async def is_alive(self):
+        return await self.manager.is_alive()
+
+    async def restart(self):
+        self.client.stop_channels()
+        await self.manager.restart_kernel(now=True)
+        self.client = self.manager.client()
+        self.client.start_channels()
+        await self.client.wait_for_ready(timeout=KERNEL_START_TIMEOUT)
+
+    async def shutdown(self):
+        self.client.stop_channels()
+        await self.manager.shutdown_kernel(now=True)
+
+    async def run_notebook(self, path, output, cell_timeout):
+        """Executes the notebook's code cells in order, stopping at the first error, and returns that error."""
+        notebook = read_notebook(path)
+        directory = os.path.dirname(os.path.abspath(path))
+        await self._execute(_PREPARE_KERNEL.format(directory=directory), [], cell_timeout)
+
+        error = None
+        for cell in notebook["cells"]:
+            if cell["cell_type"] != "code":
+                continue
+            if error is not None:
+                cell["outputs"], cell["execution_count"] = [], None
+                continue
+            source = "".join(cell["source"]) if isinstance(cell["source"], list) else cell["source"]
+            outputs = []
+            try:
+                reply = await self._execute(source, outputs, cell_timeout)
+            except TimeoutError:
+                await self.manager.interrupt_kernel()
+                reply = {"status": "error", "ename": "TimeoutError", "evalue": f"Cell did not finish within {cell_timeout}s"}
+            cell["outputs"] = outputs
+            cell["execution_count"] = reply.get("execution_count")
+            if reply["status"] == "error":
+                error = f"{reply.get('ename')}: {reply.get('evalue')}"
+
+        write_notebook(output, notebook)
+        return error
+
+    async def _execute(self, source, outputs, timeout):
+        reply = await self.client.execute_interactive(source, output_hook=lambda message: _collect(message, outputs), timeout=timeout)
+        return reply["content"]
+
+
+def _collect(message, outputs):
+    """Translates a kernel IOPub message into nbformat outputs."""
+    kind = message["msg_type"]
+    content = message["content"]
+    if kind == "stream":
+        if outputs and outputs[-1]["output_type"] == "stream" and outputs[-1]["name"] == content["name"]:
+            outputs[-1]["text"] += content["text"]
+        else:
+            outputs.append({"output_type": "stream", "name": content["name"], "text": content["text"]})
+    elif kind in ("display_data", "execute_result"):
+        output = {"output_type": kind, "data": content["data"], "metadata": content.get("metadata", {})}
+        if kind == "execute_result":
+            output["execution_count"] = content.get("execution_count")
+        outputs.append(output)
+    elif kind == "error":
+        outputs.append({"output_type": "error", "ename": content["ename"], "evalue": content["evalue"], "traceback": content["traceback"]})
+    elif kind == "clear_output":
+        outputs.clear()
+
+
+def default_pool_size() -> int:
+    return min(DEFAULT_KERNELS, os.cpu_count() or 1)
+
+
+def execute_notebooks(paths: list[str], kernels: int | None = None, cell_timeout: float = DEFAULT_CELL_TIMEOUT,
+                      output_dir: str | None = None, kernel_name: str = DEFAULT_KERNEL) -> list[NotebookResult]:
+    """Blocking helper that runs the notebooks on a fresh kernel pool of `kernels` (default: up to 4), at most one per notebook."""
+    async def run():
+        async with KernelPool(min(kernels or default_pool_size(), len(paths)) or 1, kernel_name, cell_timeout) as pool:
+            return await pool.execute_all(paths, output_dir)
+
+    return asyncio.run(run())
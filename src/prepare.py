@@ -0,0 +1,294 @@
+import hashlib
+import json
+import math
+import os
+import random
+import re
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from src.dataset import JsonlDataset
+
+# `--dedup *` compares whole rows instead of some of their fields
+WHOLE_ROW = "*"
+DEFAULT_FALSE_POSITIVE_RATE = 1e-6
+# Rows deduplicated together, which bounds the memory of a pass
+BATCH_ROWS = 10_000
+TRAIN = "train"
+EVAL = "eval"
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+_ENCODER = json.JSONEncoder(sort_keys=True)
+_DECODER = json.JSONDecoder()
+
+
+@dataclass(frozen=True)
+class PrepareConfig:
+    # Fields that make two rows duplicates, or (WHOLE_ROW,); no deduplication when None
+    dedup: tuple[str, ...] | None = None
+    # Ignore case, punctuation and whitespace when comparing text
+    near: bool = False
+    # Keep a uniform sample of this many rows
+    sample: int | None = None
+    # Keep this fraction of the rows
+    fraction: float | None = None
+    # Sample every value of this field in proportion to how often it occurs
+    stratify: str | None = None
+    # Fraction of the rows written to the eval split; no split when None
+    eval_fraction: float | None = None
+    # Fields that decide the split of a row, the whole row when None
+    split_key: tuple[str, ...] | None = None
+    seed: int = 0
+    # Output name between the dataset's name and extension, e.g. data.<name>.jsonl
+    name: str | None = None
+    false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE
+
+
+@dataclass
+class PrepareSummary:
+    rows: int = 0
+    duplicates: int = 0
+    # Output path to rows written
+    outputs: dict[str, int] = field(default_factory=dict)
+
+
+class BloomFilter:
+    """A set of digests in a fixed-size bit array, sized for `capacity` items at the given false positive rate.
+
+    Memory is about 3.6 bytes per item at a rate of one in a million, whatever the size of the
+    rows. A row is only ever wrongly taken for a duplicate, never the other way round.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float = DEFAULT_FALSE_POSITIVE_RATE):
+        capacity = max(1, capacity)
+        self.size = max(64, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def add(self, digests: list[bytes]) -> np.ndarray:
+        """Adds a batch of 16-byte digests and returns whether each was new, counting repeats within the batch."""
+        if not digests:
+            return np.zeros(0, dtype=np.bool_)
+        halves = np.frombuffer(b"".join(digests), dtype="<u8").reshape(len(digests), 2)
+        # Double hashing derives all positions from the two 64-bit halves of a digest
+        steps = np.arange(self.hashes, dtype=np.uint64)
+        positions = (halves[:, :1] + steps * (halves[:, 1:] | np.uint64(1))) % np.uint64(self.size)
+        bytes_, masks = positions >> np.uint64(3), (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8))
+        present = ((self._bits[bytes_] & masks) != 0).all(axis=1)
+
+        first = np.zeros(len(digests), dtype=np.bool_)
+        first[np.unique(halves, axis=0, return_index=True)[1]] = True
+        new = ~present & first
+        np.bitwise_or.at(self._bits, bytes_[new].ravel(), masks[new].ravel())
+        return new
+
+
+def output_paths(data: str, config: PrepareConfig) -> dict[str, str]:
+    """Returns the output file of every split next to `data`, keyed by split, or by "" without a split."""
+    stem, extension = os.path.splitext(data)
+    name = config.name or "-".join(step for step, enabled in (("dedup", config.dedup is not None),
+                                                            ("sample", config.sample is not None or config.fraction is not None))
+                                   if enabled)
+    base = f"{stem}.{name}" if name else stem
+    if config.eval_fraction is None:
+        return {"": f"{base}{extension}"}
+    return {split: f"{base}.{split}{extension}" for split in (TRAIN, EVAL)}
+
+
+def prepare_dataset(data: str, config: PrepareConfig) -> PrepareSummary:
+    """Deduplicates, samples and splits a JSONL dataset in a single pass and writes the results next to it.
+
+    Rows are kept in file order and written as they are. Deduplication keeps the first of every
+    set of duplicates and happens before sampling, so the sample only holds distinct rows. With a
+    `fraction`, kept rows are written as they are read, and a `sample` of N rows holds N rows, or
+    N per stratum, until the end. Rows are read in batches through the dataset's offset index,
+    which is memory mapped rather than loaded. Memory therefore stays flat as the dataset grows,
+    except with deduplication: its Bloom filter is sized for every row of the dataset, about
+    3.6 bytes per row at the default false positive rate.
+    """
+    _validate(config)
+    paths = output_paths(data, config)
+
+    summary = PrepareSummary(outputs={path: 0 for path in paths.values()})
+    temporaries = {split: f"{path}.tmp" for split, path in paths.items()}
+    files = {}
+    try:
+        for split, path in temporaries.items():
+            files[split] = open(path, "wb")
+        with JsonlDataset(data) as dataset:
+            seen = BloomFilter(len(dataset), config.false_positive_rate) if config.dedup is not None else None
+            sampler = _sampler(config)
+            parse = bool(config.dedup and config.dedup != (WHOLE_ROW,)) or config.near or config.stratify or config.split_key
+
+            def write(raw, row):
+                split = _split(raw, row, config) if config.eval_fraction is not None else ""
+                files[split].write(raw + b"\n")
+                summary.outputs[paths[split]] += 1
+
+            for start in range(0, len(dataset), BATCH_ROWS):
+                batch = [(index, raw, _parse(raw, index, data) if parse else None)
+                         for index, raw in enumerate(dataset.raw_rows(start, start + BATCH_ROWS), start)]
+                summary.rows += len(batch)
+                if seen is not None:
+                    new = seen.add([_dedup_digest(raw, row, config) for _, raw, row in batch])
+                    summary.duplicates += len(batch) - int(new.sum())
+                    batch = [item for item, keep in zip(batch, new.tolist(), strict=True) if keep]
+                for index, raw, row in batch:
+                    sampler.offer(index, raw, row, write)
+            sampler.finish(write)
+
+        for file in files.values():
+            file.close()
+        for split, path in paths.items():
+            os.replace(temporaries[split], path)
+    finally:
+        for split, file in files.items():
+            file.close()
+            if os.path.exists(temporaries[split]):
+                os.unlink(temporaries[split])
+    return summary
+
+
+def _validate(config):
+    if config.sample is not None and config.fraction is not None:
+        raise ValueError("Use either a sample size or a fraction")
+    if config.sample is not None and config.sample < 1:
+        raise ValueError("The sample size must be at least 1")
+    if config.fraction is not None and not 0 < config.fraction <= 1:
+        raise ValueError("The fraction must be above 0 and at most 1")
+    if config.eval_fraction is not None and not 0 < config.eval_fraction < 1:
+        raise ValueError("The eval fraction must be between 0 and 1")
+    if config.stratify and config.sample is None and config.fraction is None:
+        raise ValueError("Stratifying needs a sample size or a fraction")
+    if config.dedup is None and config.sample is None and config.fraction is None and config.eval_fraction is None:
+        raise ValueError("Nothing to do: deduplicate, sample or split the dataset")
+
+
+def _parse(raw, index, data):
+    try:
+        row = _DECODER.decode(raw.decode())
+    except ValueError as e:
+        raise ValueError(f"Invalid JSON in row {index} of {data}: {e}") from None
+    if not isinstance(row, dict):
+        raise ValueError(f"Row {index} of {data} is not a JSON object")
+    return row
+
+
+def _digest(seed, value: bytes) -> bytes:
+    return hashlib.blake2b(value, digest_size=16, key=str(seed).encode()).digest()
+
+
+def _dedup_digest(raw, row, config):
+    if config.dedup == (WHOLE_ROW,):
+        value = row if config.near else None
+    else:
+        value = [row.get(name) for name in config.dedup]
+    if value is None:
+        return _digest(config.seed, raw)
+    if config.near:
+        value = _normalise(value)
+    return _digest(config.seed, _ENCODER.encode(value).encode())
+
+
+def _normalise(value):
+    if isinstance(value, str):
+        return " ".join(_PUNCTUATION.sub(" ", value.casefold()).split())
+    if isinstance(value, list):
+        return [_normalise(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalise(item) for key, item in value.items()}
+    return value
+
+
+def _split(raw, row, config):
+    key = raw if config.split_key is None else _ENCODER.encode([row.get(name) for name in config.split_key]).encode()
+    # The split depends only on the row and the seed, so it stays put when rows are added or removed
+    position = int.from_bytes(_digest(config.seed, key)[:8], "little") / 2**64
+    return EVAL if position < config.eval_fraction else TRAIN
+
+
+def _stratum(row, config):
+    return _ENCODER.encode(row.get(config.stratify)) if config.stratify else ""
+
+
+def _sampler(config):
+    if config.sample is not None:
+        return _ReservoirSampler(config)
+    if config.fraction is not None:
+        return _FractionSampler(config)
+    return _AllRows()
+
+
+class _AllRows:
+    def offer(self, index, raw, row, write):
+        write(raw, row)
+
+    def finish(self, write):
+        pass
+
+
+class _FractionSampler:
+    """Keeps `fraction` of every stratum, written as it is read.
+
+    Each stratum is sampled systematically from a random start, so it is represented in proportion
+    to its size to within one row. Memory holds one counter per stratum.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        # Stratum to (rows seen, random start)
+        self.strata: dict[str, tuple[int, float]] = {}
+
+    def offer(self, index, raw, row, write):
+        stratum = _stratum(row, self.config)
+        seen, start = self.strata.get(stratum) or (0, self.rng.random())
+        self.strata[stratum] = (seen + 1, start)
+        fraction = self.config.fraction
+        if math.floor((seen + 1) * fraction + start) > math.floor(seen * fraction + start):
+            write(raw, row)
+
+    def finish(self, write):
+        pass
+
+
+class _ReservoirSampler:
+    """Keeps a uniform sample of `sample` rows, written in file order at the end.
+
+    With a stratum field, every stratum gets its own reservoir and the sample is shared out in
+    proportion to the stratum sizes, with the largest remainders rounded up.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        # Stratum to (rows seen, reservoir of (index, raw, row))
+        self.strata: dict[str, tuple[int, list]] = {}
+
+    def offer(self, index, raw, row, write):
+        stratum = _stratum(row, self.config)
+        seen, reservoir = self.strata.get(stratum) or (0, [])
+        if seen < self.config.sample:
+            reservoir.append((index, raw, row))
+        else:
+            slot = self.rng.randrange(seen + 1)
+            if slot < self.config.sample:
+                reservoir[slot] = (index, raw, row)
+        self.strata[stratum] = (seen + 1, reservoir)
+
+    def finish(self, write):
+        total = sum(seen for seen, _ in self.strata.values())
+        size = min(self.config.sample, total)
+        shares = {stratum: size * seen / total for stratum, (seen, _) in self.strata.items()} if total else {}
+        counts = {stratum: math.floor(share) for stratum, share in shares.items()}
+        remainders = sorted(shares, key=lambda stratum: (counts[stratum] - shares[stratum], stratum))
+        for stratum in remainders[:size - sum(counts.values())]:
+            counts[stratum] += 1
+
+        selected = []
+        for stratum, (_, reservoir) in sorted(self.strata.items()):
+            # Slots do not hold a uniform order, so the share is drawn from the reservoir again
+            selected.extend(self.rng.sample(reservoir, min(counts[stratum], len(reservoir))))
+        for _, raw, row in sorted(selected, key=lambda item: item[0]):
+            write(raw, row)
@@ -0,0 +1,174 @@
+import os
+import re
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+PROMPTY_SUFFIX = ".prompty"
+
+_FRONT_MATTER = re.compile(r"\A---[ \t]*\r?\n(.*?)^---[ \t]*\r?\n?", re.DOTALL | re.MULTILINE)
+# A line holding only a role, e.g. "system:", starts a new chat message
+_ROLE = re.compile(r"^[ \t]*#?[ \t]*(system|user|assistant|function|tool)[ \t]*:[ \t]*\r?$", re.IGNORECASE | re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class Prompty:
+    path: str
+    name: str
+    model: dict
+    # Input values used when a render leaves them out: `inputs.<name>.default`, else the `sample` value
+    defaults: dict
+    # A jinja2.Template, or a `_Substitution` when the template only inserts variables
+    template: object
+
+
+@dataclass
+class RenderStats:
+    renders: int = 0
+    seconds: float = 0.0
+    # Times a .prompty file was read and compiled
+    compilations: int = 0
+
+    @property
+    def renders_per_second(self):
+        return self.renders / self.seconds if self.seconds else 0.0
+
+
+class PromptyRenderer:
+    """Renders `.prompty` files into chat messages.
+
+    A file's front matter is parsed and its template compiled once, then cached by path until
+    its mtime or size changes. Rendering a batch checks the file once for the whole batch.
+    """
+
+    def __init__(self):
+        self.stats = RenderStats()
+        # Path to ((mtime_ns, size), compiled prompty)
+        self._cache: dict[str, tuple[tuple[int, int], Prompty]] = {}
+        self._lock = threading.Lock()
+        self._environment = None
+
+    def load(self, path: str) -> Prompty:
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._cache.get(path)
+        if cached is None or cached[0] != signature:
+            with self._lock:
+                cached = self._cache.get(path)
+                if cached is None or cached[0] != signature:
+                    cached = (signature, self._compile(path))
+                    self._cache[path] = cached
+                    self.stats.compilations += 1
+        return cached[1]
+
+    def render(self, path: str, inputs: dict | None = None) -> list[dict]:
+        return self.render_batch(path, [inputs or {}])[0]
+
+    def render_batch(self, path: str, inputs: Iterable[dict]) -> list[list[dict]]:
+        """Renders chat messages, `{"role": ..., "content": ...}`, once per set of inputs.
+
+        Inputs left out take the file's defaults.
+        """
+        prompty = self.load(path)
+        render = prompty.template.render
+        defaults = prompty.defaults
+
+        start = time.perf_counter()
+        results = [_messages(render({**defaults, **values})) for values in inputs]
+        self.stats.seconds += time.perf_counter() - start
+        self.stats.renders += len(results)
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def _compile(self, path):
+        import yaml
+
+        with open(path) as file:
+            text = file.read()
+
+        match = _FRONT_MATTER.match(text)
+        try:
+            front_matter = (yaml.safe_load(match.group(1)) or {}) if match else {}
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid front matter in {path}: {e}") from None
+        if not isinstance(front_matter, dict):
+            raise ValueError(f"Front matter of {path} must be a mapping")
+        body = text[match.end():] if match else text
+
+        defaults = dict(front_matter.get("sample") or {})
+        defaults.update({name: spec["default"] for name, spec in (front_matter.get("inputs") or {}).items()
+                         if isinstance(spec, dict) and "default" in spec})
+        import jinja2
+
+        environment = self._jinja()
+        try:
+            parts = _substitution_parts(environment, body)
+            template = _Substitution(parts) if parts is not None else environment.from_string(body)
+        except jinja2.TemplateSyntaxError as e:
+            raise ValueError(f"Invalid template in {path}, line {e.lineno}: {e.message}") from None
+        return Prompty(path, front_matter.get("name", os.path.basename(path)), front_matter.get("model") or {}, defaults, template)
+
+    def _jinja(self):
+        if self._environment is None:
+            import jinja2
+
+            self._environment = jinja2.Environment(trim_blocks=True, keep_trailing_newline=True, autoescape=False)
+        return self._environment
+
+
+class _Substitution:
+    """Renders a template made only of text and `{{ variable }}` expressions with a join, skipping Jinja's per-render setup.
+
+    Output matches Jinja's: missing variables render as an empty string, other values with `str`.
+    """
+
+    def __init__(self, parts: list[str | tuple[str]]):
+        self.parts = parts
+
+    def render(self, values: dict) -> str:
+        return "".join([part if isinstance(part, str) else str(values.get(part[0], "")) for part in self.parts])
+
+
+def _substitution_parts(environment, body):
+    """Returns the template as text and `(variable,)` parts, or None when it uses anything else, e.g. filters or blocks."""
+    from jinja2 import nodes
+
+    parts: list[str | tuple[str]] = []
+    for node in environment.parse(body).body:
+        if not isinstance(node, nodes.Output):
+            return None
+        for child in node.nodes:
+            if isinstance(child, nodes.TemplateData):
+                parts.append(child.data)
+            elif isinstance(child, nodes.Name) and child.ctx == "load":
+                parts.append((child.name,))
+            else:
+                return None
+    return parts
+
+
+def _messages(text):
+    """Splits rendered text into messages at role lines. Text before the first role is a system message."""
+    parts = _ROLE.split(text)
+    messages = []
+    if parts[0].strip():
+        messages.append({"role": "system", "content": parts[0].strip()})
+    for index in range(1, len(parts), 2):
+        messages.append({"role": parts[index].lower(), "content": parts[index + 1].strip()})
+    return messages
+
+
+_default_renderer: PromptyRenderer | None = None
+
+
+def default_renderer() -> PromptyRenderer:
+    """Returns the renderer shared within the process, so every caller benefits from the compiled templates."""
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = PromptyRenderer()
+    return _default_renderer
@@ -0,0 +1,75 @@
+import importlib
+
+from src.entities import Experiment, ExperimentType
+from src.tracing import span
+
+# Entry point group third-party packages can use to provide experiment types, e.g. in pyproject.toml:
+# [tool.poetry.plugins."prompt_ignite.experiments"]
+# "my-type" = "my_package.experiments:MyExperiment"
+ENTRY_POINT_GROUP = "prompt_ignite.experiments"
+
+BUILTIN_EXPERIMENTS = {
+    ExperimentType.PROMPT_FLOW.value: "src.experiments.prompt_flow:PromptFlowExperiment",
+    ExperimentType.JUPYTER_NOTEBOOK.value: "src.experiments.jupytor_notebook:JupyterNotebookExperiment",
+    ExperimentType.PROMPTY.value: "src.experiments.prompty:PromptyExperiment",
+    ExperimentType.PYTHON.value: "src.experiments.pure_python:PythonExperiment",
+}
+
+
+class ExperimentRegistry:
+    """Maps experiment type values to `module:Class` paths and imports a module only when its type is used."""
+
+    def __init__(self, targets: dict[str, str] | None = None):
+        self._targets = dict(BUILTIN_EXPERIMENTS if targets is None else targets)
+        self._loaded: dict[str, type[Experiment]] = {}
+        self._entry_points_loaded = False
+
+    def register(self, type: ExperimentType | str, target: str | type[Experiment]):
+        key = _key(type)
+        self._loaded.pop(key, None)
+        if isinstance(target, str):
+            self._targets[key] = target
+        else:
+            self._targets.pop(key, None)
+            self._loaded[key] = target
+
+    def get(self, type: ExperimentType | str) -> type[Experiment]:
+        key = _key(type)
+        if key in self._loaded:
+            return self._loaded[key]
+
+        if key not in self._targets:
+            self._load_entry_points()
+        if key not in self._targets:
+            raise KeyError(f"Unknown experiment type: {key}")
+
+        with span("registry.import", target=self._targets[key]):
+            experiment_class = import_target(self._targets[key])
+        self._loaded[key] = experiment_class
+        return experiment_class
+
+    def types(self) -> list[str]:
+        self._load_entry_points()
+        return sorted(set(self._targets) | set(self._loaded))
+
+    def _load_entry_points(self):
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+
+        from importlib.metadata import entry_points
+
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            # Built-in types are never shadowed by plugins
+            if entry_point.name not in self._targets and entry_point.name not in self._loaded:
+                self._targets[entry_point.name] = entry_point.value
+
+
+def _key(type):
+    return type.value if isinstance(type, ExperimentType) else type
+
+
+def import_target(target: str):
+    module_name, _, attribute = target.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, attribute)
@@ -0,0 +1,293 @@
+import asyncio
+import importlib.util
+import inspect
+import json
+import os
+import random
+import time
+import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from src.dataset import JsonlDataset
+from src.flow import Flow, FlowNode, load_flow, parse_reference
+from src.llm_clients import LLMClient
+
+DATA_FILE = "data.jsonl"
+RUNS_DIR = "runs"
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+_TAIL_BLOCK = 64 * 1024
+
+
+@dataclass(frozen=True)
+class RunConfig:
+    concurrency: int = DEFAULT_CONCURRENCY
+    # Model calls per second across all workers, unlimited when None
+    rate_limit: float | None = None
+    max_retries: int = DEFAULT_RETRIES
+    backoff: float = DEFAULT_BACKOFF
+    variants: tuple[str, ...] | None = None
+    limit: int | None = None
+    # (index, count) to run only one contiguous slice of the dataset
+    shard: tuple[int, int] | None = None
+
+
+@dataclass(frozen=True)
+class RunSummary:
+    run_id: str
+    output: str
+    rows: int
+    failed: int
+    duration: float
+
+    @property
+    def rows_per_minute(self):
+        return self.rows / self.duration * 60 if self.duration else 0.0
+
+
+class RateLimiter:
+    """Spaces calls evenly so no more than `rate` start per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class FlowRunner:
+    """Executes the nodes of a flow for one row at a time.
+
+    Prompt nodes are rendered with Jinja2. Nodes of type `llm`, and Python nodes that take a
+    `deployment_name` input, are model calls sent to the LLM client. Other Python nodes are
+    imported and their tool function is called in a worker thread.
+    """
+
+    def __init__(self, flow: Flow, client: LLMClient, config: RunConfig | None = None):
+        self.flow = flow
+        self.config = config or RunConfig()
+        self.client = client.rate_limited(RateLimiter(self.config.rate_limit)) if self.config.rate_limit else client
+        self._environment = None
+        self._tools = {}
+
+    async def run_row(self, nodes: list[FlowNode], inputs: dict) -> dict:
+        """Returns the flow outputs, latency, token usage and attempts for one row of inputs."""
+        start = time.perf_counter()
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, "attempts": 0, "cache_hits": 0}
+        flow_inputs = {name: inputs.get(name, spec.get("default") if isinstance(spec, dict) else None)
+                       for name, spec in self.flow.inputs.items()}
+        outputs = {}
+
+        for node in nodes:
+            values = {name: _resolve(value, flow_inputs, outputs) for name, value in node.inputs.items()}
+            outputs[node.name] = await self._run_node(node, values, usage)
+
+        result = {name: _resolve(spec.get("reference") if isinstance(spec, dict) else spec, flow_inputs, outputs)
+                  for name, spec in self.flow.outputs.items()}
+        return {"output": result, "latency": time.perf_counter() - start, **usage}
+
+    async def _run_node(self, node, values, usage):
+        if node.type == "prompt":
+            return self._render(node.source, values)
+
+        if node.type == "llm" or "deployment_name" in values:
+            prompt = self._render(node.source, values) if node.type == "llm" else str(values.pop("prompt", ""))
+            if node.type == "llm":
+                values = {name: value for name, value in values.items() if name in _MODEL_PARAMETERS}
+            completion = await self._complete(prompt, values, usage)
+            usage["prompt_tokens"] += completion.prompt_tokens
+            usage["completion_tokens"] += completion.completion_tokens
+            usage["cache_hits"] += completion.cached
+            return completion.text
+
+        if node.type == "python":
+            return await asyncio.to_thread(self._tool(node.source), **values)
+
+        raise ValueError(f"Unsupported node type {node.type!r} for node {node.name}")
+
+    async def _complete(self, prompt, params, usage):
+        for attempt in range(self.config.max_retries + 1):
+            usage["attempts"] += 1
+            try:
+                return await self.client.complete(prompt, **params)
+            except Exception:
+                if attempt == self.config.max_retries:
+                    raise
+                # Exponential backoff with full jitter
+                await asyncio.sleep(random.uniform(0, self.config.backoff * 2**attempt))
+
+    def _render(self, source, values):
+        if self._environment is None:
+            import jinja2
+
+            self._environment = jinja2.Environment(
+                loader=jinja2.FileSystemLoader(self.flow.dir), trim_blocks=True, keep_trailing_newline=True)
+        return self._environment.get_template(source).render(**values)
+
+    def _tool(self, source):
+        if source not in self._tools:
+            path = self.flow.path(source)
+            spec = importlib.util.spec_from_file_location(f"flow_tool_{len(self._tools)}", path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            functions = [value for name, value in vars(module).items()
+                         if inspect.isfunction(value) and value.__module__ == module.__name__ and not name.startswith("_")]
+            # promptflow's @tool decorator marks the function with a `__tool` attribute
+            tools = [function for function in functions if hasattr(function, "__tool")]
+            candidates = tools or functions
+            if len(candidates) != 1:
+                raise ValueError(f"Expected one tool function in {source}, found {len(candidates)}")
+            self._tools[source] = candidates[0]
+        return self._tools[source]
+
+
+# Node inputs of an `llm` node that are passed on to the model call
+_MODEL_PARAMETERS = {"deployment_name", "max_tokens", "temperature", "top_p", "stop", "presence_penalty", "frequency_penalty", "n"}
+
+
+def _resolve(value, flow_inputs, outputs):
+    reference = parse_reference(value)
+    if not reference:
+        return value
+
+    source, path = reference
+    if source == "inputs":
+        return flow_inputs.get(path)
+
+    parts = path.split(".")
+    if parts[0] != "output":
+        raise ValueError(f"Unsupported reference: {value}")
+    result = outputs[source]
+    for part in parts[1:]:
+        result = result[part]
+    return result
+
+
+def completed_rows(output: str) -> tuple[str | None, set[tuple[str, int]]]:
+    """Returns the run id and the (variant, row) pairs already written to a run output file without an error."""
+    run_id = None
+    completed = set()
+    if not os.path.exists(output):
+        return run_id, completed
+    with open(output) as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # The last line of an interrupted run may be cut short
+                continue
+            run_id = run_id or record.get("run_id")
+            # Failed rows are run again
+            if record.get("error") is None:
+                completed.add((record["variant"], record["row"]))
+    return run_id, completed
+
+
+def end_with_complete_line(output: str):
+    """Cuts off a last line left unfinished by an interrupted run, so appended records start on a line of their own."""
+    with open(output, "rb+") as file:
+        size = file.seek(0, os.SEEK_END)
+        position = size
+        while position > 0:
+            block = min(_TAIL_BLOCK, position)
+            position -= block
+            file.seek(position)
+            newline = file.read(block).rfind(b"\n")
+            if newline != -1:
+                position += newline + 1
+                break
+        if position == size:
+            return
+        file.seek(position)
+        try:
+            json.loads(file.read())
+        except ValueError:
+            file.truncate(position)
+        else:
+            # A complete record that only lacks its newline is kept
+            file.write(b"\n")
+
+
+def new_run_id() -> str:
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+async def run_experiment(experiment_dir: str, client: LLMClient, config: RunConfig | None = None,
+                         output: str | None = None, rows: Iterable[tuple[int, dict]] | None = None,
+                         resume: bool = False) -> RunSummary:
+    """Runs every variant of the experiment's flow over its dataset.
+
+    Each row is appended to the output JSONL file as soon as it completes, so a partial run
+    keeps the rows finished so far. With `resume`, rows already in `output` are skipped and the
+    run continues under the same run id.
+    """
+    config = config or RunConfig()
+    flow = load_flow(experiment_dir)
+    variants = list(config.variants or flow.variant_ids())
+    plans = {variant: flow.resolve(variant) for variant in variants}
+    runner = FlowRunner(flow, client, config)
+
+    run_id, completed = completed_rows(output) if resume and output else (None, set())
+    if resume and output and os.path.exists(output):
+        end_with_complete_line(output)
+    run_id = run_id or new_run_id()
+    output = output or os.path.join(experiment_dir, RUNS_DIR, f"{run_id}.jsonl")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+
+    dataset = None
+    if rows is None:
+        dataset = JsonlDataset(os.path.join(experiment_dir, DATA_FILE))
+        selection = dataset.shard(*config.shard) if config.shard else range(len(dataset))
+        if config.limit is not None:
+            selection = selection[:config.limit]
+        rows = dataset.rows(selection.start, selection.stop)
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=config.concurrency * 2)
+    counts = {"rows": 0, "failed": 0}
+    start = time.perf_counter()
+
+    with open(output, "a") as file:
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                variant, row, inputs = item
+                record = {"run_id": run_id, "variant": variant, "row": row, "inputs": inputs}
+                try:
+                    record.update(await runner.run_row(plans[variant], inputs))
+                    record["error"] = None
+                except Exception as e:
+                    record.update({"output": None, "error": f"{type(e).__name__}: {e}"})
+                    counts["failed"] += 1
+                counts["rows"] += 1
+                file.write(json.dumps(record, default=str) + "\n")
+                file.flush()
+
+        workers = [asyncio.create_task(worker()) for _ in range(config.concurrency)]
+        try:
+            for row, inputs in rows:
+                for variant in variants:
+                    if (variant, row) not in completed:
+                        await queue.put((variant, row, inputs))
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            await client.close()
+            if dataset:
+                dataset.close()
+
+    return RunSummary(run_id, output, counts["rows"], counts["failed"], time.perf_counter() - start)
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from src.catalog import EXPERIMENT_DIR_PATTERN
+from src.templates import TemplateStore, default_store
+
+MANIFEST_FILE = ".template-manifest.json"
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class SyncResult:
+    path: str
+    # "unmanaged" without a manifest, "up-to-date" when the templates did not change, "failed" or "synced"
+    status: str
+    updated: list[str] = field(default_factory=list)
+    added: list[str] = field(default_factory=list)
+    # Files changed both in the template and by the user, which are left as they are
+    conflicts: list[str] = field(default_factory=list)
+    error: str | None = None
+
+
+def write_manifest(experiment_dir: str, type: str, templates: dict[str, str], context: dict[str, str],
+                   store: TemplateStore | None = None):
+    """Records the templates an experiment was created from and the content hash of every file written from them.
+
+    `templates` maps paths relative to the experiment to template paths. Files that were not written are left out.
+    """
+    if not os.path.isdir(experiment_dir):
+        return
+    store = store or default_store()
+    files = {relpath: {"template": template, "sha256": rendered_digest(store, template, context)}
+             for relpath, template in templates.items() if os.path.exists(os.path.join(experiment_dir, relpath))}
+    _save(experiment_dir, {
+        "version": MANIFEST_VERSION,
+        "type": type,
+        "context": context,
+        "template_version": template_version(store, templates),
+        "files": files,
+    })
+
+
+def read_manifest(experiment_dir: str) -> dict | None:
+    try:
+        with open(os.path.join(experiment_dir, MANIFEST_FILE)) as file:
+            manifest = json.load(file)
+    except FileNotFoundError:
+        return None
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid template manifest in {experiment_dir}: {e}") from None
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported template manifest version in {experiment_dir}: {manifest.get('version')}")
+    return manifest
+
+
+def template_version(store: TemplateStore, templates: dict[str, str]) -> str:
+    """Returns a hash of the experiment's template set, which changes whenever any of its templates does."""
+    digest = hashlib.sha256()
+    for relpath, template in sorted(templates.items()):
+        digest.update(f"{relpath}\0{template}\0{store.get(template).digest}\n".encode())
+    return digest.hexdigest()
+
+
+def rendered_digest(store: TemplateStore, template: str, context: dict[str, str]) -> str:
+    file = store.get(template)
+    # A static template is copied as is, so its fingerprint is already the hash of the copy
+    return hashlib.sha256(store.render(template, context)).hexdigest() if file.templated else file.digest
+
+
+def sync_experiment(experiment_dir: str, store: TemplateStore | None = None, dry_run: bool = False) -> SyncResult:
+    """Brings an experiment up to date with its templates with a three-way comparison per file.
+
+    The manifest hash is the base, the rendered template is theirs and the file on disk is ours. A
+    file is rewritten only when the template changed and the file still matches the base. Files
+    the user edited or deleted are never touched. An experiment whose template version matches its
+    manifest is skipped without reading any of its files.
+    """
+    manifest = read_manifest(experiment_dir)
+    if manifest is None:
+        return SyncResult(experiment_dir, "unmanaged")
+
+    store = store or default_store()
+    templates = current_templates(experiment_dir, manifest)
+    version = template_version(store, templates)
+    if version == manifest["template_version"]:
+        return SyncResult(experiment_dir, "up-to-date")
+
+    result = SyncResult(experiment_dir, "synced")
+    context = manifest["context"]
+    files = {}
+    for relpath, template in templates.items():
+        destination = os.path.join(experiment_dir, relpath)
+        theirs = rendered_digest(store, template, context)
+        base = manifest["files"].get(relpath)
+        if base is None:
+            # New in the template set. An existing file of the same name belongs to the user
+            if not os.path.exists(destination):
+                result.added.append(relpath)
+                files[relpath] = {"template": template, "sha256": theirs}
+            continue
+        if base["sha256"] == theirs or not os.path.exists(destination):
+            files[relpath] = base
+            continue
+
+        ours = file_digest(destination)
+        if ours == theirs:
+            files[relpath] = {"template": template, "sha256": theirs}
+        elif ours == base["sha256"]:
+            result.updated.append(relpath)
+            files[relpath] = {"template": template, "sha256": theirs}
+        else:
+            result.conflicts.append(relpath)
+            files[relpath] = base
+
+    if not dry_run:
+        for relpath in result.added + result.updated:
+            destination = os.path.join(experiment_dir, relpath)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            store.materialise(templates[relpath], destination, context)
+        # With conflicts left, the old version is kept so the next sync looks at this experiment again
+        _save(experiment_dir, {**manifest, "template_version": manifest["template_version"] if result.conflicts else version,
+                               "files": files})
+    return result
+
+
+def sync_experiments(roots: list[str], store: TemplateStore | None = None, dry_run: bool = False,
+                     workers: int | None = None) -> list[SyncResult]:
+    """Syncs every experiment under `roots`, or the roots themselves, in parallel."""
+    store = store or default_store()
+    # Scan the templates once up front instead of racing to do it in every worker
+    store.files()
+    experiment_dirs = find_experiments(roots)
+    with ThreadPoolExecutor(workers or min(32, (os.cpu_count() or 1) * 4)) as executor:
+        return list(executor.map(lambda path: _sync_or_fail(path, store, dry_run), experiment_dirs))
+
+
+def _sync_or_fail(experiment_dir, store, dry_run):
+    # One broken experiment does not stop the others
+    try:
+        return sync_experiment(experiment_dir, store, dry_run)
+    except Exception as e:
+        return SyncResult(experiment_dir, "failed", error=f"{type(e).__name__}: {e}")
+
+
+def find_experiments(roots: list[str]) -> list[str]:
+    """Returns the experiments directly under `roots`, or the roots themselves when they are experiments.
+
+    Experiments are directories with a template manifest or an `issue-{number}-{name}` name.
+    """
+    def is_experiment(path):
+        return os.path.exists(os.path.join(path, MANIFEST_FILE)) or EXPERIMENT_DIR_PATTERN.match(os.path.basename(os.path.normpath(path)))
+
+    found = []
+    for root in roots:
+        if is_experiment(root):
+            found.append(root)
+            continue
+        try:
+            entries = sorted(os.scandir(root), key=lambda entry: entry.name)
+        except FileNotFoundError:
+            continue
+        found.extend(entry.path for entry in entries if entry.is_dir() and is_experiment(entry.path))
+    # An experiment given both directly and through its parent is synced once
+    return list(dict.fromkeys(os.path.normpath(path) for path in found))
+
+
+def current_templates(experiment_dir: str, manifest: dict) -> dict[str, str]:
+    """Returns the templates the experiment's type uses today, or the manifest's own for unknown types."""
+    from src.registry import ExperimentRegistry
+
+    try:
+        experiment_class = ExperimentRegistry().get(manifest["type"])
+    except KeyError:
+        return {relpath: file["template"] for relpath, file in manifest["files"].items()}
+    parent, name = os.path.split(os.path.normpath(experiment_dir))
+    return experiment_class(name, f"{parent}/").templates()
+
+
+def file_digest(path: str) -> str:
+    with open(path, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+def _save(experiment_dir, manifest):
+    path = os.path.join(experiment_dir, MANIFEST_FILE)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+        file.write("\n")
+    os.replace(temporary, path)
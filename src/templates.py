@@ -0,0 +1,181 @@
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass
+
+from src.config import ARTEFACTS_DIR
+
+# Placeholders rendered by the store. Other `{{...}}` expressions, e.g. in Jinja prompts, are left untouched
+TEMPLATE_VARIABLES = ("name",)
+
+FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+
+_PLACEHOLDER = re.compile(r"\{\{(\w+)\}\}")
+
+
+@dataclass(frozen=True)
+class TemplateFile:
+    relpath: str
+    path: str
+    digest: str
+    size: int
+    mode: int
+    templated: bool
+
+
+class TemplateStore:
+    """Fingerprints the files under `root` once and materialises them into experiments.
+
+    Templated files are kept in memory by content hash and rendered in a single pass into an
+    atomic write. Static files are cloned with a reflink or `copy_file_range` where the filesystem
+    supports it. Hardlinks are opt-in, since editing a hardlinked file in place also edits the template.
+    """
+
+    def __init__(self, root: str = ARTEFACTS_DIR, hardlink: bool = False):
+        self.root = root
+        self.hardlink = hardlink
+        self._files: dict[str, TemplateFile] | None = None
+        self._contents: dict[str, bytes] = {}
+
+    def refresh(self):
+        """Re-scans the templates, e.g. after they changed on disk."""
+        files = {}
+        contents = {}
+        for directory, directories, filenames in os.walk(self.root):
+            # Bytecode caches and hidden files, e.g. from importing a template's .py file, are not templates
+            directories[:] = [name for name in directories if name != "__pycache__" and not name.startswith(".")]
+            for filename in filenames:
+                if filename.startswith(".") or filename.endswith(".pyc"):
+                    continue
+                path = os.path.join(directory, filename)
+                relpath = os.path.relpath(path, self.root).replace(os.sep, "/")
+                with open(path, "rb") as file:
+                    content = file.read()
+
+                digest = hashlib.sha256(content).hexdigest()
+                templated = _is_templated(content)
+                if templated:
+                    contents[digest] = content
+                files[relpath] = TemplateFile(relpath, path, digest, len(content), os.stat(path).st_mode & 0o777, templated)
+
+        self._files = files
+        self._contents = contents
+
+    def files(self, prefix: str = "") -> list[TemplateFile]:
+        """Returns the template files under `prefix`, a directory relative to the store root."""
+        prefix = f"{prefix.rstrip('/')}/" if prefix else ""
+        return [file for relpath, file in self._scan().items() if relpath.startswith(prefix)]
+
+    def get(self, relpath: str) -> TemplateFile:
+        try:
+            return self._scan()[relpath]
+        except KeyError:
+            raise FileNotFoundError(f"Template not found: {relpath}") from None
+
+    def render(self, relpath: str, context: dict[str, str]) -> bytes:
+        file = self.get(relpath)
+        if not file.templated:
+            with open(file.path, "rb") as handle:
+                return handle.read()
+        return _render(self._contents[file.digest], context)
+
+    def materialise(self, relpath: str, destination: str, context: dict[str, str] | None = None) -> str:
+        """Writes a template to `destination` and returns the strategy used."""
+        file = self.get(relpath)
+        directory = os.path.dirname(destination) or "."
+        descriptor, temporary = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(destination)}.", suffix=".tmp")
+        try:
+            if file.templated:
+                with os.fdopen(descriptor, "wb") as handle:
+                    handle.write(_render(self._contents[file.digest], context or {}))
+                strategy = "render"
+            else:
+                os.close(descriptor)
+                strategy = self._copy(file, temporary)
+            if strategy != "hardlink":
+                os.chmod(temporary, file.mode)
+            os.replace(temporary, destination)
+        except BaseException:
+            if os.path.lexists(temporary):
+                os.unlink(temporary)
+            raise
+        return strategy
+
+    def materialise_tree(self, prefix: str, destination_dir: str, context: dict[str, str] | None = None) -> dict[str, str]:
+        """Materialises every template under `prefix` into `destination_dir`, keeping relative paths."""
+        strategies = {}
+        for file in self.files(prefix):
+            relpath = file.relpath[len(prefix.rstrip("/")) + 1:] if prefix else file.relpath
+            destination = os.path.join(destination_dir, relpath)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            strategies[relpath] = self.materialise(file.relpath, destination, context)
+        return strategies
+
+    def _scan(self):
+        if self._files is None:
+            self.refresh()
+        return self._files
+
+    def _copy(self, file, destination):
+        if self.hardlink:
+            try:
+                os.unlink(destination)
+                os.link(file.path, destination)
+                return "hardlink"
+            except OSError:
+                pass
+        return clone_file(file.path, destination)
+
+
+def clone_file(source: str, destination: str) -> str:
+    """Copies `source` over `destination` with the cheapest mechanism available and returns its name."""
+    with open(source, "rb") as fsrc, open(destination, "wb") as fdst:
+        try:
+            import fcntl
+
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return "reflink"
+        except (ImportError, OSError):
+            pass
+
+        if hasattr(os, "copy_file_range"):
+            try:
+                size = os.fstat(fsrc.fileno()).st_size
+                copied = 0
+                while copied < size:
+                    count = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - copied)
+                    if count == 0:
+                        break
+                    copied += count
+                if copied == size:
+                    return "copy_file_range"
+            except OSError:
+                pass
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+
+        shutil.copyfileobj(fsrc, fdst)
+        return "copy"
+
+
+def _is_templated(content: bytes):
+    return any(f"{{{{{variable}}}}}".encode() in content for variable in TEMPLATE_VARIABLES)
+
+
+def _render(content: bytes, context: dict[str, str]):
+    text = content.decode()
+    return _PLACEHOLDER.sub(lambda match: str(context.get(match.group(1), match.group(0))), text).encode()
+
+
+_default_store: TemplateStore | None = None
+
+
+def default_store() -> TemplateStore:
+    """Returns the store for the bundled `src/artefacts` templates, shared by every experiment type."""
+    global _default_store
+    if _default_store is None:
+        _default_store = TemplateStore()
+    return _default_store
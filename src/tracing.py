@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Per-process I/O counters on Linux; `wchar` counts every byte passed to write(), including to stdout
+_PROC_IO = "/proc/self/io"
+
+
+@dataclass
+class Span:
+    name: str
+    category: str
+    start: float
+    wall: float = 0.0
+    cpu: float = 0.0
+    bytes_written: int | None = None
+    thread: int = 0
+    # Concurrent spans, e.g. subprocesses run by one event loop, overlap on their thread
+    concurrent: bool = False
+    args: dict = field(default_factory=dict)
+
+    def set(self, **args):
+        self.args.update(args)
+
+
+class _NullSpan:
+    """What `span` returns while tracing is disabled: a reusable context manager that does nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ActiveSpan:
+    def __init__(self, tracer, span):
+        self._tracer = tracer
+        self._span = span
+
+    def __enter__(self):
+        span = self._span
+        self._written = _bytes_written()
+        self._cpu = _children_cpu() if span.concurrent else time.thread_time()
+        span.start = time.perf_counter()
+        return span
+
+    def __exit__(self, exc_type, exc, traceback):
+        span = self._span
+        span.wall = time.perf_counter() - span.start
+        span.cpu = (_children_cpu() if span.concurrent else time.thread_time()) - self._cpu
+        written = _bytes_written()
+        if written is not None and self._written is not None:
+            span.bytes_written = written - self._written
+        if exc_type is not None:
+            span.args["error"] = exc_type.__name__
+        self._tracer._record(span)
+        return False
+
+
+class Tracer:
+    """Collects spans for the `--profile` summary and the Chrome trace export.
+
+    CPU time is the calling thread's, except for concurrent spans, which get the CPU time of
+    child processes that finished during the span. Bytes written are process-wide.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def span(self, name: str, category: str = "phase", concurrent: bool = False, **args) -> _ActiveSpan:
+        return _ActiveSpan(self, Span(name, category, 0.0, thread=threading.get_ident(), concurrent=concurrent, args=args))
+
+    def summary(self) -> list[tuple[str, int, float, float, int | None]]:
+        """Returns (name, count, wall, cpu, bytes written) per span name, in order of first appearance."""
+        rows: dict[str, list] = {}
+        for span in sorted(self.spans, key=lambda span: span.start):
+            row = rows.setdefault(span.name, [span.name, 0, 0.0, 0.0, None])
+            row[1] += 1
+            row[2] += span.wall
+            row[3] += span.cpu
+            if span.bytes_written is not None:
+                row[4] = (row[4] or 0) + span.bytes_written
+        return [tuple(row) for row in rows.values()]
+
+    def print_summary(self):
+        print(f"{'Phase':<36} {'Count':>5} {'Wall ms':>10} {'CPU ms':>10} {'Written':>10}")
+        for name, count, wall, cpu, written in self.summary():
+            print(f"{name:<36} {count:>5} {wall * 1000:>10.2f} {cpu * 1000:>10.2f} {_format_bytes(written):>10}")
+
+    def chrome_trace(self) -> dict:
+        """Returns the spans in the Chrome trace event format, for chrome://tracing or Perfetto."""
+        pid = os.getpid()
+        events = []
+        for id, span in enumerate(sorted(self.spans, key=lambda span: span.start)):
+            start = (span.start - self.origin) * 1e6
+            args = {**span.args, "cpu_ms": round(span.cpu * 1000, 3)}
+            if span.bytes_written is not None:
+                args["bytes_written"] = span.bytes_written
+            event = {"name": span.name, "cat": span.category, "ts": start, "pid": pid, "tid": span.thread, "args": args}
+            if span.concurrent:
+                events.append({**event, "ph": "b", "id": id})
+                events.append({**event, "ph": "e", "id": id, "ts": start + span.wall * 1e6, "args": {}})
+            else:
+                events.append({**event, "ph": "X", "dur": span.wall * 1e6})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(self.chrome_trace(), file)
+
+    def _record(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+
+_tracer: Tracer | None = None
+
+
+def span(name: str, category: str = "phase", concurrent: bool = False, **args):
+    """Times the enclosed block while tracing is enabled. Disabled, it returns a shared no-op context manager."""
+    if _tracer is None:
+        return _NULL_SPAN
+    return _tracer.span(name, category, concurrent, **args)
+
+
+def enable() -> Tracer:
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+def disable() -> Tracer | None:
+    """Stops tracing and returns the tracer with the collected spans."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def _bytes_written():
+    try:
+        with open(_PROC_IO, "rb") as file:
+            for line in file:
+                if line.startswith(b"wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _children_cpu():
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _format_bytes(count):
+    if count is None:
+        return "-"
+    for unit in ("B", "KB", "MB"):
+        if count < 1024:
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
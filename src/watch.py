@@ -0,0 +1,372 @@
+import asyncio
+import dataclasses
+import hashlib
+import json
+import os
+import select
+import struct
+import time
+from dataclasses import dataclass
+
+from src.flow import FLOW_FILE, Flow, load_flow
+from src.llm_clients import LLMClient
+from src.runner import DATA_FILE, RUNS_DIR, FlowRunner, RunConfig, new_run_id
+
+# Where the fingerprints of the last watch run are kept, relative to the experiment
+STATE_FILE = os.path.join(".cache", "watch-state.json")
+
+DEFAULT_POLL_INTERVAL = 0.5
+# Editors save in several steps, so changes are collected until the directory is quiet for this long
+DEBOUNCE_SECONDS = 0.2
+_IGNORED_DIRS = {RUNS_DIR, ".cache", "__pycache__"}
+
+# linux/inotify.h
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = os.O_NONBLOCK
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+def _ignored(relpath):
+    parts = relpath.split(os.sep)
+    return any(part in _IGNORED_DIRS or part.startswith(".") for part in parts) or relpath.endswith(".idx")
+
+
+class PollingWatcher:
+    """Detects changed files by comparing the mtime and size of every file in the directory tree."""
+
+    def __init__(self, dir: str, interval: float = DEFAULT_POLL_INTERVAL):
+        self.dir = dir
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def wait(self, timeout: float | None = None) -> set[str]:
+        """Blocks until files change, or `timeout` passes, and returns the changed paths relative to the directory."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed = set()
+        while True:
+            changes = self._changes()
+            changed |= changes
+            if changed and not changes:
+                return changed
+            if not changed and deadline is not None and time.monotonic() >= deadline:
+                return changed
+            time.sleep(DEBOUNCE_SECONDS if changed else self.interval)
+
+    def _changes(self):
+        snapshot = self._scan()
+        changed = {path for path in snapshot.keys() | self._snapshot.keys() if snapshot.get(path) != self._snapshot.get(path)}
+        self._snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+    def _scan(self):
+        snapshot = {}
+        for directory, subdirectories, filenames in os.walk(self.dir):
+            relative = os.path.relpath(directory, self.dir)
+            subdirectories[:] = [name for name in subdirectories if not _ignored(os.path.normpath(os.path.join(relative, name)))]
+            for filename in filenames:
+                relpath = os.path.normpath(os.path.join(relative, filename))
+                if _ignored(relpath):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(directory, filename))
+                except FileNotFoundError:
+                    continue
+                snapshot[relpath] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+
+class InotifyWatcher:
+    """Waits for changes with Linux inotify instead of rescanning the directory."""
+
+    def __init__(self, dir: str):
+        import ctypes
+        import ctypes.util
+
+        self.dir = dir
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._directories: dict[int, str] = {}
+        for directory, subdirectories, _ in os.walk(dir):
+            relative = os.path.relpath(directory, dir)
+            subdirectories[:] = [name for name in subdirectories if not _ignored(os.path.normpath(os.path.join(relative, name)))]
+            self._add_watch(directory)
+
+    def wait(self, timeout: float | None = None) -> set[str]:
+        changed = set()
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        while readable:
+            changed |= self._read()
+            readable, _, _ = select.select([self._fd], [], [], DEBOUNCE_SECONDS)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+    def _add_watch(self, directory):
+        descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if descriptor >= 0:
+            self._directories[descriptor] = directory
+
+    def _read(self):
+        changed = set()
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(buffer):
+            descriptor, mask, _, length = _EVENT.unpack_from(buffer, offset)
+            name = buffer[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0").decode()
+            offset += _EVENT.size + length
+            directory = self._directories.get(descriptor)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            relpath = os.path.normpath(os.path.relpath(path, self.dir))
+            if _ignored(relpath):
+                continue
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO):
+                    self._add_watch(path)
+                continue
+            changed.add(relpath)
+        return changed
+
+
+def create_watcher(dir: str, polling: bool = False, interval: float = DEFAULT_POLL_INTERVAL):
+    """Returns an inotify watcher where the platform supports it, else a polling one."""
+    if not polling:
+        try:
+            return InotifyWatcher(dir)
+        except (OSError, AttributeError, TypeError):
+            # No inotify, e.g. on macOS, or no watches left
+            pass
+    return PollingWatcher(dir, interval)
+
+
+def flow_dependencies(flow: Flow, variants: list[str]) -> dict[str, set[str]]:
+    """Returns the files every variant depends on: the flow definition and the sources of its nodes."""
+    return {variant: {FLOW_FILE, *(os.path.normpath(node.source) for node in flow.resolve(variant) if node.source)}
+            for variant in variants}
+
+
+@dataclass(frozen=True)
+class WatchCycle:
+    run_id: str
+    output: str
+    # Variants with at least one row re-executed
+    variants: list[str]
+    executed: int
+    reused: int
+    failed: int
+    duration: float
+
+
+class IncrementalRun:
+    """Re-runs only the (variant, row) pairs whose inputs changed since the last run.
+
+    A variant's fingerprint hashes its resolved nodes, the flow's inputs and outputs and the
+    content of every file its nodes use; a row is identified by the hash of its JSON line. Results
+    are kept by (variant fingerprint, row hash), so editing a prompt re-runs only the variants
+    using it, editing data re-runs only new or changed rows, and identical rows run once. The
+    fingerprints of the last run are saved in `.cache/watch-state.json`, so a new session reuses
+    the previous session's results.
+    """
+
+    def __init__(self, experiment_dir: str, client: LLMClient, config: RunConfig | None = None):
+        self.dir = experiment_dir
+        self.client = client
+        self.config = config or RunConfig()
+        self.flow: Flow | None = None
+        self.dependencies: dict[str, set[str]] = {}
+        self._fingerprints: dict[str, str] = {}
+        self._rows: list[tuple[str, bytes]] | None = None
+        self._results: dict[tuple[str, str], dict] = {}
+        self._load_state()
+
+    def invalidate(self, changed: set[str]):
+        """Forgets what depends on the changed files, which are relative to the experiment."""
+        if FLOW_FILE in changed:
+            self.flow = None
+            self._fingerprints.clear()
+        for variant, files in self.dependencies.items():
+            if files & changed:
+                self._fingerprints.pop(variant, None)
+        if DATA_FILE in changed:
+            self._rows = None
+
+    async def run(self) -> WatchCycle:
+        start = time.perf_counter()
+        if self.flow is None:
+            self.flow = load_flow(self.dir)
+            variants = list(self.config.variants or self.flow.variant_ids())
+            self.dependencies = flow_dependencies(self.flow, variants)
+        for variant in self.dependencies:
+            if variant not in self._fingerprints:
+                self._fingerprints[variant] = self._fingerprint(variant)
+        if self._rows is None:
+            self._rows = _read_rows(os.path.join(self.dir, DATA_FILE), self.config.limit)
+
+        pending = {}
+        for variant, fingerprint in self._fingerprints.items():
+            for row_hash, line in self._rows:
+                key = (fingerprint, row_hash)
+                if key not in self._results and key not in pending:
+                    pending[key] = (variant, line)
+
+        failed = await self._execute(pending)
+        run_id = new_run_id()
+        output = self._write(run_id)
+        self._save_state(output)
+        # Only the current fingerprints can be reused by the next run
+        current = {(fingerprint, row_hash) for fingerprint in self._fingerprints.values() for row_hash, _ in self._rows}
+        self._results = {key: value for key, value in self._results.items() if key in current}
+
+        executed_variants = sorted({variant for variant, _ in pending.values()})
+        reused = len(self._fingerprints) * len(self._rows) - len(pending)
+        return WatchCycle(run_id, output, executed_variants, len(pending), reused, failed, time.perf_counter() - start)
+
+    async def _execute(self, pending):
+        runner = FlowRunner(self.flow, self.client, self.config)
+        plans = {variant: self.flow.resolve(variant) for variant in self.dependencies}
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.config.concurrency * 2)
+        failed = 0
+
+        async def worker():
+            nonlocal failed
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                key, (variant, line) = item
+                try:
+                    result = await runner.run_row(plans[variant], json.loads(line))
+                    result["error"] = None
+                except Exception as e:
+                    result = {"output": None, "error": f"{type(e).__name__}: {e}"}
+                    failed += 1
+                # Failed rows are written to this run but tried again on the next one
+                self._results[key] = result
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.config.concurrency)]
+        try:
+            for item in pending.items():
+                await queue.put(item)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+        return failed
+
+    def _write(self, run_id):
+        output = os.path.join(self.dir, RUNS_DIR, f"{run_id}.jsonl")
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        with open(output, "w") as file:
+            for variant, fingerprint in self._fingerprints.items():
+                for row, (row_hash, line) in enumerate(self._rows):
+                    record = {"run_id": run_id, "variant": variant, "row": row, "inputs": json.loads(line),
+                              **self._results[(fingerprint, row_hash)]}
+                    file.write(json.dumps(record, default=str) + "\n")
+        for key in [key for key, result in self._results.items() if result.get("error")]:
+            del self._results[key]
+        return output
+
+    def _fingerprint(self, variant):
+        digest = hashlib.sha256(variant.encode())
+        definition = {"nodes": [dataclasses.asdict(node) for node in self.flow.resolve(variant)],
+                      "inputs": self.flow.inputs, "outputs": self.flow.outputs}
+        digest.update(json.dumps(definition, sort_keys=True, default=str).encode())
+        for source in sorted(self.dependencies[variant] - {FLOW_FILE}):
+            digest.update(source.encode())
+            try:
+                with open(os.path.join(self.dir, source), "rb") as file:
+                    digest.update(hashlib.sha256(file.read()).digest())
+            except FileNotFoundError:
+                digest.update(b"\0missing")
+        return digest.hexdigest()
+
+    def _load_state(self):
+        """Reuses the results of the last watch run, keyed by the fingerprints they were produced with."""
+        try:
+            with open(os.path.join(self.dir, STATE_FILE)) as file:
+                state = json.load(file)
+            with open(state["run"]) as file:
+                records = [json.loads(line) for line in file if line.strip()]
+        except (OSError, ValueError, KeyError):
+            return
+        fingerprints, rows = state.get("variants", {}), state.get("rows", [])
+        for record in records:
+            fingerprint = fingerprints.get(record.get("variant"))
+            row = record.get("row")
+            if fingerprint is None or not isinstance(row, int) or row >= len(rows) or record.get("error"):
+                continue
+            self._results[(fingerprint, rows[row])] = {name: value for name, value in record.items()
+                                                       if name not in ("run_id", "variant", "row", "inputs")}
+
+    def _save_state(self, output):
+        path = os.path.join(self.dir, STATE_FILE)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "w") as file:
+            json.dump({"run": output, "variants": self._fingerprints, "rows": [row_hash for row_hash, _ in self._rows]}, file)
+        os.replace(f"{path}.tmp", path)
+
+
+def _read_rows(path, limit=None):
+    """Returns (content hash, line) for every non-empty line, numbered like `JsonlDataset` numbers rows."""
+    rows = []
+    with open(path, "rb") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                rows.append((hashlib.sha256(line).hexdigest(), line))
+                if limit is not None and len(rows) >= limit:
+                    break
+    return rows
+
+
+async def watch(experiment_dir: str, client: LLMClient, config: RunConfig | None = None, polling: bool = False,
+                interval: float = DEFAULT_POLL_INTERVAL, on_cycle=None, on_change=None):
+    """Runs the experiment incrementally, then again after every change to its files, until cancelled.
+
+    `on_cycle(cycle)` is called after every run and `on_change(paths)` when changes are detected.
+    """
+    incremental = IncrementalRun(experiment_dir, client, config)
+    watcher = create_watcher(experiment_dir, polling, interval)
+    try:
+        cycle = await incremental.run()
+        if on_cycle:
+            on_cycle(cycle)
+        while True:
+            # A short timeout keeps the thread responsive to cancellation
+            changed = await asyncio.to_thread(watcher.wait, 1.0)
+            if not changed:
+                continue
+            if on_change:
+                on_change(changed)
+            incremental.invalidate(changed)
+            try:
+                cycle = await incremental.run()
+            except (OSError, ValueError, KeyError) as e:
+                # A half-edited flow or dataset is reported and retried on the next save
+                print(f"🚨 {e}")
+                incremental.invalidate({FLOW_FILE, DATA_FILE})
+                continue
+            if on_cycle:
+                on_cycle(cycle)
+    finally:
+        watcher.close()
+        await client.close()
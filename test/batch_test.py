@@ -0,0 +1,90 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from src.batch import ManifestEntry, _create_entry, create_batch, load_manifest
+from src.entities import ExperimentType
+
+
+class TestBatch:
+    def test_load_manifest_yaml(self, tmp_path):
+        manifest = tmp_path / "manifest.yaml"
+        manifest.write_text(f"""
+experiments:
+  - name: first
+    issue: 1
+    type: prompt-flow
+    dir: {tmp_path}/out
+  - name: second
+    issue: 2
+""")
+
+        entries = load_manifest(str(manifest))
+
+        assert entries[0] == ManifestEntry("first", 1, ExperimentType.PROMPT_FLOW, f"{tmp_path}/out/")
+        assert entries[1].type == ExperimentType.PROMPT_FLOW
+        assert entries[1].path == "app/experiments/issue-2-second"
+
+    def test_load_manifest_invalid_yaml(self, tmp_path):
+        manifest = tmp_path / "manifest.yaml"
+        manifest.write_text("experiments:\n  - name: [first\n")
+
+        with pytest.raises(ValueError, match="Invalid manifest .*manifest.yaml"):
+            load_manifest(str(manifest))
+
+    def test_load_manifest_jsonl(self, tmp_path):
+        manifest = tmp_path / "manifest.jsonl"
+        manifest.write_text(json.dumps({"name": "first", "issue": 1, "type": "jupyter", "dir": str(tmp_path)}) + "\n\n")
+
+        entries = load_manifest(str(manifest))
+
+        assert entries == [ManifestEntry("first", 1, ExperimentType.JUPYTER_NOTEBOOK, f"{tmp_path}/")]
+
+    def test_load_manifest_reports_all_errors(self, tmp_path):
+        (tmp_path / "issue-3-exists").mkdir()
+        manifest = tmp_path / "manifest.jsonl"
+        lines = [
+            {"name": "Bad Name", "issue": 1},
+            {"name": "ok", "issue": "one"},
+            {"name": "ok", "issue": 2, "type": "unknown"},
+            {"name": "exists", "issue": 3, "dir": str(tmp_path)},
+            {"name": "twice", "issue": 4, "dir": str(tmp_path)},
+            {"name": "twice", "issue": 4, "dir": str(tmp_path)},
+            {"name": "nested", "issue": 5, "dir": ["experiments"]},
+        ]
+        manifest.write_text("\n".join(json.dumps(line) for line in lines))
+
+        with pytest.raises(ValueError) as error:
+            load_manifest(str(manifest))
+
+        message = str(error.value)
+        for index in (1, 2, 3, 4, 6, 7):
+            assert f"entry {index}:" in message
+        assert "invalid dir ['experiments']" in message
+        assert "entry 5:" not in message
+
+    @patch('src.experiment_handler.ExperimentHandler.create', side_effect=RuntimeError("boom"))
+    def test_create_entry_failure(self, mock_create, tmp_path):
+        entry = ManifestEntry("first", 1, ExperimentType.PROMPT_FLOW, f"{tmp_path}/")
+
+        result = _create_entry(entry)
+
+        assert not result.ok
+        assert result.error == "boom"
+        mock_create.assert_called_once_with(name="issue-1-first", type=ExperimentType.PROMPT_FLOW, dir=f"{tmp_path}/", raise_errors=True)
+
+    def test_create_batch_continues_after_failure(self, tmp_path):
+        entries = [
+            ManifestEntry("first", 1, ExperimentType.PROMPT_FLOW, f"{tmp_path}/"),
+            ManifestEntry("second", 2, ExperimentType.PROMPT_FLOW, f"{tmp_path}/"),
+            ManifestEntry("third", 3, ExperimentType.PROMPT_FLOW, f"{tmp_path}/"),
+        ]
+        # The second flow already exists, so creating it fails
+        (tmp_path / "issue-2-second").mkdir()
+        (tmp_path / "issue-2-second" / "flow.dag.yaml").write_text("")
+
+        results = create_batch(entries, workers=2)
+
+        assert [result.entry for result in results] == entries
+        assert [result.ok for result in results] == [True, False, True]
+        assert (tmp_path / "issue-3-third" / "flow.dag.yaml").is_file()
@@ -0,0 +1,27 @@
+from benchmarks.suite import compare, measure
+
+
+class TestCompare:
+    def test_reports_regressions_past_threshold(self):
+        results = {"create": 0.013, "render": 0.0101}
+        baseline = {"create": 0.010, "render": 0.010}
+
+        regressions = compare(results, baseline, threshold=0.25)
+
+        assert len(regressions) == 1
+        assert regressions[0].startswith("create: 13.000 ms vs baseline 10.000 ms")
+
+    def test_ignores_slowdowns_below_noise_floor(self):
+        assert compare({"render": 0.0002}, {"render": 0.0001}, threshold=0.25) == []
+
+    def test_ignores_metrics_missing_from_baseline(self):
+        assert compare({"create_prompty": 1.0}, {}, threshold=0.25) == []
+
+
+def test_measure_returns_fastest_duration():
+    calls = []
+
+    duration = measure(calls.append, repeat=3)
+
+    assert calls == [0, 1, 2]
+    assert duration >= 0
@@ -0,0 +1,182 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from src import catalog as catalog_module
+from src.catalog import Catalog, DuplicateIssueError
+from src.entities import ExperimentType
+from src.experiment_handler import ExperimentHandler
+
+
+def _reserve(catalog_path, path):
+    with Catalog(catalog_path) as catalog:
+        try:
+            catalog.reserve(path, 42)
+            return True
+        except DuplicateIssueError:
+            return False
+
+
+def _make_experiment(root, name, hypothesis="The theory is that", runs=None):
+    path = root / name
+    path.mkdir(parents=True)
+    (path / "flow.dag.yaml").write_text("nodes: []\n")
+    (path / "README.md").write_text(f"# Experiment\n\n{name}\n\n## Hypothesis\n\n{hypothesis}\n\n## Future Considerations & Learnings\n")
+    if runs:
+        (path / "runs").mkdir()
+        (path / "runs" / "20260101-000000-abcdef.jsonl").write_text("\n".join(json.dumps(record) for record in runs) + "\n")
+    return path
+
+
+class TestCatalog:
+    def test_reserve_rejects_duplicate_issue(self, tmp_path):
+        with Catalog() as catalog:
+            assert catalog.reserve(str(tmp_path / "issue-1-first"), 1, ExperimentType.PROMPT_FLOW)
+            assert not catalog.reserve(str(tmp_path / "issue-1-first"), 1)
+
+            with pytest.raises(DuplicateIssueError, match="Issue number 1 is already used"):
+                catalog.reserve(str(tmp_path / "issue-1-second"), 1)
+
+            assert catalog.issue_in_use(1)
+            catalog.release(str(tmp_path / "issue-1-first"))
+            assert not catalog.issue_in_use(1)
+
+    def test_concurrent_reservations(self, tmp_path, catalog):
+        paths = [str(tmp_path / f"issue-42-name-{index}") for index in range(8)]
+
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(_reserve, [str(catalog)] * len(paths), paths))
+
+        assert results.count(True) == 1
+
+    def test_refresh(self, tmp_path):
+        root = tmp_path / "experiments"
+        _make_experiment(root, "issue-1-first", "Shorter prompts are cheaper", runs=[{"error": None}, {"error": "boom"}])
+        _make_experiment(root, "issue-2-second")
+        (root / "not-an-experiment").mkdir()
+
+        with Catalog() as catalog:
+            assert catalog.refresh([str(root)]) == 2
+            entries = catalog.experiments()
+
+        assert [entry.issue for entry in entries] == [1, 2]
+        assert entries[0].type == "prompt-flow"
+        assert entries[0].hypothesis == "Shorter prompts are cheaper"
+        assert (entries[0].last_run_id, entries[0].last_run_rows, entries[0].last_run_failed) == ("20260101-000000-abcdef", 2, 1)
+        assert entries[1].last_run_id is None
+
+    def test_refresh_is_incremental(self, tmp_path):
+        root = tmp_path / "experiments"
+        first = _make_experiment(root, "issue-1-first")
+        _make_experiment(root, "issue-2-second")
+
+        with Catalog() as catalog:
+            catalog.refresh([str(root)])
+            with patch.object(catalog_module, "_hypothesis", wraps=catalog_module._hypothesis) as mock_hypothesis:
+                assert catalog.refresh() == 0
+
+                (first / "README.md").write_text("## Hypothesis\n\nUpdated\n")
+                os.utime(first / "README.md", ns=(0, 1))
+                # Edits inside an experiment leave the root unchanged, so only a full refresh sees them
+                assert catalog.refresh() == 0
+                assert catalog.refresh(full=True) == 1
+                assert mock_hypothesis.call_count == 1
+
+            assert catalog.search("Updated")[0].name == "issue-1-first"
+
+    def test_refresh_skips_unchanged_roots(self, tmp_path):
+        root = tmp_path / "experiments"
+        _make_experiment(root, "issue-1-first")
+        os.utime(root, ns=(0, 1))
+
+        with Catalog() as catalog:
+            catalog.refresh([str(root)])
+            with patch.object(catalog_module.os, "scandir", wraps=os.scandir) as mock_scandir:
+                assert catalog.refresh() == 0
+                mock_scandir.assert_not_called()
+
+                _make_experiment(root, "issue-2-second")
+                with patch.object(catalog_module, "_signature", wraps=catalog_module._signature) as mock_signature:
+                    assert catalog.refresh() == 1
+                # Only the new experiment is read
+                assert mock_signature.call_count == 1
+                assert mock_scandir.call_count == 1
+
+    def test_refresh_removes_deleted_experiments(self, tmp_path):
+        root = tmp_path / "experiments"
+        first = _make_experiment(root, "issue-1-first")
+
+        with Catalog() as catalog:
+            catalog.refresh([str(root)])
+            (first / "README.md").unlink()
+            (first / "flow.dag.yaml").unlink()
+            first.rmdir()
+
+            assert catalog.refresh() == 1
+            assert catalog.experiments() == []
+
+    def test_search(self, tmp_path):
+        root = tmp_path / "experiments"
+        _make_experiment(root, "issue-10-summarise", "Summaries improve recall")
+        _make_experiment(root, "issue-11-classify")
+
+        with Catalog() as catalog:
+            catalog.refresh([str(root)])
+
+            assert [entry.issue for entry in catalog.search("recall")] == [10]
+            assert [entry.issue for entry in catalog.search("classify")] == [11]
+            assert [entry.issue for entry in catalog.search("11")] == [11]
+            assert len(catalog.search("prompt-flow")) == 2
+
+    def test_record_run(self, tmp_path):
+        path = str(tmp_path / "issue-1-first")
+        with Catalog() as catalog:
+            catalog.reserve(path, 1)
+            catalog.record_run(path, "run-1", 10, 2)
+
+            entry = catalog.experiments()[0]
+        assert (entry.last_run_id, entry.last_run_rows, entry.last_run_failed) == ("run-1", 10, 2)
+
+    def test_create_rejects_duplicate_issue(self, tmp_path):
+        dir = f"{tmp_path}/"
+        ExperimentHandler.create("issue-5-first", ExperimentType.PROMPT_FLOW, dir, raise_errors=True)
+
+        with pytest.raises(DuplicateIssueError):
+            ExperimentHandler.create("issue-5-second", ExperimentType.PROMPT_FLOW, dir, raise_errors=True)
+
+        assert not (tmp_path / "issue-5-second").exists()
+
+    def test_create_rejects_duplicate_issue_not_yet_in_catalog(self, tmp_path):
+        (tmp_path / "issue-5-old").mkdir()
+
+        with pytest.raises(DuplicateIssueError):
+            ExperimentHandler.create("issue-5-new", ExperimentType.PROMPT_FLOW, f"{tmp_path}/", raise_errors=True)
+
+        assert not (tmp_path / "issue-5-new").exists()
+
+    def test_create_scans_root_only_when_changed_outside_the_catalog(self, tmp_path):
+        root = tmp_path / "experiments"
+        root.mkdir()
+        dir = f"{root}/"
+        ExperimentHandler.create("issue-1-first", ExperimentType.PROMPT_FLOW, dir, raise_errors=True)
+
+        with patch.object(Catalog, "_refresh_root", autospec=True, side_effect=Catalog._refresh_root) as mock_refresh_root:
+            ExperimentHandler.create("issue-2-second", ExperimentType.PROMPT_FLOW, dir, raise_errors=True)
+            mock_refresh_root.assert_not_called()
+
+            (root / "issue-3-manual").mkdir()
+            with pytest.raises(DuplicateIssueError):
+                ExperimentHandler.create("issue-3-other", ExperimentType.PROMPT_FLOW, dir, raise_errors=True)
+            assert mock_refresh_root.call_count == 1
+
+    @patch('src.experiments.prompt_flow.PromptFlowExperiment.create_resources', side_effect=RuntimeError("boom"))
+    def test_failed_create_releases_issue(self, mock_create_resources, tmp_path):
+        dir = f"{tmp_path}/"
+
+        with pytest.raises(RuntimeError):
+            ExperimentHandler.create("issue-6-broken", ExperimentType.PROMPT_FLOW, dir, raise_errors=True)
+
+        with Catalog() as catalog:
+            assert not catalog.issue_in_use(6)
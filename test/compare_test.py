@@ -0,0 +1,121 @@
+import json
+
+import numpy as np
+import pytest
+from src.compare import REPORT_END, REPORT_START, ComparisonReport, compare_runs, format_report, load_columns, paired_bootstrap, record_columns, write_findings
+
+
+def _write_run(path, rows, variants=("llm.variant_0", "llm.variant_1")):
+    with open(path, "w") as file:
+        for row in range(rows):
+            for offset, variant in enumerate(variants):
+                file.write(json.dumps({
+                    "run_id": "run", "variant": variant, "row": row,
+                    "inputs": {"text": f"t{row}", "expected": f"t{row}"},
+                    # The second variant answers every other row correctly and is 10 ms slower
+                    "output": {"output": f"t{row}" if offset == 0 or row % 2 else "wrong"},
+                    "latency": 0.1 + 0.01 * offset + 0.001 * (row % 7),
+                    "prompt_tokens": 10, "completion_tokens": 5 + offset,
+                    "error": None,
+                }) + "\n")
+
+
+class TestCompare:
+    def test_chunked_load_matches_single_chunk(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        _write_run(path, 50)
+        with open(path, "a") as file:
+            file.write('{"variant": "llm.variant_0", "row": 5')
+
+        whole = load_columns([str(path)], chunk_rows=1000)
+        chunked = load_columns([str(path)], chunk_rows=7)
+
+        assert sorted(whole) == ["llm.variant_0", "llm.variant_1"]
+        for variant, columns in whole.items():
+            for name, values in columns.items():
+                np.testing.assert_array_equal(values, chunked[variant][name])
+        assert len(whole["llm.variant_0"]["row"]) == 50
+
+    def test_compare_runs(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        _write_run(path, 200)
+
+        report = compare_runs([str(path)], resamples=200)
+
+        baseline, variant = report.variants
+        assert baseline.exact_match == 1.0
+        assert variant.exact_match == 0.5
+        assert baseline.latency_p50 == pytest.approx(0.103)
+        assert variant.completion_tokens == 6.0
+        assert variant.score_mean is None
+
+        [comparison] = report.comparisons
+        assert comparison.rows == 200
+        assert comparison.latency.mean == pytest.approx(0.01)
+        assert comparison.latency.significant
+        assert comparison.tokens.mean == 1.0
+        assert comparison.exact_match.mean == -0.5
+        assert comparison.exact_match.low < -0.5 < comparison.exact_match.high
+        assert comparison.score is None
+
+    def test_pairs_only_rows_both_variants_completed(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        _write_run(path, 10)
+        with open(path, "a") as file:
+            file.write(json.dumps({"variant": "llm.variant_0", "row": 10, "latency": 1.0, "error": None}) + "\n")
+            file.write(json.dumps({"variant": "llm.variant_1", "row": 10, "output": None, "error": "TimeoutError: "}) + "\n")
+
+        report = compare_runs([str(path)], resamples=100)
+
+        assert report.variants[1].failed == 1
+        assert report.comparisons[0].rows == 10
+
+    def test_unknown_baseline(self, tmp_path):
+        path = tmp_path / "run.jsonl"
+        _write_run(path, 3)
+
+        with pytest.raises(ValueError, match="Unknown baseline variant"):
+            compare_runs([str(path)], baseline="llm.variant_9")
+
+    def test_zero_latency_is_kept(self):
+        columns = record_columns([{"row": 0, "latency": 0.0}, {"row": 1, "latency": None}, {"row": 2}])
+
+        np.testing.assert_array_equal(columns["latency"], [0.0, np.nan, np.nan])
+
+    def test_paired_bootstrap_handles_missing_values(self):
+        differences = np.column_stack([np.arange(100.0), np.where(np.arange(100) % 2, 1.0, np.nan), np.full(100, np.nan)])
+
+        first, second, missing = paired_bootstrap(differences, resamples=200, seed=1)
+
+        assert first.mean == 49.5
+        assert first.low < 49.5 < first.high
+        assert (second.mean, second.low, second.high) == (1.0, 1.0, 1.0)
+        assert missing is None
+
+    def test_paired_bootstrap_is_deterministic(self):
+        differences = np.random.default_rng(0).normal(size=500)
+
+        assert paired_bootstrap(differences, seed=3) == paired_bootstrap(differences, seed=3)
+
+
+class TestWriteFindings:
+    def test_inserts_under_findings_heading_and_replaces_on_rerun(self, tmp_path):
+        readme = tmp_path / "README.md"
+        readme.write_text("# Experiment\n\n## Findings\n\nNotes.\n\n## Future Considerations & Learnings\n")
+
+        write_findings(str(readme), "first")
+        write_findings(str(readme), "second")
+
+        text = readme.read_text()
+        assert text == (f"# Experiment\n\n## Findings\n\n{REPORT_START}\nsecond\n{REPORT_END}\n\nNotes.\n\n"
+                        "## Future Considerations & Learnings\n")
+
+    def test_appends_findings_section(self, tmp_path):
+        readme = tmp_path / "README.md"
+        readme.write_text("# Experiment\n")
+
+        report = ComparisonReport(runs=["run.jsonl"], variants=[], comparisons=[], confidence=0.95)
+        write_findings(str(readme), format_report(report))
+
+        assert readme.read_text().startswith(f"# Experiment\n\n## Findings\n\n{REPORT_START}\n")
+
@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def catalog(tmp_path, monkeypatch):
+    """Keeps every test's experiment catalog out of the working directory."""
+    path = tmp_path / "catalog.sqlite"
+    monkeypatch.setenv("PROMPT_IGNITE_CATALOG", str(path))
+    return path
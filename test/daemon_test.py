@@ -0,0 +1,118 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+from src import daemon as daemon_module
+from src.daemon import Daemon, forward, send
+
+
+@pytest.fixture
+def running_daemon(tmp_path, monkeypatch):
+    def start(**options):
+        path = str(tmp_path / "daemon.sock")
+        monkeypatch.setenv("PROMPT_IGNITE_DAEMON_SOCKET", path)
+        daemon = Daemon(path, **options)
+        ready = threading.Event()
+        thread = threading.Thread(target=lambda: asyncio.run(daemon.serve(ready=ready.set)), daemon=True)
+        thread.start()
+        assert ready.wait(10)
+        started.append(thread)
+        return daemon
+
+    started = []
+    yield start
+    send("shutdown")
+    for thread in started:
+        thread.join(10)
+
+
+class TestDaemon:
+    def test_create_and_list(self, running_daemon, tmp_path):
+        running_daemon()
+
+        created = send("create", {"name": "issue-7-warm", "type": "prompty", "dir": f"{tmp_path}/"})
+        listed = send("list", {"dirs": [str(tmp_path)]})
+
+        assert created["ok"]
+        assert "Experiment setup complete" in created["output"]
+        assert os.path.isfile(tmp_path / "issue-7-warm" / "hello.prompty")
+        assert [(entry["issue"], entry["type"]) for entry in listed["result"]] == [(7, "prompty")]
+        assert send("list", {"query": "warm", "refresh": False})["result"][0]["name"] == "issue-7-warm"
+
+    def test_concurrent_requests_beyond_the_queue_are_told_to_back_off(self, running_daemon, monkeypatch):
+        release = threading.Event()
+        monkeypatch.setitem(daemon_module.OPERATIONS, "slow", lambda: release.wait(10))
+        running_daemon(workers=1, queue_size=1)
+
+        responses = []
+        threads = [threading.Thread(target=lambda: responses.append(send("slow"))) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+            # One request running, one queued, the third finds the queue full
+            time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join(10)
+
+        assert sorted(bool(response.get("busy")) for response in responses) == [False, False, True]
+        assert send("ping")["result"]["served"] == 2
+
+    def test_errors_are_reported_with_output(self, running_daemon, tmp_path):
+        running_daemon()
+
+        response = send("unknown")
+
+        assert not response["ok"]
+        assert response["error"] == "Unknown command: unknown"
+
+        assert send("create", {"name": "issue-8-first", "type": "prompty", "dir": f"{tmp_path}/"})["ok"]
+        response = send("create", {"name": "issue-8-second", "type": "prompty", "dir": f"{tmp_path}/"})
+        assert not response["ok"]
+        assert response["error"].startswith("DuplicateIssueError: Issue number 8 is already used")
+        assert "Oops!" in response["output"]
+
+    def test_forward_runs_in_process_without_daemon(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PROMPT_IGNITE_DAEMON_SOCKET", str(tmp_path / "missing.sock"))
+
+        assert forward("list") is None
+
+    def test_forward_skips_daemon_of_another_directory(self, running_daemon, tmp_path, monkeypatch):
+        running_daemon()
+        monkeypatch.chdir(tmp_path)
+
+        assert forward("list") is None
+        monkeypatch.setenv("PROMPT_IGNITE_NO_DAEMON", "1")
+        assert send("ping")["ok"]
+
+    def test_forward_skips_daemon_with_other_settings(self, running_daemon, tmp_path, monkeypatch):
+        running_daemon()
+        daemon_settings = daemon_module.settings
+        # The client sees another catalog than the daemon
+        monkeypatch.setattr(daemon_module, "settings",
+                            lambda environ=None: {**daemon_settings(environ), "PROMPT_IGNITE_CATALOG": "other.sqlite"} if environ is None else daemon_settings(environ))
+
+        response = send("list")
+
+        assert response["unsupported"]
+        assert response["error"] == "The daemon runs with different PROMPT_IGNITE_CATALOG"
+        assert forward("list") is None
+
+    def test_settings(self):
+        environ = {"PROMPT_IGNITE_CATALOG": "c.sqlite", "PROMPT_IGNITE_USE_PF_CLI": "1", "VIRTUAL_ENV": "/venv",
+                   "PROMPT_IGNITE_DAEMON_SOCKET": "d.sock", "PROMPT_IGNITE_NO_DAEMON": "1", "HOME": "/root"}
+
+        assert daemon_module.settings(environ) == {"PROMPT_IGNITE_CATALOG": "c.sqlite", "PROMPT_IGNITE_USE_PF_CLI": "1", "VIRTUAL_ENV": "/venv"}
+
+    def test_settings_resolve_the_project_virtual_env(self, tmp_path, monkeypatch):
+        (tmp_path / ".venv").mkdir()
+        (tmp_path / ".venv" / "pyvenv.cfg").write_text("home = /usr/bin\n")
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(sys, "prefix", sys.base_prefix)
+
+        # The daemon connected to the project's .venv while warming up, the client never did
+        daemon_settings = daemon_module.settings({"VIRTUAL_ENV": str(tmp_path / ".venv")})
+
+        assert daemon_module.settings({}) == daemon_settings == {"VIRTUAL_ENV": str(tmp_path / ".venv")}
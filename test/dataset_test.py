@@ -0,0 +1,104 @@
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from src.dataset import INDEX_SUFFIX, JsonlDataset
+
+
+def _write_rows(path, count, trailing_newline=True):
+    text = "\n".join(json.dumps({"id": index}) for index in range(count))
+    path.write_text(text + ("\n" if trailing_newline else ""))
+
+
+class TestJsonlDataset:
+    def test_random_access(self, tmp_path):
+        path = tmp_path / "data.jsonl"
+        _write_rows(path, 10)
+
+        with JsonlDataset(str(path)) as dataset:
+            assert len(dataset) == 10
+            assert dataset[0] == {"id": 0}
+            assert dataset[7] == {"id": 7}
+            assert dataset[-1] == {"id": 9}
+            with pytest.raises(IndexError):
+                dataset[10]
+
+    def test_skips_blank_lines_and_missing_trailing_newline(self, tmp_path):
+        path = tmp_path / "data.jsonl"
+        path.write_text('{"id": 0}\n\n  \r\n{"id": 1}\n\n{"id": 2}')
+
+        with JsonlDataset(str(path)) as dataset:
+            assert list(dataset) == [{"id": 0}, {"id": 1}, {"id": 2}]
+
+    def test_long_whitespace_line_is_not_a_row(self, tmp_path):
+        path = tmp_path / "data.jsonl"
+        path.write_text('{"a": 1}\n        \n  {"a": 2}\n\t\f\v \r\n{"a": 3}\n')
+
+        with JsonlDataset(str(path)) as dataset:
+            assert list(dataset) == [{"a": 1}, {"a": 2}, {"a": 3}]
+            assert dataset.raw_rows() == [b'{"a": 1}', b'  {"a": 2}', b'{"a": 3}']
+            assert dataset.raw_rows(1) == [b'  {"a": 2}', b'{"a": 3}']
+
+    def test_raw_rows(self, tmp_path):
+        path = tmp_path / "data.jsonl"
+        path.write_text('{"id": 0}\r\n\n  \r\n{"id": 1}\n\n{"id": 2}')
+
+        with JsonlDataset(str(path)) as dataset:
+            assert dataset.raw_rows() == [b'{"id": 0}', b'{"id": 1}', b'{"id": 2}']
+            assert dataset.raw_rows(1, 2) == [b'{"id": 1}']
+            assert dataset.raw_rows(2, 10) == [b'{"id": 2}']
+            assert dataset.raw_rows(3) == []
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "data.jsonl"
+        path.write_text("")
+
+        with JsonlDataset(str(path)) as dataset:
+            assert len(dataset) == 0
+
+    def test_index_is_persisted_and_reused(self, tmp_path):
+        path = tmp_path / "data.jsonl"
+        _write_rows(path, 5)
+        JsonlDataset(str(path)).close()
+
+        assert os.path.exists(f"{path}{INDEX_SUFFIX}")
+        with patch.object(JsonlDataset, "_build_index") as mock_build_index:
+            with JsonlDataset(str(path)) as dataset:
+                assert dataset[4] == {"id": 4}
+            mock_build_index.assert_not_called()
+
+    def test_index_is_rebuilt_when_file_changes(self, tmp_path):
+        path = tmp_path / "data.jsonl"
+        _write_rows(path, 5)
+        JsonlDataset(str(path)).close()
+
+        _write_rows(path, 8)
+        os.utime(path, ns=(0, 1))
+
+        with JsonlDataset(str(path)) as dataset:
+            assert len(dataset) == 8
+
+    def test_shards_cover_every_row_once(self, tmp_path):
+        path = tmp_path / "data.jsonl"
+        _write_rows(path, 10)
+
+        with JsonlDataset(str(path)) as dataset:
+            shards = [dataset.shard(index, 3) for index in range(3)]
+
+            assert [len(shard) for shard in shards] == [4, 3, 3]
+            assert [row for shard in shards for row in shard] == list(range(10))
+            assert list(dataset.rows(shards[1].start, shards[1].stop)) == [(row, {"id": row}) for row in range(4, 7)]
+            with pytest.raises(ValueError):
+                dataset.shard(3, 3)
+
+    def test_sample_is_deterministic(self, tmp_path):
+        path = tmp_path / "data.jsonl"
+        _write_rows(path, 100)
+
+        with JsonlDataset(str(path)) as dataset:
+            sample = dataset.sample(10, seed=42)
+
+            assert sample == dataset.sample(10, seed=42)
+            assert sample == sorted(set(sample))
+            assert len(dataset.sample(500)) == 100
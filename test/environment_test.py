@@ -0,0 +1,80 @@
+import os
+from unittest.mock import patch
+
+from src import environment
+from src.environment import activate_virtual_env, active_virtual_env, parse_env, project_virtual_env, read_env_file
+
+
+class TestEnvironment:
+    def test_parse_env(self):
+        text = """
+# comment
+PLAIN=value
+export EXPORTED=exported
+SPACED = spaced value # trailing comment
+SINGLE='single # not a comment'
+DOUBLE="line\\nbreak \\"quoted\\""
+EMPTY=
+URL=https://example.com/#anchor
+not a variable
+"""
+        values = parse_env(text)
+
+        assert values == {
+            "PLAIN": "value",
+            "EXPORTED": "exported",
+            "SPACED": "spaced value",
+            "SINGLE": "single # not a comment",
+            "DOUBLE": 'line\nbreak "quoted"',
+            "EMPTY": "",
+            "URL": "https://example.com/#anchor",
+        }
+
+    def test_read_env_file_missing(self, tmp_path):
+        assert read_env_file(str(tmp_path / ".env")) is None
+
+    def test_read_env_file_is_cached_until_modified(self, tmp_path):
+        env_file = tmp_path / ".env"
+        env_file.write_text("KEY=first\n")
+
+        with patch.object(environment, "parse_env", wraps=parse_env) as mock_parse_env:
+            assert read_env_file(str(env_file)) == {"KEY": "first"}
+            assert read_env_file(str(env_file)) == {"KEY": "first"}
+            assert mock_parse_env.call_count == 1
+
+            env_file.write_text("KEY=second\n")
+            os.utime(env_file, ns=(0, 1))
+
+            assert read_env_file(str(env_file)) == {"KEY": "second"}
+            assert mock_parse_env.call_count == 2
+
+    @patch.dict(os.environ, {"VIRTUAL_ENV": "/path/to/venv"})
+    def test_active_virtual_env_from_environment(self):
+        assert active_virtual_env() == "/path/to/venv"
+
+    @patch("sys.base_prefix", "/usr")
+    @patch("sys.prefix", "/project/.venv")
+    @patch.dict(os.environ, {}, clear=True)
+    def test_active_virtual_env_from_prefix(self):
+        assert active_virtual_env() == "/project/.venv"
+
+    @patch("sys.base_prefix", "/usr")
+    @patch("sys.prefix", "/usr")
+    @patch.dict(os.environ, {}, clear=True)
+    def test_no_active_virtual_env(self):
+        assert active_virtual_env() is None
+
+    def test_project_virtual_env(self, tmp_path):
+        assert project_virtual_env(str(tmp_path)) is None
+
+        (tmp_path / ".venv").mkdir()
+        (tmp_path / ".venv" / "pyvenv.cfg").write_text("home = /usr/bin\n")
+
+        assert project_virtual_env(str(tmp_path)) == str(tmp_path / ".venv")
+
+    @patch.dict(os.environ, {"PATH": "/usr/bin"}, clear=True)
+    def test_activate_virtual_env(self):
+        activate_virtual_env("/project/.venv")
+
+        assert os.environ["VIRTUAL_ENV"] == "/project/.venv"
+        assert os.environ["PATH"].split(os.pathsep)[0] == os.path.join("/project/.venv", "bin")
@@ -0,0 +1,73 @@
+import asyncio
+import sys
+import time
+
+import pytest
+from src.executor import CommandError, CommandExecutor
+
+
+class TestCommandExecutor:
+    def test_run_streams_output(self):
+        lines = []
+        executor = CommandExecutor(log_sink=lambda command, stream, line: lines.append((stream, line)))
+
+        result = executor.run_sync("echo hello && echo oops >&2")
+
+        assert result.ok
+        assert result.returncode == 0
+        assert result.stderr_tail == ["oops"]
+        assert ("stdout", "hello") in lines
+        assert ("stderr", "oops") in lines
+
+    def test_run_argument_list(self):
+        result = CommandExecutor().run_sync([sys.executable, "-c", "print('hi')"])
+
+        assert result.ok
+        assert result.command.endswith("-c print('hi')")
+
+    def test_run_failure_keeps_stderr_tail(self):
+        executor = CommandExecutor(stderr_tail=2)
+
+        with pytest.raises(CommandError, match="Error executing command") as error:
+            executor.run_sync("echo one >&2; echo two >&2; echo three >&2; exit 3")
+
+        assert error.value.result.returncode == 3
+        assert error.value.result.stderr_tail == ["two", "three"]
+
+    def test_run_without_check(self):
+        result = CommandExecutor().run_sync("exit 2", check=False)
+
+        assert not result.ok
+        assert result.returncode == 2
+
+    def test_timeout(self):
+        start = time.perf_counter()
+
+        result = CommandExecutor().run_sync("sleep 5", timeout=0.2, check=False)
+
+        assert result.timed_out
+        assert not result.ok
+        assert time.perf_counter() - start < 2
+
+    def test_cancellation_kills_process(self):
+        async def cancel():
+            task = asyncio.create_task(CommandExecutor().run("sleep 5"))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        start = time.perf_counter()
+        asyncio.run(cancel())
+        assert time.perf_counter() - start < 2
+
+    def test_run_all_limits_concurrency(self):
+        executor = CommandExecutor(max_concurrency=2)
+        commands = ["sleep 0.3"] * 4
+
+        start = time.perf_counter()
+        results = asyncio.run(executor.run_all(commands))
+        duration = time.perf_counter() - start
+
+        assert all(result.ok for result in results)
+        assert 0.6 <= duration < 1.2
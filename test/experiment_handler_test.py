@@ -1,6 +1,5 @@
 import os
-import subprocess
-from unittest.mock import MagicMock, mock_open, patch
+from unittest.mock import patch
 
 from src.config import DEFAULT_EXPERIMENT_DIR
 from src.experiment_handler import ExperimentHandler
@@ -8,25 +7,34 @@ from src.experiments.prompt_flow import PromptFlowExperiment
 
 
 class TestExperimentHandler:
-    @patch('src.experiment_handler.ExperimentHandler._run_command')
+    @patch('src.experiment_handler.activate_virtual_env')
+    @patch('src.experiment_handler.project_virtual_env', return_value='/project/.venv')
+    @patch('src.experiment_handler.active_virtual_env', return_value=None)
     @patch.dict(os.environ, {}, clear=True)
-    def test_check_and_connect_virtual_env_not_connected(self, mock_run_command):
+    def test_check_and_connect_virtual_env_not_connected(self, mock_active_virtual_env, mock_project_virtual_env, mock_activate_virtual_env):
         ExperimentHandler()
-        mock_run_command.assert_called_once_with('source .venv/bin/activate')
+        mock_activate_virtual_env.assert_called_once_with('/project/.venv')
+
+    @patch('src.experiment_handler.activate_virtual_env')
+    @patch('src.experiment_handler.project_virtual_env', return_value=None)
+    @patch('src.experiment_handler.active_virtual_env', return_value=None)
+    @patch.dict(os.environ, {}, clear=True)
+    def test_check_and_connect_virtual_env_missing(self, mock_active_virtual_env, mock_project_virtual_env, mock_activate_virtual_env):
+        ExperimentHandler()
+        mock_activate_virtual_env.assert_not_called()
 
     @patch('os.environ', {'VIRTUAL_ENV': '/path/to/venv'})
-    @patch('src.experiment_handler.ExperimentHandler._run_command')
-    def test_check_and_connect_virtual_env_connected(self, mock_run_command):
+    @patch('src.experiment_handler.activate_virtual_env')
+    def test_check_and_connect_virtual_env_connected(self, mock_activate_virtual_env):
         ExperimentHandler()
-        mock_run_command.assert_not_called()
+        mock_activate_virtual_env.assert_not_called()
 
-    @patch('os.path.exists')
-    @patch('builtins.open', new_callable=mock_open, read_data="VARNAME=value")
-    @patch('src.experiment_handler.ExperimentHandler._run_command')
-    def test_read_and_set_env_vars(self, mock_exists, mock_open, mock_run_command):
-        mock_exists.return_value = True
+    @patch('src.experiment_handler.read_env_file', return_value={'VARNAME': 'value'})
+    @patch.dict(os.environ, {'VIRTUAL_ENV': '/path/to/venv'}, clear=True)
+    def test_read_and_set_env_vars(self, mock_read_env_file):
         ExperimentHandler()
-        mock_open.assert_called_once_with('.env')
+        mock_read_env_file.assert_called_once_with('.env')
+        assert os.environ['VARNAME'] == 'value'
 
     @patch('src.experiments.prompt_flow.PromptFlowExperiment.create_documentation')
     @patch('src.experiments.prompt_flow.PromptFlowExperiment.create_resources')
@@ -38,21 +46,6 @@ class TestExperimentHandler:
         mock_create_resources.assert_called_once_with()
         mock_create_documentation.assert_called_once_with()
 
-    @patch('subprocess.Popen')
-    @patch('os.environ', {'VIRTUAL_ENV': '/path/to/venv'})
-    def test_run_command(self, mock_popen):
-        mock_process = MagicMock()
-        mock_process.communicate.return_value = (b'', b'')
-        mock_process.returncode = 0
-        mock_popen.return_value = mock_process
-
-        command = 'echo hello'
-        experiment_handler = ExperimentHandler()
-        return_code = experiment_handler._run_command(command)
-
-        mock_popen.assert_called_once_with(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=os.environ.copy())
-        assert return_code == 0
-
     @patch.object(ExperimentHandler, '_check_and_connect_virtual_env')
     @patch.object(ExperimentHandler, '_read_and_set_env_vars')
     @patch('builtins.input', return_value='')
@@ -67,11 +60,10 @@ class TestExperimentHandler:
         mock_makedirs.assert_called_once_with(expected_directory)
         assert result == expected_directory
 
-    @patch.object(ExperimentHandler, '_run_command')
     @patch('builtins.input', return_value='mydir')  # Simulate user input without './' and without '/'
     @patch('os.path.exists', return_value=False)  # Simulate directory does not exist
     @patch('os.makedirs')
-    def test_get_experiment_dir(self, mock_makedirs, mock_exists, mock_input, mock_run_command):
+    def test_get_experiment_dir(self, mock_makedirs, mock_exists, mock_input):
         experiment = ExperimentHandler()
 
         
@@ -81,11 +73,10 @@ class TestExperimentHandler:
         mock_makedirs.assert_called_once_with(expected_directory)
         assert result == expected_directory
 
-    @patch.object(ExperimentHandler, '_run_command')
     @patch('builtins.input', return_value='./mydir/')  # Simulate user input with './' but without '/'
     @patch('os.path.exists', return_value=False)  # Simulate directory does not exist
     @patch('os.makedirs')
-    def test_get_experiment_dir_with_dot_slash(self, mock_makedirs, mock_exists, mock_input, mock_run_command):
+    def test_get_experiment_dir_with_dot_slash(self, mock_makedirs, mock_exists, mock_input):
         experiment = ExperimentHandler()
 
         
@@ -95,11 +86,10 @@ class TestExperimentHandler:
         mock_makedirs.assert_called_once_with(expected_directory)
         assert result == expected_directory
 
-    @patch.object(ExperimentHandler, '_run_command')
     @patch('builtins.input', return_value='mydir/')  # Simulate user input with './' but without '/'
     @patch('os.path.exists', return_value=False)  # Simulate directory does not exist
     @patch('os.makedirs')
-    def test_get_experiment_dir_without_preceding_dot_slash(self, mock_makedirs, mock_exists, mock_input, mock_run_command):
+    def test_get_experiment_dir_without_preceding_dot_slash(self, mock_makedirs, mock_exists, mock_input):
         experiment = ExperimentHandler()
 
         
@@ -109,11 +99,10 @@ class TestExperimentHandler:
         mock_makedirs.assert_called_once_with(expected_directory)
         assert result == expected_directory
     
-    @patch.object(ExperimentHandler, '_run_command')
     @patch('builtins.input', return_value='./mydir')  # Simulate user input with './' but without '/'
     @patch('os.path.exists', return_value=False)  # Simulate directory does not exist
     @patch('os.makedirs')
-    def test_get_experiment_dir_without_succeeding_slash(self, mock_makedirs, mock_exists, mock_input, mock_run_command):
+    def test_get_experiment_dir_without_succeeding_slash(self, mock_makedirs, mock_exists, mock_input):
         experiment = ExperimentHandler()
 
         
@@ -123,11 +112,10 @@ class TestExperimentHandler:
         mock_makedirs.assert_called_once_with(expected_directory)
         assert result == expected_directory
     
-    @patch.object(ExperimentHandler, '_run_command')
     @patch('builtins.input', return_value='mydir/temp')  # Simulate user input with './' but without '/'
     @patch('os.path.exists', return_value=False)  # Simulate directory does not exist
     @patch('os.makedirs')
-    def test_get_experiment_dir_without_preceding_dot_and_slash_and_succeeding_slash(self, mock_makedirs, mock_exists, mock_input, mock_run_command):
+    def test_get_experiment_dir_without_preceding_dot_and_slash_and_succeeding_slash(self, mock_makedirs, mock_exists, mock_input):
         experiment = ExperimentHandler()
 
         
@@ -137,11 +125,10 @@ class TestExperimentHandler:
         mock_makedirs.assert_called_once_with(expected_directory)
         assert result == expected_directory
 
-    @patch.object(ExperimentHandler, '_run_command')
     @patch('builtins.input', return_value='/absolute/path')  # Simulate absolute path input
     @patch('os.path.exists', return_value=False)  # Simulate directory does not exist
     @patch('os.makedirs')
-    def test_get_experiment_dir_absolute(self, mock_makedirs, mock_exists, mock_input, mock_run_command):
+    def test_get_experiment_dir_absolute(self, mock_makedirs, mock_exists, mock_input):
         experiment = ExperimentHandler()
 
         
@@ -152,11 +139,10 @@ class TestExperimentHandler:
         assert result == expected_directory
 
     @patch.object(ExperimentHandler, '_read_and_set_env_vars')
-    @patch.object(ExperimentHandler, '_run_command')
     @patch('builtins.input', return_value='./existingdir')  # Simulate existing directory
     @patch('os.path.exists', return_value=False)  # Simulate directory already exists
     @patch('os.makedirs')
-    def test_get_experiment_dir_doesnt_exist_directory(self, mock_mkdir, mock_exists, mock_input, mock_run_command, mock_read_and_set_env_vars):
+    def test_get_experiment_dir_doesnt_exist_directory(self, mock_mkdir, mock_exists, mock_input, mock_read_and_set_env_vars):
         experiment = ExperimentHandler()
 
         experiment._get_experiment_dir()
@@ -164,11 +150,10 @@ class TestExperimentHandler:
         mock_mkdir.assert_called_once_with("./existingdir/")
 
     @patch.object(ExperimentHandler, '_read_and_set_env_vars')
-    @patch.object(ExperimentHandler, '_run_command')
     @patch('builtins.input', return_value='./existingdir')  # Simulate existing directory
     @patch('os.path.exists', return_value=True)  # Simulate directory already exists
     @patch('os.makedirs')
-    def test_get_experiment_dir_exists_directory(self, mock_mkdir, mock_exists, mock_input, mock_run_command, mock_read_and_set_env_vars):
+    def test_get_experiment_dir_exists_directory(self, mock_mkdir, mock_exists, mock_input, mock_read_and_set_env_vars):
         experiment = ExperimentHandler()
 
         experiment._get_experiment_dir()
@@ -0,0 +1,34 @@
+import json
+import os
+
+import pytest
+from src.experiments.jupytor_notebook import EXPLORATION_NOTEBOOK, JupyterNotebookExperiment
+from src.notebooks import RUNNER_NOTEBOOK
+
+
+class TestJupyterNotebookExperiment:
+    def test_create(self, tmp_path):
+        experiment = JupyterNotebookExperiment("issue-1-notebook", f"{tmp_path}/")
+
+        experiment.create()
+
+        experiment_dir = tmp_path / "issue-1-notebook"
+        assert sorted(os.listdir(experiment_dir)) == ["README.md", "data.jsonl", EXPLORATION_NOTEBOOK, RUNNER_NOTEBOOK]
+        assert "issue-1-notebook" in (experiment_dir / "README.md").read_text()
+        runner = json.loads((experiment_dir / RUNNER_NOTEBOOK).read_text())
+        assert runner["nbformat"] == 4
+        assert any(cell["metadata"].get("tags") == ["parameters"] for cell in runner["cells"])
+
+    def test_notebooks_are_valid_nbformat(self, tmp_path):
+        nbformat = pytest.importorskip("nbformat")
+        JupyterNotebookExperiment("issue-1-notebook", f"{tmp_path}/").create_resources()
+
+        for name in (EXPLORATION_NOTEBOOK, RUNNER_NOTEBOOK):
+            nbformat.validate(nbformat.read(tmp_path / "issue-1-notebook" / name, as_version=4))
+
+    def test_create_resources_existing_notebooks(self, tmp_path):
+        experiment = JupyterNotebookExperiment("issue-1-notebook", f"{tmp_path}/")
+        experiment.create_resources()
+
+        with pytest.raises(FileExistsError):
+            experiment.create_resources()
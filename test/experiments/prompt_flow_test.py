@@ -1,15 +1,36 @@
-import unittest
-from unittest.mock import MagicMock, mock_open, patch
+import os
+from unittest.mock import patch
 
 import pytest
 from src.config import DEFAULT_EXPERIMENT_DIR
-from src.experiments.prompt_flow import PromptFlowExperiment
+from src.executor import CommandError
+from src.experiments.prompt_flow import FLOW_TEMPLATE_FILES, PromptFlowExperiment
 
 
 class TestPromptFlowExperiment:
     @patch('src.experiments.prompt_flow.PromptFlowExperiment._run_command')
-    def test_create_resources(self, mock_run_command):
-        experiment = PromptFlowExperiment("test-experiment", DEFAULT_EXPERIMENT_DIR)    
+    def test_create_resources(self, mock_run_command, tmp_path):
+        experiment = PromptFlowExperiment("test-experiment", f"{tmp_path}/")
+
+        experiment.create_resources()
+
+        mock_run_command.assert_not_called()
+        for filename in FLOW_TEMPLATE_FILES:
+            assert os.path.isfile(tmp_path / "test-experiment" / filename)
+        with open(tmp_path / "test-experiment" / "flow.dag.yaml") as file:
+            assert "path: hello.jinja2" in file.read()
+        assert sorted(os.listdir(tmp_path / "test-experiment")) == sorted(FLOW_TEMPLATE_FILES)
+
+    def test_create_resources_existing_flow(self, tmp_path):
+        experiment = PromptFlowExperiment("test-experiment", f"{tmp_path}/")
+        experiment.create_resources()
+
+        with pytest.raises(FileExistsError):
+            experiment.create_resources()
+
+    @patch('src.experiments.prompt_flow.PromptFlowExperiment._run_command')
+    def test_create_resources_with_pf_cli(self, mock_run_command):
+        experiment = PromptFlowExperiment("test-experiment", DEFAULT_EXPERIMENT_DIR, use_pf_cli=True)
         mock_run_command.return_value = 0
 
         experiment.create_resources()
@@ -17,26 +38,26 @@ class TestPromptFlowExperiment:
         expected_command = f'pf flow init --flow "{DEFAULT_EXPERIMENT_DIR}{experiment.name}" --type standard'
         mock_run_command.assert_called_once_with(expected_command)
 
-    @patch('shutil.copyfile')
-    @patch('builtins.open', new_callable=unittest.mock.mock_open, read_data="This is a template for {{name}}")
-    def test_create_documentation(self, mock_open, mock_copyfile):  # noqa: F811
-        experiment = PromptFlowExperiment("test-experiment", DEFAULT_EXPERIMENT_DIR)    
-        experiment.create_documentation()
+    @patch.dict(os.environ, {'PROMPT_IGNITE_USE_PF_CLI': 'true'})
+    def test_use_pf_cli_from_env(self):
+        experiment = PromptFlowExperiment("test-experiment", DEFAULT_EXPERIMENT_DIR)
 
-        mock_copyfile.assert_called_once_with('./src/artefacts/TEMPLATE-README.md', f"{DEFAULT_EXPERIMENT_DIR}{experiment.name}/README.md")
+        assert experiment.use_pf_cli is True
+
+    def test_create_documentation(self, tmp_path):
+        experiment = PromptFlowExperiment("test-experiment", f"{tmp_path}/")
+        (tmp_path / "test-experiment").mkdir()
+
+        experiment.create_documentation()
 
-        mock_open.assert_called_with(f"{DEFAULT_EXPERIMENT_DIR}{experiment.name}/README.md", 'w')
-        handle = mock_open()
-        handle.write.assert_called_once_with('This is a template for test-experiment')
+        readme = (tmp_path / "test-experiment" / "README.md").read_text()
+        assert "test-experiment" in readme
+        assert "{{name}}" not in readme
+        assert list((tmp_path / "test-experiment").iterdir()) == [tmp_path / "test-experiment" / "README.md"]
 
-    @patch('subprocess.Popen')
-    def test_run_command_failure(self, mock_popen):
-        experiment = PromptFlowExperiment("test-experiment", "./tmp/")    
-        mock_process = MagicMock()
-        mock_process.communicate.return_value = (b'', b'')
-        mock_process.returncode = 1
-        mock_popen.return_value = mock_process
+    def test_run_command_failure(self):
+        experiment = PromptFlowExperiment("test-experiment", "./tmp/")
 
-        command = 'echo hello'
-        with pytest.raises(RuntimeError, match=f'Error executing command: {command}'):
+        command = 'exit 1'
+        with pytest.raises(CommandError, match=f'Error executing command: {command}'):
             experiment._run_command(command)
@@ -0,0 +1,24 @@
+import os
+
+import pytest
+from src.experiments.prompty import PROMPTY_TEMPLATE_FILES, PromptyExperiment
+from src.prompty import PromptyRenderer
+
+
+class TestPromptyExperiment:
+    def test_create(self, tmp_path):
+        experiment = PromptyExperiment("issue-1-prompty", f"{tmp_path}/")
+
+        experiment.create()
+
+        experiment_dir = tmp_path / "issue-1-prompty"
+        assert sorted(os.listdir(experiment_dir)) == sorted([*PROMPTY_TEMPLATE_FILES, "README.md"])
+        prompty = PromptyRenderer().load(str(experiment_dir / "hello.prompty"))
+        assert prompty.name == "issue-1-prompty"
+
+    def test_create_resources_existing_prompty(self, tmp_path):
+        experiment = PromptyExperiment("issue-1-prompty", f"{tmp_path}/")
+        experiment.create_resources()
+
+        with pytest.raises(FileExistsError):
+            experiment.create_resources()
@@ -0,0 +1,95 @@
+import importlib.util
+import json
+import os
+import sys
+
+import pytest
+from src.experiments.pure_python import PYTHON_TEMPLATE_FILES, PythonExperiment
+
+TOOL = """
+import os
+
+WARMED_UP_BY = None
+
+
+def warm_up():
+    global WARMED_UP_BY
+    WARMED_UP_BY = os.getpid()
+
+
+def process(row):
+    if row["value"] == 3:
+        raise ValueError("three")
+    return {"square": row["value"] ** 2, "warmed_up": WARMED_UP_BY == os.getpid()}
+"""
+
+
+@pytest.fixture
+def experiment_dir(tmp_path):
+    PythonExperiment("issue-1-tool", f"{tmp_path}/").create_resources()
+    experiment_dir = tmp_path / "issue-1-tool"
+    (experiment_dir / "tool.py").write_text(TOOL)
+    (experiment_dir / "data.jsonl").write_text("".join(json.dumps({"value": value}) + "\n\n" for value in range(50)))
+    return experiment_dir
+
+
+@pytest.fixture
+def harness(experiment_dir, monkeypatch):
+    spec = importlib.util.spec_from_file_location("harness", experiment_dir / "harness.py")
+    harness = importlib.util.module_from_spec(spec)
+    # Workers look up the harness functions by module name
+    monkeypatch.setitem(sys.modules, "harness", harness)
+    spec.loader.exec_module(harness)
+    return harness
+
+
+class TestPythonExperiment:
+    def test_create(self, tmp_path):
+        experiment = PythonExperiment("issue-1-tool", f"{tmp_path}/")
+
+        experiment.create()
+
+        experiment_dir = tmp_path / "issue-1-tool"
+        assert sorted(os.listdir(experiment_dir)) == sorted([*PYTHON_TEMPLATE_FILES, "README.md"])
+        assert "issue-1-tool" in (experiment_dir / "tool.py").read_text()
+
+    def test_create_resources_existing_tool(self, tmp_path):
+        experiment = PythonExperiment("issue-1-tool", f"{tmp_path}/")
+        experiment.create_resources()
+
+        with pytest.raises(FileExistsError):
+            experiment.create_resources()
+
+
+class TestHarness:
+    def test_run_in_order(self, experiment_dir, harness):
+        output = experiment_dir / "out.jsonl"
+
+        rows = harness.run(str(experiment_dir / "data.jsonl"), str(output), workers=2, chunk_size=3, run_id="run")
+
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert rows == 50
+        assert [record["row"] for record in records] == list(range(50))
+        assert records[4] == {"run_id": "run", "variant": "tool", "row": 4, "inputs": {"value": 4},
+                              "output": {"square": 16, "warmed_up": True}, "error": None, "latency": records[4]["latency"]}
+        assert records[3]["output"] is None
+        assert records[3]["error"] == "ValueError: three"
+
+    def test_run_unordered_with_limit(self, experiment_dir, harness):
+        output = experiment_dir / "out.jsonl"
+
+        rows = harness.run(str(experiment_dir / "data.jsonl"), str(output), workers=2, ordered=False, limit=20)
+
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert rows == 20
+        assert sorted(record["row"] for record in records) == list(range(20))
+        assert all(record["inputs"]["value"] == record["row"] for record in records)
+
+    def test_chunk_sizer_targets_chunk_duration(self, harness):
+        sizer = harness.ChunkSizer()
+
+        for _ in range(20):
+            sizer.record(sizer.size, sizer.size * 0.001)
+
+        assert sizer.size == pytest.approx(harness.TARGET_CHUNK_SECONDS / 0.001, abs=1)
+        assert harness.ChunkSizer(7).size == 7
@@ -0,0 +1,52 @@
+import pytest
+from src.flow import DEFAULT_VARIANT, Flow, FlowNode, load_flow, parse_reference
+from src.templates import default_store
+
+
+@pytest.fixture
+def flow_dir(tmp_path):
+    default_store().materialise_tree("prompt-flow", str(tmp_path), {"name": "issue-1-demo"})
+    return tmp_path
+
+
+class TestFlow:
+    def test_load_flow_variants(self, flow_dir):
+        flow = load_flow(str(flow_dir))
+
+        assert flow.variant_ids() == ["llm.variant_0", "llm.variant_1"]
+        assert [node.name for node in flow.nodes] == ["hello_prompt", "llm"]
+
+    def test_resolve_variant(self, flow_dir):
+        flow = load_flow(str(flow_dir))
+
+        nodes = flow.resolve("llm.variant_1")
+
+        assert [node.name for node in nodes] == ["hello_prompt", "llm"]
+        assert nodes[1].source == "hello.py"
+        assert nodes[1].inputs["temperature"] == "0.2"
+        assert flow.resolve(DEFAULT_VARIANT)[1].inputs["temperature"] == "1.0"
+
+    def test_resolve_unknown_variant(self, flow_dir):
+        with pytest.raises(ValueError, match="Unknown variant"):
+            load_flow(str(flow_dir)).resolve("llm.variant_9")
+
+    def test_resolve_orders_by_dependency(self):
+        second = FlowNode("second", "python", "second.py", {"value": "${first.output}"})
+        first = FlowNode("first", "prompt", "first.jinja2", {"text": "${inputs.text}"})
+        flow = Flow(dir=".", inputs={}, outputs={}, nodes=[second, first])
+
+        assert flow.variant_ids() == [DEFAULT_VARIANT]
+        assert flow.resolve() == [first, second]
+
+    def test_resolve_cycle(self):
+        first = FlowNode("first", "python", "first.py", {"value": "${second.output}"})
+        second = FlowNode("second", "python", "second.py", {"value": "${first.output}"})
+
+        with pytest.raises(ValueError, match="cycle"):
+            Flow(dir=".", inputs={}, outputs={}, nodes=[first, second]).resolve()
+
+    def test_parse_reference(self):
+        assert parse_reference("${inputs.text}") == ("inputs", "text")
+        assert parse_reference("${llm.output.text}") == ("llm", "output.text")
+        assert parse_reference("gpt-35-turbo") is None
+        assert parse_reference(120) is None
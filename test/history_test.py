@@ -0,0 +1,136 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from src.compare import load_columns
+from src.history import COMPARE_COLUMNS, RunHistory, Segment
+
+
+def _write_run(path, rows, run_id="run", variants=("llm.variant_0", "llm.variant_1")):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        # Rows finish out of order, as with concurrent workers
+        for row in reversed(range(rows)):
+            for offset, variant in enumerate(variants):
+                file.write(json.dumps({
+                    "run_id": run_id, "variant": variant, "row": row,
+                    "inputs": {"text": f"t{row}", "expected": f"t{row}"},
+                    "output": {"output": f"t{row}" if offset == 0 or row % 2 else "wrong", "grade": row % 3},
+                    "latency": 0.1 + 0.01 * offset + 0.001 * (row % 7),
+                    "prompt_tokens": 10, "completion_tokens": 5 + offset, "attempts": 1, "cache_hits": row % 2,
+                    "error": "TimeoutError: " if row == 3 and offset else None,
+                    "label": "extra",
+                }) + "\n")
+
+
+def _sorted_by_row(columns):
+    order = np.argsort(columns["row"], kind="stable")
+    return {name: values[order] for name, values in columns.items()}
+
+
+@pytest.fixture
+def experiment(tmp_path):
+    for index in range(3):
+        _write_run(str(tmp_path / "runs" / f"2026010{index}-run.jsonl"), 50, run_id=f"run-{index}")
+    return str(tmp_path)
+
+
+class TestRunHistory:
+    def test_matches_run_outputs(self, experiment):
+        history = RunHistory(experiment, chunk_rows=16)
+        history.sync()
+
+        expected = load_columns(history.run_outputs())
+        loaded = history.load_columns()
+
+        assert sorted(loaded) == sorted(expected)
+        for variant, columns in expected.items():
+            expected_sorted, loaded_sorted = _sorted_by_row(columns), _sorted_by_row(loaded[variant])
+            for name in COMPARE_COLUMNS:
+                np.testing.assert_array_equal(loaded_sorted[name], expected_sorted[name])
+
+    def test_recomputes_other_reference_and_score_fields(self, experiment):
+        history = RunHistory(experiment)
+        history.sync()
+
+        expected = load_columns(history.run_outputs(), reference_field="text", score_field="grade")
+        loaded = history.load_columns(reference_field="text", score_field="grade")
+
+        for variant, columns in expected.items():
+            for name in ("exact_match", "score"):
+                np.testing.assert_array_equal(_sorted_by_row(loaded[variant])[name], _sorted_by_row(columns)[name])
+
+    def test_reads_only_selected_runs_variants_and_columns(self, experiment):
+        history = RunHistory(experiment)
+        history.sync()
+
+        last = history.read(("row", "output"), last=2)
+        assert len(last["llm.variant_0"]["row"]) == 100
+        assert set(last["llm.variant_0"]) == {"row", "output"}
+
+        [variant] = history.read(("row", "inputs", "error", "extra"), runs=["run-1"], variants=["llm.variant_1"]).values()
+        np.testing.assert_array_equal(variant["row"], np.arange(50))
+        assert variant["inputs"][7] == {"text": "t7", "expected": "t7"}
+        assert variant["error"][3] == "TimeoutError: "
+        assert variant["extra"][0] == {"label": "extra"}
+
+        with pytest.raises(ValueError, match="Unknown history columns"):
+            history.read(("latency", "cost"))
+
+    def test_footer_index(self, experiment):
+        history = RunHistory(experiment, chunk_rows=16)
+        history.sync()
+
+        with Segment(history.segments()[0]) as segment:
+            assert segment.run_ids == ["run-0"]
+            assert segment.rows == 100
+            assert segment.source["name"] == "20260100-run.jsonl"
+            ranges = [(chunk.first_row, chunk.last_row, chunk.count) for chunk in segment.chunks if chunk.variant == "llm.variant_0"]
+        # Chunks of 16 are cut in the order rows were written, then sorted
+        assert ranges == [(34, 49, 16), (18, 33, 16), (2, 17, 16), (0, 1, 2)]
+
+    def test_sync_adds_only_new_or_changed_runs(self, experiment):
+        history = RunHistory(experiment)
+
+        assert len(history.sync()) == 3
+        assert history.sync() == []
+
+        changed = history.run_outputs()[1]
+        _write_run(changed, 60, run_id="run-1")
+        assert history.sync() == [history.segment_path(changed)]
+        assert len(history.read(runs=["run-1"])["llm.variant_0"]["row"]) == 60
+
+    def test_prune_keeps_runs_not_in_history(self, experiment):
+        history = RunHistory(experiment)
+        history.append(history.run_outputs()[0])
+
+        deleted = history.prune()
+
+        assert [os.path.basename(path) for path in deleted] == ["20260100-run.jsonl"]
+        assert len(history.run_outputs()) == 2
+        assert len(history.read(last=1)["llm.variant_0"]["row"]) == 50
+
+    def test_skips_truncated_last_line(self, tmp_path):
+        path = str(tmp_path / "runs" / "run.jsonl")
+        _write_run(path, 5)
+        with open(path, "a") as file:
+            file.write('{"variant": "llm.variant_0", "row": 5')
+
+        history = RunHistory(str(tmp_path))
+        history.sync()
+
+        assert len(history.read()["llm.variant_0"]["row"]) == 5
+
+    def test_rejects_invalid_segment(self, tmp_path):
+        path = tmp_path / "bad.seg"
+        path.write_bytes(b"not a segment at all, just some bytes")
+
+        with pytest.raises(ValueError, match="Invalid history segment"):
+            Segment(str(path))
+
+    def test_empty_history(self, tmp_path):
+        history = RunHistory(str(tmp_path))
+
+        assert history.sync() == []
+        assert history.read(last=20) == {}
@@ -0,0 +1,103 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+from src.llm_cache import CachedClient, ResponseCache
+from src.llm_clients import EchoClient
+
+
+def _write_entries(path, worker):
+    cache = ResponseCache(path)
+    for index in range(50):
+        cache.put(f"{worker}-{index}", {"text": str(index)})
+    cache.close()
+    return worker
+
+
+class TestResponseCache:
+    def test_key_is_stable_and_parameter_sensitive(self):
+        key = ResponseCache.key("client", "prompt", {"temperature": "1.0", "deployment_name": "gpt"})
+
+        assert key == ResponseCache.key("client", "prompt", {"deployment_name": "gpt", "temperature": "1.0"})
+        assert key != ResponseCache.key("client", "prompt", {"deployment_name": "gpt", "temperature": "0.2"})
+        assert key != ResponseCache.key("other", "prompt", {"deployment_name": "gpt", "temperature": "1.0"})
+
+    def test_get_and_put(self, tmp_path):
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+
+        assert cache.get("key") is None
+        cache.put("key", {"text": "hello"})
+
+        assert cache.get("key") == {"text": "hello"}
+        assert (cache.stats.hits, cache.stats.misses, cache.stats.writes) == (1, 1, 1)
+
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        cache = ResponseCache(path)
+        cache.put("key", {"text": "hello"})
+        cache.close()
+
+        assert ResponseCache(path).get("key") == {"text": "hello"}
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        entry = {"text": "x" * 100}
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=300)
+        for key in ("a", "b", "c", "d"):
+            cache.put(key, entry)
+        cache.get("a")
+
+        evicted = cache.evict()
+
+        assert evicted == 2
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is None
+        assert cache.size() <= 300
+
+    def test_concurrent_processes(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            list(executor.map(_write_entries, [path] * 4, range(4)))
+
+        cache = ResponseCache(path)
+        assert all(cache.get(f"{worker}-49") == {"text": "49"} for worker in range(4))
+
+
+class TestCachedClient:
+    def test_hits_after_first_call(self, tmp_path):
+        client = CachedClient(EchoClient(), ResponseCache(str(tmp_path / "cache.sqlite")))
+
+        first = asyncio.run(client.complete("hello", temperature="1.0"))
+        second = asyncio.run(client.complete("hello", temperature="1.0"))
+        other = asyncio.run(client.complete("hello", temperature="0.2"))
+
+        assert not first.cached
+        assert second.cached
+        assert second.text == first.text
+        assert not other.cached
+
+    def test_bypass(self, tmp_path):
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+        asyncio.run(CachedClient(EchoClient(), cache).complete("hello"))
+
+        completion = asyncio.run(CachedClient(EchoClient(), cache, bypass=True).complete("hello"))
+
+        assert not completion.cached
+        assert cache.stats.writes == 2
+
+    def test_rate_limits_only_misses(self, tmp_path):
+        class CountingLimiter:
+            acquired = 0
+
+            async def acquire(self):
+                self.acquired += 1
+
+        limiter = CountingLimiter()
+        cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+        client = CachedClient(EchoClient(), cache).rate_limited(limiter)
+
+        for _ in range(3):
+            asyncio.run(client.complete("hello"))
+
+        assert limiter.acquired == 1
+        assert client.namespace == CachedClient(EchoClient(), cache).namespace
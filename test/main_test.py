@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+# Cumulative import time (microseconds) allowed for the project's own modules when rendering `--help`
+HELP_IMPORT_BUDGET_US = 50_000
+
+# Modules that must only be imported once a command actually runs
+LAZY_MODULES = ("src.experiment_handler", "src.batch", "src.experiments", "promptflow")
+
+
+def _import_times(*args):
+    env = {**os.environ, "PYTHONPATH": "."}
+    process = subprocess.run([sys.executable, "-X", "importtime", "src/main.py", *args], capture_output=True, text=True, env=env, timeout=60)
+    assert process.returncode == 0, process.stderr
+
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, module = line.removeprefix("import time:").split("|")
+        times[module.strip()] = int(self_us)
+    return times
+
+
+class TestMain:
+    def test_help_skips_experiment_imports(self):
+        times = _import_times("--help")
+
+        imported = [module for module in times if module.startswith(LAZY_MODULES)]
+        assert imported == []
+
+    def test_help_import_budget(self):
+        times = _import_times("--help")
+
+        project_us = sum(self_us for module, self_us in times.items() if module.startswith("src."))
+        assert project_us < HELP_IMPORT_BUDGET_US
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+from src.notebooks import _collect, code_cell, execute_notebooks, find_notebooks, markdown_cell, new_notebook, read_notebook, write_notebook
+
+
+def _message(kind, **content):
+    return {"msg_type": kind, "content": content}
+
+
+class TestNotebooks:
+    def test_write_and_read(self, tmp_path):
+        notebook = new_notebook([markdown_cell("# Title\n\ntext"), code_cell("x = 1\nx", tags=["parameters"])])
+        path = tmp_path / "runner.ipynb"
+
+        write_notebook(str(path), notebook)
+
+        assert read_notebook(str(path)) == notebook
+        assert notebook["cells"][1]["source"] == ["x = 1\n", "x"]
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_find_notebooks(self, tmp_path):
+        for name in ("issue-1-a", "issue-2-b", ".hidden"):
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "runner.ipynb").write_text("{}")
+        (tmp_path / "issue-1-a" / "exploration.ipynb").write_text("{}")
+
+        found = find_notebooks([str(tmp_path), "other.ipynb"])
+
+        assert found == [str(tmp_path / "issue-1-a" / "runner.ipynb"), str(tmp_path / "issue-2-b" / "runner.ipynb"), "other.ipynb"]
+
+    def test_collect_outputs(self):
+        outputs = []
+
+        for message in [_message("status", execution_state="busy"),
+                        _message("stream", name="stdout", text="a"),
+                        _message("stream", name="stdout", text="b\n"),
+                        _message("execute_result", data={"text/plain": "1"}, metadata={}, execution_count=3),
+                        _message("error", ename="ValueError", evalue="bad", traceback=["..."])]:
+            _collect(message, outputs)
+
+        assert outputs == [
+            {"output_type": "stream", "name": "stdout", "text": "ab\n"},
+            {"output_type": "execute_result", "data": {"text/plain": "1"}, "metadata": {}, "execution_count": 3},
+            {"output_type": "error", "ename": "ValueError", "evalue": "bad", "traceback": ["..."]},
+        ]
+
+
+def test_execute_notebooks_on_shared_kernel(tmp_path):
+    pytest.importorskip("jupyter_client")
+    pytest.importorskip("ipykernel")
+    first = tmp_path / "issue-1-a" / "runner.ipynb"
+    second = tmp_path / "issue-2-b" / "runner.ipynb"
+    for path in (first, second):
+        path.parent.mkdir()
+    write_notebook(str(first), new_notebook([code_cell("import os\nsecret = 1\nprint(os.path.basename(os.getcwd()))")]))
+    write_notebook(str(second), new_notebook([code_cell("secret"), code_cell("print('never runs')")]))
+
+    results = execute_notebooks([str(first), str(second)], kernels=1, cell_timeout=60)
+
+    assert [result.ok for result in results] == [True, False]
+    assert results[1].error.startswith("NameError")
+    executed = json.loads(first.read_text())["cells"][0]
+    assert executed["outputs"] == [{"output_type": "stream", "name": "stdout", "text": "issue-1-a\n"}]
+    assert executed["execution_count"] > 0
+    assert json.loads(second.read_text())["cells"][1]["outputs"] == []
+
+
+def test_execute_notebooks_caps_default_pool_size(tmp_path, monkeypatch):
+    sizes = []
+
+    class FakePool:
+        def __init__(self, size, kernel_name, cell_timeout):
+            sizes.append(size)
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            pass
+
+        async def execute_all(self, paths, output_dir):
+            return []
+
+    monkeypatch.setattr("src.notebooks.KernelPool", FakePool)
+    monkeypatch.setattr("src.notebooks.os.cpu_count", lambda: 16)
+
+    execute_notebooks([str(tmp_path / f"{index}.ipynb") for index in range(50)])
+    execute_notebooks([str(tmp_path / "one.ipynb")])
+    execute_notebooks([str(tmp_path / f"{index}.ipynb") for index in range(50)], kernels=8)
+
+    assert sizes == [4, 1, 8]
@@ -0,0 +1,162 @@
+import json
+from collections import Counter
+
+import numpy as np
+import pytest
+from src.prepare import BloomFilter, PrepareConfig, _digest, output_paths, prepare_dataset
+
+
+def _write_rows(path, rows):
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+
+def _read_rows(path):
+    with open(path) as file:
+        return [json.loads(line) for line in file]
+
+
+@pytest.fixture
+def data(tmp_path):
+    path = tmp_path / "data.jsonl"
+    _write_rows(path, [{"id": index, "label": "rare" if index % 10 == 0 else "common", "text": f"Question {index}"}
+                       for index in range(1000)])
+    return str(path)
+
+
+class TestBloomFilter:
+    def test_reports_new_digests_once(self):
+        bloom = BloomFilter(100)
+        digests = [_digest(0, str(index).encode()) for index in range(50)]
+
+        assert bloom.add(digests[:30]).all()
+        new = bloom.add(digests[20:] + digests[:1])
+
+        np.testing.assert_array_equal(new, [False] * 10 + [True] * 20 + [False])
+
+    def test_repeats_within_a_batch_keep_the_first(self):
+        digest = _digest(0, b"row")
+
+        np.testing.assert_array_equal(BloomFilter(10).add([digest, digest, digest]), [True, False, False])
+
+    def test_sized_for_false_positive_rate(self):
+        bloom = BloomFilter(1_000_000, 1e-6)
+
+        assert bloom.size == 28_755_176
+        assert bloom.hashes == 20
+
+
+class TestPrepareDataset:
+    def test_exact_dedup_on_fields_keeps_first(self, tmp_path):
+        path = tmp_path / "data.jsonl"
+        _write_rows(path, [{"id": 0, "text": "Hello"}, {"id": 1, "text": "hello!"}, {"id": 2, "text": "Hello"}, {"id": 3, "text": "Bye"}])
+
+        summary = prepare_dataset(str(path), PrepareConfig(dedup=("text",)))
+
+        assert summary.rows == 4
+        assert summary.duplicates == 1
+        assert [row["id"] for row in _read_rows(tmp_path / "data.dedup.jsonl")] == [0, 1, 3]
+
+    def test_near_dedup_ignores_case_punctuation_and_whitespace(self, tmp_path):
+        path = tmp_path / "data.jsonl"
+        _write_rows(path, [{"text": "Hello,  World"}, {"text": "hello world!"}, {"text": "Hello there"}])
+
+        summary = prepare_dataset(str(path), PrepareConfig(dedup=("*",), near=True))
+
+        assert summary.duplicates == 1
+        assert _read_rows(tmp_path / "data.dedup.jsonl") == [{"text": "Hello,  World"}, {"text": "Hello there"}]
+
+    def test_whole_row_dedup_compares_raw_lines(self, tmp_path):
+        path = tmp_path / "data.jsonl"
+        path.write_text('{"a": 1}\n{"a": 1}\n{"a":1}\n')
+
+        prepare_dataset(str(path), PrepareConfig(dedup=("*",)))
+
+        assert (tmp_path / "data.dedup.jsonl").read_text() == '{"a": 1}\n{"a":1}\n'
+
+    def test_reservoir_sample_is_seeded_and_in_file_order(self, data):
+        first = prepare_dataset(data, PrepareConfig(sample=50, seed=1))
+        rows = _read_rows(next(iter(first.outputs)))
+        prepare_dataset(data, PrepareConfig(sample=50, seed=1))
+
+        assert len(rows) == 50
+        assert rows == _read_rows(next(iter(first.outputs)))
+        assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+        prepare_dataset(data, PrepareConfig(sample=50, seed=2))
+        assert rows != _read_rows(next(iter(first.outputs)))
+
+    def test_stratified_reservoir_sample_is_proportional(self, data):
+        summary = prepare_dataset(data, PrepareConfig(sample=50, stratify="label"))
+
+        rows = _read_rows(next(iter(summary.outputs)))
+        assert Counter(row["label"] for row in rows) == {"common": 45, "rare": 5}
+
+    def test_stratified_fraction_is_proportional(self, data):
+        summary = prepare_dataset(data, PrepareConfig(fraction=0.05, stratify="label"))
+
+        rows = _read_rows(next(iter(summary.outputs)))
+        assert Counter(row["label"] for row in rows) == {"common": 45, "rare": 5}
+
+    def test_sample_larger_than_dataset_keeps_everything(self, data):
+        summary = prepare_dataset(data, PrepareConfig(sample=5000, stratify="label"))
+
+        assert list(summary.outputs.values()) == [1000]
+
+    def test_dedup_happens_before_sampling(self, tmp_path):
+        path = tmp_path / "data.jsonl"
+        _write_rows(path, [{"text": "same"}] * 100 + [{"text": "other"}])
+
+        summary = prepare_dataset(str(path), PrepareConfig(dedup=("text",), sample=10))
+
+        assert summary.duplicates == 99
+        assert _read_rows(tmp_path / "data.dedup-sample.jsonl") == [{"text": "same"}, {"text": "other"}]
+
+    def test_split_is_deterministic_per_row(self, data, tmp_path):
+        summary = prepare_dataset(data, PrepareConfig(eval_fraction=0.2, split_key=("id",)))
+
+        paths = output_paths(data, PrepareConfig(eval_fraction=0.2))
+        assert list(summary.outputs) == [str(tmp_path / "data.train.jsonl"), str(tmp_path / "data.eval.jsonl")]
+        train, evaluation = _read_rows(paths["train"]), _read_rows(paths["eval"])
+        assert len(train) + len(evaluation) == 1000
+        assert 150 < len(evaluation) < 250
+
+        # Rows keep their split when the dataset changes
+        _write_rows(tmp_path / "data.jsonl", [{"id": index, "text": "changed"} for index in range(0, 1000, 3)])
+        prepare_dataset(data, PrepareConfig(eval_fraction=0.2, split_key=("id",)))
+        assert {row["id"] for row in _read_rows(paths["eval"])} == {row["id"] for row in evaluation if row["id"] % 3 == 0}
+
+    def test_output_paths(self):
+        assert output_paths("exp/data.jsonl", PrepareConfig(dedup=("text",), fraction=0.1)) == {"": "exp/data.dedup-sample.jsonl"}
+        assert output_paths("exp/data.jsonl", PrepareConfig(sample=10, eval_fraction=0.1, name="small")) == {
+            "train": "exp/data.small.train.jsonl", "eval": "exp/data.small.eval.jsonl"}
+
+    def test_invalid_configs(self, data):
+        with pytest.raises(ValueError, match="Nothing to do"):
+            prepare_dataset(data, PrepareConfig())
+        with pytest.raises(ValueError, match="either a sample size or a fraction"):
+            prepare_dataset(data, PrepareConfig(sample=10, fraction=0.1))
+        with pytest.raises(ValueError, match="Stratifying needs"):
+            prepare_dataset(data, PrepareConfig(dedup=("*",), stratify="label"))
+
+    def test_invalid_row_leaves_no_output(self, tmp_path):
+        path = tmp_path / "data.jsonl"
+        path.write_text('{"text": "a"}\n{"text": \n')
+
+        with pytest.raises(ValueError, match="Invalid JSON in row 1"):
+            prepare_dataset(str(path), PrepareConfig(dedup=("text",)))
+        assert sorted(file.name for file in tmp_path.iterdir()) == ["data.jsonl", "data.jsonl.idx"]
+
+    def test_non_object_row_is_rejected(self, tmp_path):
+        path = tmp_path / "data.jsonl"
+        path.write_text('{"text": "a"}\n[1, 2]\n')
+
+        with pytest.raises(ValueError, match="Row 1 .* is not a JSON object"):
+            prepare_dataset(str(path), PrepareConfig(dedup=("text",)))
+
+    def test_failed_open_leaves_no_output(self, tmp_path):
+        path = tmp_path / "data.jsonl"
+        _write_rows(path, [{"text": "a"}])
+        (tmp_path / "data.eval.jsonl.tmp").mkdir()
+
+        with pytest.raises(IsADirectoryError):
+            prepare_dataset(str(path), PrepareConfig(eval_fraction=0.5))
+        assert not (tmp_path / "data.train.jsonl.tmp").exists()
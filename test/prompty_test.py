@@ -0,0 +1,102 @@
+import os
+
+import jinja2
+import pytest
+from src.prompty import PromptyRenderer, _Substitution
+
+PROMPTY = """---
+name: greeting
+model:
+  parameters:
+    temperature: 0.2
+inputs:
+  text:
+    type: string
+    default: Hello
+  language:
+    type: string
+sample:
+  language: Python
+---
+system:
+You write code.
+
+user:
+{# A comment #}
+Write {{text}} in {{ language }}.
+"""
+
+
+@pytest.fixture
+def prompty(tmp_path):
+    path = tmp_path / "hello.prompty"
+    path.write_text(PROMPTY)
+    return str(path)
+
+
+class TestPromptyRenderer:
+    def test_render(self, prompty):
+        renderer = PromptyRenderer()
+
+        messages = renderer.render(prompty, {"text": "Hi"})
+
+        assert messages == [{"role": "system", "content": "You write code."}, {"role": "user", "content": "Write Hi in Python."}]
+        loaded = renderer.load(prompty)
+        assert loaded.name == "greeting"
+        assert loaded.model == {"parameters": {"temperature": 0.2}}
+        assert loaded.defaults == {"text": "Hello", "language": "Python"}
+
+    def test_render_batch_compiles_once(self, prompty):
+        renderer = PromptyRenderer()
+
+        results = renderer.render_batch(prompty, [{"language": language} for language in ("C", "Go", "Rust")])
+        renderer.render(prompty)
+
+        assert [messages[1]["content"] for messages in results] == ["Write Hello in C.", "Write Hello in Go.", "Write Hello in Rust."]
+        assert renderer.stats.compilations == 1
+        assert renderer.stats.renders == 4
+        assert renderer.stats.renders_per_second > 0
+
+    def test_recompiles_when_file_changes(self, prompty):
+        renderer = PromptyRenderer()
+        renderer.render(prompty)
+
+        with open(prompty, "w") as file:
+            file.write("user:\nChanged {{text}}\n")
+        stat = os.stat(prompty)
+        os.utime(prompty, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert renderer.render(prompty, {"text": "!"}) == [{"role": "user", "content": "Changed !"}]
+        assert renderer.stats.compilations == 2
+
+    @pytest.mark.parametrize("body", [
+        "user:\n{{ text }} and {{missing}} and {{ number }}\n",
+        "Text before any role {{text}}\nassistant:\nok\n",
+        "{#- trimmed -#}\n{{text}}\n",
+    ])
+    def test_substitution_matches_jinja(self, tmp_path, body):
+        path = tmp_path / "simple.prompty"
+        path.write_text(body)
+        renderer = PromptyRenderer()
+        values = {"text": "Hi", "number": 3, "none": None}
+
+        template = renderer.load(str(path)).template
+
+        assert isinstance(template, _Substitution)
+        assert template.render(values) == jinja2.Environment(trim_blocks=True, keep_trailing_newline=True).from_string(body).render(values)
+
+    @pytest.mark.parametrize("body", ["{{ text | upper }}", "{% for item in items %}{{item}}{% endfor %}", "{{ row.text }}"])
+    def test_uses_jinja_for_other_templates(self, tmp_path, body):
+        path = tmp_path / "complex.prompty"
+        path.write_text(f"user:\n{body}\n")
+        renderer = PromptyRenderer()
+
+        assert isinstance(renderer.load(str(path)).template, jinja2.Template)
+        assert renderer.render(str(path), {"text": "hi", "items": ["a", "b"], "row": {"text": "x"}})[0]["role"] == "user"
+
+    def test_invalid_front_matter(self, tmp_path):
+        path = tmp_path / "broken.prompty"
+        path.write_text("---\nname: [unclosed\n---\nuser:\nhi\n")
+
+        with pytest.raises(ValueError, match="Invalid front matter"):
+            PromptyRenderer().render(str(path))
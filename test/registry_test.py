@@ -0,0 +1,58 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from src.entities import Experiment, ExperimentType
+from src.experiments.prompt_flow import PromptFlowExperiment
+from src.registry import ENTRY_POINT_GROUP, ExperimentRegistry
+
+
+class CustomExperiment(Experiment):
+    def create(self):
+        pass
+
+
+class TestExperimentRegistry:
+    @patch('src.registry.importlib.import_module')
+    def test_imports_only_selected_type(self, mock_import_module):
+        registry = ExperimentRegistry()
+        mock_import_module.assert_not_called()
+
+        registry.get(ExperimentType.PROMPTY)
+        registry.get("prompty")
+
+        mock_import_module.assert_called_once_with("src.experiments.prompty")
+
+    def test_get_builtin(self):
+        registry = ExperimentRegistry()
+
+        assert registry.get(ExperimentType.PROMPT_FLOW) is PromptFlowExperiment
+
+    def test_register(self):
+        registry = ExperimentRegistry()
+
+        registry.register("custom", CustomExperiment)
+        registry.register(ExperimentType.PROMPTY, "test.registry_test:CustomExperiment")
+
+        assert registry.get("custom") is CustomExperiment
+        assert registry.get(ExperimentType.PROMPTY) is CustomExperiment
+
+    @patch('importlib.metadata.entry_points')
+    def test_entry_points(self, mock_entry_points):
+        plugin = MagicMock(value="test.registry_test:CustomExperiment")
+        plugin.name = "custom"
+        shadowing = MagicMock(value="test.registry_test:CustomExperiment")
+        shadowing.name = ExperimentType.PROMPT_FLOW.value
+        mock_entry_points.return_value = [plugin, shadowing]
+        registry = ExperimentRegistry()
+
+        assert registry.get("custom") is CustomExperiment
+        assert registry.get(ExperimentType.PROMPT_FLOW) is PromptFlowExperiment
+        assert "custom" in registry.types()
+        mock_entry_points.assert_called_once_with(group=ENTRY_POINT_GROUP)
+
+    @patch('importlib.metadata.entry_points', return_value=[])
+    def test_unknown_type(self, mock_entry_points):
+        registry = ExperimentRegistry()
+
+        with pytest.raises(KeyError, match="Unknown experiment type: missing"):
+            registry.get("missing")
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import time
+
+import pytest
+from src.llm_clients import Completion, EchoClient, LLMClient
+from src.runner import RateLimiter, RunConfig, run_experiment
+from src.templates import default_store
+
+
+class FlakyClient(LLMClient):
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    async def complete(self, prompt, **params):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("throttled")
+        return Completion(text=params["temperature"])
+
+
+@pytest.fixture
+def experiment_dir(tmp_path):
+    default_store().materialise_tree("prompt-flow", str(tmp_path), {"name": "issue-1-demo"})
+    return tmp_path
+
+
+def _read(path):
+    with open(path) as file:
+        return [json.loads(line) for line in file]
+
+
+class TestRunner:
+    def test_runs_every_variant_over_dataset(self, experiment_dir):
+        summary = asyncio.run(run_experiment(str(experiment_dir), EchoClient()))
+
+        records = _read(summary.output)
+        assert summary.rows == 6
+        assert summary.failed == 0
+        assert summary.output.startswith(str(experiment_dir / "runs"))
+        assert sorted((record["variant"], record["row"]) for record in records) == [
+            (variant, line) for variant in ("llm.variant_0", "llm.variant_1") for line in range(3)
+        ]
+        assert records[0]["output"]["output"].startswith("Write a simple")
+        assert records[0]["prompt_tokens"] > 0
+
+    def test_selected_variant_and_limit(self, experiment_dir, tmp_path):
+        output = tmp_path / "out.jsonl"
+        config = RunConfig(variants=("llm.variant_1",), limit=2)
+
+        summary = asyncio.run(run_experiment(str(experiment_dir), FlakyClient(0), config, str(output)))
+
+        records = _read(output)
+        assert summary.rows == 2
+        assert {record["output"]["output"] for record in records} == {"0.2"}
+
+    def test_retries_with_backoff(self, experiment_dir):
+        client = FlakyClient(2)
+        config = RunConfig(variants=("llm.variant_0",), limit=1, max_retries=2, backoff=0.01)
+
+        summary = asyncio.run(run_experiment(str(experiment_dir), client, config))
+
+        record = _read(summary.output)[0]
+        assert record["error"] is None
+        assert record["attempts"] == 3
+
+    def test_failed_rows_do_not_stop_the_run(self, experiment_dir):
+        config = RunConfig(max_retries=0)
+
+        summary = asyncio.run(run_experiment(str(experiment_dir), FlakyClient(2), config))
+
+        records = _read(summary.output)
+        assert summary.rows == 6
+        assert summary.failed == 2
+        assert sum(record["error"] == "ConnectionError: throttled" for record in records) == 2
+
+    def test_resume_skips_completed_rows(self, experiment_dir, tmp_path):
+        output = tmp_path / "out.jsonl"
+        config = RunConfig(variants=("llm.variant_0",))
+        first = asyncio.run(run_experiment(str(experiment_dir), EchoClient(), RunConfig(variants=("llm.variant_0",), limit=1), str(output)))
+
+        summary = asyncio.run(run_experiment(str(experiment_dir), EchoClient(), config, str(output), resume=True))
+
+        records = _read(output)
+        assert summary.run_id == first.run_id
+        assert summary.rows == 2
+        assert sorted(record["row"] for record in records) == [0, 1, 2]
+
+    def test_resume_retries_failed_rows_after_truncated_line(self, experiment_dir, tmp_path):
+        output = tmp_path / "out.jsonl"
+        config = RunConfig(variants=("llm.variant_0",), max_retries=0)
+        first = asyncio.run(run_experiment(str(experiment_dir), FlakyClient(1), RunConfig(variants=("llm.variant_0",), limit=2, max_retries=0, concurrency=1), str(output)))
+        assert first.failed == 1
+        with open(output, "a") as file:
+            file.write(f'{{"run_id": "{first.run_id}", "variant": "llm.variant_0", "row": 2')
+
+        summary = asyncio.run(run_experiment(str(experiment_dir), EchoClient(), config, str(output), resume=True))
+
+        records = _read(output)
+        assert summary.rows == 2
+        assert sorted(record["row"] for record in records if record["error"] is None) == [0, 1, 2]
+        assert len(records) == 4
+
+    def test_resume_keeps_last_record_without_newline(self, experiment_dir, tmp_path):
+        output = tmp_path / "out.jsonl"
+        config = RunConfig(variants=("llm.variant_0",))
+        asyncio.run(run_experiment(str(experiment_dir), EchoClient(), RunConfig(variants=("llm.variant_0",), limit=1), str(output)))
+        output.write_text(output.read_text().rstrip("\n"))
+
+        summary = asyncio.run(run_experiment(str(experiment_dir), EchoClient(), config, str(output), resume=True))
+
+        assert summary.rows == 2
+        assert sorted(record["row"] for record in _read(output)) == [0, 1, 2]
+
+    def test_shard(self, experiment_dir):
+        config = RunConfig(variants=("llm.variant_0",), shard=(1, 2))
+
+        summary = asyncio.run(run_experiment(str(experiment_dir), EchoClient(), config))
+
+        assert [record["row"] for record in _read(summary.output)] == [2]
+
+    def test_rate_limiter(self):
+        async def acquire_all():
+            limiter = RateLimiter(20)
+            for _ in range(5):
+                await limiter.acquire()
+
+        start = time.perf_counter()
+        asyncio.run(acquire_all())
+        assert time.perf_counter() - start >= 0.19
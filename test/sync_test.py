@@ -0,0 +1,109 @@
+import json
+
+import pytest
+from src.entities import ExperimentType
+from src.experiment_handler import ExperimentHandler
+from src.sync import MANIFEST_FILE, read_manifest, sync_experiment, sync_experiments, write_manifest
+from src.templates import TemplateStore
+
+TEMPLATES = {"README.md": "README.md", "data/rows.jsonl": "rows.jsonl"}
+
+
+@pytest.fixture
+def templates_dir(tmp_path):
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "README.md").write_text("# {{name}}\n")
+    (templates_dir / "rows.jsonl").write_text('{"text": "a"}\n')
+    return templates_dir
+
+
+@pytest.fixture
+def experiments_dir(tmp_path, templates_dir):
+    experiments_dir = tmp_path / "experiments"
+    store = TemplateStore(str(templates_dir))
+    for name in ("issue-1-first", "issue-2-second"):
+        experiment_dir = experiments_dir / name
+        (experiment_dir / "data").mkdir(parents=True)
+        for relpath, template in TEMPLATES.items():
+            store.materialise(template, str(experiment_dir / relpath), {"name": name})
+        # An unknown type syncs against the templates recorded in its manifest
+        write_manifest(str(experiment_dir), "custom", TEMPLATES, {"name": name}, store)
+    return experiments_dir
+
+
+def _update_readme_template(templates_dir):
+    (templates_dir / "README.md").write_text("# {{name}}\n\n## Findings\n")
+    return TemplateStore(str(templates_dir))
+
+
+class TestSync:
+    def test_unchanged_templates_are_up_to_date(self, experiments_dir, templates_dir):
+        results = sync_experiments([str(experiments_dir)], TemplateStore(str(templates_dir)))
+
+        assert [result.status for result in results] == ["up-to-date", "up-to-date"]
+
+    def test_rewrites_only_files_changed_upstream(self, experiments_dir, templates_dir):
+        store = _update_readme_template(templates_dir)
+        experiment_dir = experiments_dir / "issue-1-first"
+
+        result = sync_experiment(str(experiment_dir), store)
+
+        assert (result.status, result.updated, result.conflicts) == ("synced", ["README.md"], [])
+        assert (experiment_dir / "README.md").read_text() == "# issue-1-first\n\n## Findings\n"
+        assert sync_experiment(str(experiment_dir), store).status == "up-to-date"
+
+    def test_keeps_files_edited_by_the_user(self, experiments_dir, templates_dir):
+        experiment_dir = experiments_dir / "issue-1-first"
+        (experiment_dir / "README.md").write_text("# issue-1-first\n\nMy hypothesis\n")
+        (experiment_dir / "data" / "rows.jsonl").unlink()
+        store = _update_readme_template(templates_dir)
+        (templates_dir / "rows.jsonl").write_text('{"text": "b"}\n')
+        store.refresh()
+
+        result = sync_experiment(str(experiment_dir), store)
+
+        assert (result.updated, result.conflicts) == ([], ["README.md"])
+        assert (experiment_dir / "README.md").read_text() == "# issue-1-first\n\nMy hypothesis\n"
+        assert not (experiment_dir / "data" / "rows.jsonl").exists()
+        # The conflict is reported again until it is resolved
+        assert sync_experiment(str(experiment_dir), store).conflicts == ["README.md"]
+
+    def test_resolved_conflict_updates_manifest(self, experiments_dir, templates_dir):
+        experiment_dir = experiments_dir / "issue-1-first"
+        store = _update_readme_template(templates_dir)
+        (experiment_dir / "README.md").write_text("# issue-1-first\n\n## Findings\n")
+
+        result = sync_experiment(str(experiment_dir), store)
+
+        assert (result.updated, result.conflicts) == ([], [])
+        assert sync_experiment(str(experiment_dir), store).status == "up-to-date"
+
+    def test_dry_run_writes_nothing(self, experiments_dir, templates_dir):
+        store = _update_readme_template(templates_dir)
+        experiment_dir = experiments_dir / "issue-1-first"
+        manifest = read_manifest(str(experiment_dir))
+
+        result = sync_experiment(str(experiment_dir), store, dry_run=True)
+
+        assert result.updated == ["README.md"]
+        assert (experiment_dir / "README.md").read_text() == "# issue-1-first\n"
+        assert read_manifest(str(experiment_dir)) == manifest
+
+    def test_reports_unmanaged_and_broken_experiments(self, experiments_dir, templates_dir):
+        (experiments_dir / "issue-3-old").mkdir()
+        (experiments_dir / "issue-1-first" / MANIFEST_FILE).write_text("{")
+
+        results = sync_experiments([str(experiments_dir), str(experiments_dir / "issue-3-old")], TemplateStore(str(templates_dir)))
+
+        assert [result.status for result in results] == ["failed", "up-to-date", "unmanaged"]
+        assert "Invalid template manifest" in results[0].error
+
+    def test_created_experiment_records_manifest(self, tmp_path):
+        ExperimentHandler.create("issue-4-prompty", ExperimentType.PROMPTY, f"{tmp_path}/", raise_errors=True)
+
+        manifest = json.loads((tmp_path / "issue-4-prompty" / MANIFEST_FILE).read_text())
+
+        assert manifest["type"] == "prompty"
+        assert sorted(manifest["files"]) == ["README.md", "data.jsonl", "hello.prompty"]
+        assert sync_experiment(str(tmp_path / "issue-4-prompty")).status == "up-to-date"
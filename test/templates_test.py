@@ -0,0 +1,94 @@
+import hashlib
+import os
+from unittest.mock import patch
+
+import pytest
+from src.templates import TemplateStore, clone_file
+
+
+@pytest.fixture
+def store_root(tmp_path):
+    root = tmp_path / "artefacts"
+    (root / "flow").mkdir(parents=True)
+    (root / "README.md").write_text("# {{name}}\n")
+    (root / "flow" / "prompt.jinja2").write_text("Say {{text}}\n")
+    (root / "flow" / "data.jsonl").write_text('{"text": "hi"}\n')
+    return root
+
+
+class TestTemplateStore:
+    def test_fingerprints_files_once(self, store_root):
+        store = TemplateStore(str(store_root))
+
+        with patch.object(store, "refresh", wraps=store.refresh) as mock_refresh:
+            readme = store.get("README.md")
+            store.files("flow")
+            assert mock_refresh.call_count == 1
+
+        assert readme.templated
+        assert readme.digest == hashlib.sha256(b"# {{name}}\n").hexdigest()
+        assert not store.get("flow/prompt.jinja2").templated
+        assert sorted(file.relpath for file in store.files("flow")) == ["flow/data.jsonl", "flow/prompt.jinja2"]
+
+    def test_skips_bytecode_and_hidden_files(self, store_root):
+        (store_root / "flow" / "__pycache__").mkdir()
+        (store_root / "flow" / "__pycache__" / "hello.cpython-311.pyc").write_bytes(b"\0")
+        (store_root / "flow" / "hello.pyc").write_bytes(b"\0")
+        (store_root / "flow" / ".DS_Store").write_bytes(b"\0")
+        (store_root / ".git").mkdir()
+        (store_root / ".git" / "HEAD").write_text("ref")
+
+        store = TemplateStore(str(store_root))
+
+        assert sorted(file.relpath for file in store.files()) == ["README.md", "flow/data.jsonl", "flow/prompt.jinja2"]
+
+    def test_render(self, store_root):
+        store = TemplateStore(str(store_root))
+
+        assert store.render("README.md", {"name": "issue-1-demo"}) == b"# issue-1-demo\n"
+        assert store.render("flow/prompt.jinja2", {"name": "issue-1-demo"}) == b"Say {{text}}\n"
+
+    def test_materialise_tree(self, store_root, tmp_path):
+        store = TemplateStore(str(store_root))
+        destination = tmp_path / "experiment"
+        destination.mkdir()
+
+        strategies = store.materialise_tree("flow", str(destination), {"name": "issue-1-demo"})
+
+        assert set(strategies) == {"data.jsonl", "prompt.jinja2"}
+        assert strategies["data.jsonl"] in ("reflink", "copy_file_range", "copy")
+        assert (destination / "prompt.jinja2").read_text() == "Say {{text}}\n"
+        assert [path.name for path in destination.iterdir() if path.name.startswith(".")] == []
+
+    def test_materialise_renders_atomically(self, store_root, tmp_path):
+        store = TemplateStore(str(store_root))
+        destination = tmp_path / "README.md"
+        destination.write_text("old")
+
+        with patch("src.templates.os.replace", side_effect=OSError("disk full")), pytest.raises(OSError):
+            store.materialise("README.md", str(destination), {"name": "issue-1-demo"})
+
+        assert destination.read_text() == "old"
+        assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
+
+        assert store.materialise("README.md", str(destination), {"name": "issue-1-demo"}) == "render"
+        assert destination.read_text() == "# issue-1-demo\n"
+
+    def test_materialise_hardlink(self, store_root, tmp_path):
+        store = TemplateStore(str(store_root), hardlink=True)
+        destination = tmp_path / "data.jsonl"
+
+        assert store.materialise("flow/data.jsonl", str(destination)) == "hardlink"
+        assert os.path.samefile(destination, store_root / "flow" / "data.jsonl")
+
+    def test_missing_template(self, store_root):
+        with pytest.raises(FileNotFoundError):
+            TemplateStore(str(store_root)).get("missing.md")
+
+    @patch("src.templates.os.copy_file_range", side_effect=OSError("not supported"), create=True)
+    @patch("fcntl.ioctl", side_effect=OSError("not supported"))
+    def test_clone_file_falls_back_to_copy(self, mock_ioctl, mock_copy_file_range, store_root, tmp_path):
+        destination = tmp_path / "copy.jsonl"
+
+        assert clone_file(str(store_root / "flow" / "data.jsonl"), str(destination)) == "copy"
+        assert destination.read_text() == '{"text": "hi"}\n'
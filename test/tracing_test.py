@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from src import tracing
+from src.entities import ExperimentType
+from src.executor import CommandExecutor
+from src.experiment_handler import ExperimentHandler
+
+
+@pytest.fixture
+def tracer():
+    tracer = tracing.enable()
+    yield tracer
+    tracing.disable()
+
+
+class TestTracing:
+    def test_disabled_span_is_shared_no_op(self):
+        first = tracing.span("a")
+        second = tracing.span("b", "subprocess", concurrent=True, command="ls")
+
+        assert first is second
+        with first as span:
+            span.set(ignored=True)
+
+    def test_records_wall_cpu_and_bytes(self, tracer, tmp_path):
+        with tracing.span("write", path="out") as span:
+            (tmp_path / "out").write_bytes(b"x" * 4096)
+            span.set(rows=1)
+
+        [recorded] = tracer.spans
+        assert recorded.name == "write"
+        assert recorded.wall > 0
+        assert recorded.cpu >= 0
+        assert recorded.args == {"path": "out", "rows": 1}
+        if recorded.bytes_written is not None:
+            assert recorded.bytes_written >= 4096
+
+    def test_records_errors(self, tracer):
+        with pytest.raises(ValueError), tracing.span("fails"):
+            raise ValueError()
+
+        assert tracer.spans[0].args == {"error": "ValueError"}
+
+    def test_summary_aggregates_by_name(self, tracer):
+        for _ in range(3):
+            with tracing.span("repeat"):
+                pass
+        with tracing.span("once"):
+            pass
+
+        assert [(name, count) for name, count, *_ in tracer.summary()] == [("repeat", 3), ("once", 1)]
+
+    def test_chrome_trace(self, tracer, tmp_path):
+        with tracing.span("outer"):
+            with tracing.span("inner"):
+                pass
+        CommandExecutor().run_sync("true")
+
+        path = tmp_path / "trace.json"
+        tracer.write_chrome_trace(str(path))
+
+        events = json.loads(path.read_text())["traceEvents"]
+        assert [(event["name"], event["ph"]) for event in events] == [
+            ("outer", "X"), ("inner", "X"), ("subprocess", "b"), ("subprocess", "e")]
+        assert events[0]["dur"] >= events[1]["dur"]
+        assert events[2]["args"]["command"] == "true"
+        assert events[2]["args"]["returncode"] == 0
+
+    def test_experiment_create_phases(self, tracer, tmp_path, monkeypatch):
+        monkeypatch.delenv("PROMPT_IGNITE_USE_PF_CLI", raising=False)
+
+        ExperimentHandler.create("issue-1-traced", ExperimentType.PROMPT_FLOW, f"{tmp_path}/", raise_errors=True)
+
+        names = {span.name for span in tracer.spans}
+        assert {"experiment.create", "catalog.reserve", "create_resources", "create_documentation", "manifest.write"} <= names
+        # The create command never goes through handler init or .env loading
+        assert not {"handler.init", "env.load"} & names
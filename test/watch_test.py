@@ -0,0 +1,131 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+
+import pytest
+from src.llm_clients import Completion, LLMClient
+from src.runner import RunConfig
+from src.templates import default_store
+from src.watch import IncrementalRun, InotifyWatcher, PollingWatcher, flow_dependencies
+
+
+class CountingClient(LLMClient):
+    def __init__(self):
+        self.prompts = []
+
+    async def complete(self, prompt, **params):
+        self.prompts.append(prompt)
+        return Completion(text=f"{params['temperature']}: {prompt}")
+
+
+@pytest.fixture
+def experiment_dir(tmp_path):
+    default_store().materialise_tree("prompt-flow", str(tmp_path), {"name": "issue-1-demo"})
+    return tmp_path
+
+
+def _run(experiment_dir, client, changed=None, incremental=None):
+    incremental = incremental or IncrementalRun(str(experiment_dir), client)
+    if changed:
+        incremental.invalidate(changed)
+    cycle = asyncio.run(incremental.run())
+    with open(cycle.output) as file:
+        return incremental, cycle, [json.loads(line) for line in file]
+
+
+class TestIncrementalRun:
+    def test_reuses_unchanged_results_across_sessions(self, experiment_dir):
+        client = CountingClient()
+        _, first, records = _run(experiment_dir, client)
+        _, second, reused = _run(experiment_dir, client)
+
+        assert (first.executed, first.reused) == (6, 0)
+        assert (second.executed, second.reused) == (0, 6)
+        assert len(client.prompts) == 6
+        assert [record["output"] for record in reused] == [record["output"] for record in records]
+        assert {record["run_id"] for record in reused} == {second.run_id}
+
+    def test_data_edit_runs_only_new_rows(self, experiment_dir):
+        client = CountingClient()
+        incremental, _, _ = _run(experiment_dir, client)
+        with open(experiment_dir / "data.jsonl", "a") as file:
+            file.write(json.dumps({"text": "Go Hello World!"}) + "\n")
+
+        _, cycle, records = _run(experiment_dir, client, {"data.jsonl"}, incremental)
+
+        assert (cycle.executed, cycle.reused) == (2, 6)
+        assert [(record["variant"], record["row"]) for record in records][-1] == ("llm.variant_1", 3)
+        assert records[-1]["output"]["output"].startswith("0.2: Write a simple Go Hello World!")
+
+    def test_flow_edit_runs_only_changed_variant(self, experiment_dir):
+        client = CountingClient()
+        incremental, _, _ = _run(experiment_dir, client)
+        flow = (experiment_dir / "flow.dag.yaml").read_text()
+        (experiment_dir / "flow.dag.yaml").write_text(flow.replace('temperature: "0.2"', 'temperature: "0.5"'))
+
+        _, cycle, records = _run(experiment_dir, client, {"flow.dag.yaml"}, incremental)
+
+        assert (cycle.variants, cycle.executed, cycle.reused) == (["llm.variant_1"], 3, 3)
+        assert {record["output"]["output"][:3] for record in records if record["variant"] == "llm.variant_1"} == {"0.5"}
+
+    def test_prompt_edit_runs_variants_using_it(self, experiment_dir):
+        client = CountingClient()
+        incremental, _, _ = _run(experiment_dir, client)
+        (experiment_dir / "hello.jinja2").write_text("Say {{text}}\n")
+
+        _, cycle, records = _run(experiment_dir, client, {"hello.jinja2"}, incremental)
+
+        assert (cycle.executed, cycle.reused) == (6, 0)
+        assert client.prompts[-1].startswith("Say ")
+
+    def test_flow_dependencies(self, experiment_dir):
+        incremental, _, _ = _run(experiment_dir, CountingClient())
+
+        assert flow_dependencies(incremental.flow, ["llm.variant_0"]) == {"llm.variant_0": {"flow.dag.yaml", "hello.jinja2", "hello.py"}}
+
+    def test_failed_rows_run_again(self, experiment_dir):
+        class FailingClient(CountingClient):
+            async def complete(self, prompt, **params):
+                if "C#" in prompt and not any("C#" in seen for seen in self.prompts):
+                    self.prompts.append(prompt)
+                    raise ConnectionError("throttled")
+                return await super().complete(prompt, **params)
+
+        client = FailingClient()
+        config = RunConfig(variants=("llm.variant_0",), max_retries=0)
+        incremental = IncrementalRun(str(experiment_dir), client, config)
+        _, first, _ = _run(experiment_dir, client, incremental=incremental)
+        _, second, records = _run(experiment_dir, client, incremental=incremental)
+
+        assert (first.failed, second.executed, second.failed) == (1, 1, 0)
+        assert all(record["error"] is None for record in records)
+
+
+def _watch_for_change(watcher, experiment_dir):
+    def edit():
+        time.sleep(0.1)
+        (experiment_dir / "hello.jinja2").write_text("Edited {{text}}\n")
+        (experiment_dir / "runs").mkdir(exist_ok=True)
+        (experiment_dir / "runs" / "ignored.jsonl").write_text("{}\n")
+
+    thread = threading.Thread(target=edit)
+    thread.start()
+    try:
+        return watcher.wait(timeout=5)
+    finally:
+        thread.join()
+        watcher.close()
+
+
+class TestWatchers:
+    def test_polling_watcher(self, experiment_dir):
+        assert _watch_for_change(PollingWatcher(str(experiment_dir), interval=0.05), experiment_dir) == {"hello.jinja2"}
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+    def test_inotify_watcher(self, experiment_dir):
+        assert _watch_for_change(InotifyWatcher(str(experiment_dir)), experiment_dir) == {"hello.jinja2"}
+
+    def test_polling_watcher_times_out(self, experiment_dir):
+        assert PollingWatcher(str(experiment_dir), interval=0.01).wait(timeout=0.05) == set()